@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Compare widget tree creation with ``FormTemplate`` against full rebuild
+with ``parse_from_YAML``.
+
+Run with::
+
+    python benchmarks/bench_template.py --fields 200 --number 50
+"""
+from yafowil.yaml import definition_cache
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.template import FormTemplate
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import timeit
+
+
+class Context(object):
+
+    def value(self, widget, data):
+        return 'value'
+
+
+def message_factory(msgid, default=None):
+    return default or msgid
+
+
+def create_definition(fields):
+    lines = [
+        'factory: form',
+        'name: form',
+        'props:',
+        '    action: expr:context.__class__.__name__',
+        'widgets:'
+    ]
+    for i in range(fields):
+        lines += [
+            '- field_{0}:'.format(i),
+            '    factory: field:label:error:text',
+            '    value: context.value' if i % 2 else '    value: Value',
+            '    props:',
+            '        label: i18n:field_{0}:Field {0}'.format(i),
+            '        required: True',
+            '        data:',
+            '            index: {0}'.format(i)
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--fields', type=int, default=200)
+    parser.add_argument('--number', type=int, default=50)
+    args = parser.parse_args(argv)
+    tempdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tempdir, 'form.yaml')
+        with open(path, 'w') as file:
+            file.write(create_definition(args.fields))
+        definition_cache.clear()
+        context = Context()
+        template = FormTemplate(path, message_factory=message_factory)
+        results = dict()
+        results['parse_from_YAML'] = min(timeit.repeat(
+            lambda: parse_from_YAML(path, context, message_factory),
+            number=args.number,
+            repeat=5
+        )) / args.number
+        results['FormTemplate'] = min(timeit.repeat(
+            lambda: template(context),
+            number=args.number,
+            repeat=5
+        )) / args.number
+    finally:
+        shutil.rmtree(tempdir)
+    print(json.dumps({
+        'fields': args.fields,
+        'seconds_per_tree': results,
+        'speedup': results['parse_from_YAML'] / results['FormTemplate']
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""Benchmark suite for loading, tree creation and rendering of form
+definitions.
+
+Run with::
+
+    python benchmarks/suite.py --output results.json
+
+Compare against previous results. Exits with status 1 if a phase got slower
+than ``threshold`` times the baseline::
+
+    python benchmarks/suite.py --baseline results.json --threshold 1.2
+"""
+from yafowil.yaml import YAMLParser
+from yafowil.yaml.cache import DefinitionCache
+from yafowil.yaml.definition import WidgetDefinition
+from yafowil.yaml.template import FormTemplate
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+import tracemalloc
+import yafowil.yaml.parser
+import yaml
+
+
+SIZES = {
+    # wide: number of fields in wide compound
+    # deep: nesting depth of deep compound
+    # nests: number of included sub forms
+    'small': dict(wide=10, deep=3, nests=2),
+    'medium': dict(wide=100, deep=10, nests=10),
+    'huge': dict(wide=1000, deep=50, nests=50),
+}
+
+
+class Context(object):
+    title = 'Title'
+
+    def value(self, widget, data):
+        return 'value'
+
+
+def message_factory(msgid, default=None):
+    return default or msgid
+
+
+def field(index):
+    return {
+        'factory': 'field:label:error:text',
+        'value': (
+            'expr:context.title' if index % 2 else 'context.value'
+        ),
+        'props': {
+            'label': 'i18n:field_{0}:Field {0}'.format(index),
+            'required': 'i18n:field_{0}_required:Required'.format(index),
+            'class_add': 'field-{0}'.format(index),
+            'data': {
+                'index': index,
+                'label': 'i18n:field_{0}_data:Data'.format(index)
+            }
+        }
+    }
+
+
+def create_definitions(wide, deep, nests):
+    """Create form definition data. Return dict containing main and nested
+    definition data.
+    """
+    widgets = list()
+    widgets.append({'wide': {
+        'factory': 'compound',
+        'widgets': [
+            {'field_{0}'.format(i): field(i)} for i in range(wide)
+        ]
+    }})
+    leaf = {'leaf': field(0)}
+    for i in range(deep):
+        leaf = {'deep_{0}'.format(i): {
+            'factory': 'compound',
+            'widgets': [leaf]
+        }}
+    widgets.append(leaf)
+    for i in range(nests):
+        widgets.append({'address_{0}'.format(i): {'nest': 'address.yaml'}})
+    main = {
+        'factory': 'form',
+        'name': 'form',
+        'props': {'action': 'expr:context.title'},
+        'widgets': widgets
+    }
+    address = {
+        'factory': 'compound',
+        'widgets': [
+            {name: field(i)}
+            for i, name in enumerate(['street', 'zip', 'city'])
+        ]
+    }
+    return {'form': main, 'address': address}
+
+
+def write_definitions(directory, definitions):
+    paths = dict()
+    for name, data in definitions.items():
+        path = os.path.join(directory, '{0}.yaml'.format(name))
+        with open(path, 'w') as file:
+            yaml.safe_dump(data, file)
+        paths[name] = path
+        path = os.path.join(directory, '{0}.json'.format(name))
+        with open(path, 'w') as file:
+            json.dump(data, file)
+    return paths
+
+
+def measure(func, number, repeat):
+    """Return minimal seconds per call and peak memory of a single call in
+    bytes.
+    """
+    func()
+    seconds = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run_size(size, directory, repeat):
+    params = SIZES[size]
+    paths = write_definitions(directory, create_definitions(**params))
+    main_path = paths['form']
+    json_path = main_path[:-4] + 'json'
+    context = Context()
+    cache = DefinitionCache()
+    parser = YAMLParser(
+        main_path,
+        context=context,
+        message_factory=message_factory,
+        cache=cache
+    )
+    data = parser.load_yaml(main_path)
+    definition = WidgetDefinition.from_data(data)
+    form = parser.create_tree(definition)
+    template = FormTemplate(
+        main_path,
+        message_factory=message_factory,
+        cache=cache
+    )
+    number = max(1, 1000 // (params['wide'] + params['deep']))
+    phases = [
+        ('load_yaml', lambda: parser.load_yaml(main_path)),
+        ('load_json', lambda: parser.load_json(json_path)),
+        ('load_definition', lambda: WidgetDefinition.from_data(data)),
+        ('create_tree', lambda: parser.create_tree(definition)),
+        ('template', lambda: template(context)),
+        ('render', lambda: form()),
+    ]
+    results = list()
+    for phase, func in phases:
+        seconds, peak = measure(func, number, repeat)
+        results.append({
+            'size': size,
+            'phase': phase,
+            'seconds': seconds,
+            'peak_memory': peak
+        })
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return list of messages for phases slower than ``threshold`` times
+    the baseline.
+    """
+    base = dict([
+        ((res['size'], res['phase']), res['seconds'])
+        for res in baseline['results']
+    ])
+    regressions = list()
+    for res in results['results']:
+        before = base.get((res['size'], res['phase']))
+        if not before:
+            continue
+        ratio = res['seconds'] / before
+        if ratio > threshold:
+            regressions.append('{0}/{1}: {2:.2f}x slower'.format(
+                res['size'],
+                res['phase'],
+                ratio
+            ))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--sizes',
+        nargs='+',
+        choices=sorted(SIZES),
+        default=['small', 'medium', 'huge']
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write JSON results to file')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args(argv)
+    results = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'yaml_loader': yafowil.yaml.parser.yaml_loader.__name__,
+        'results': []
+    }
+    tempdir = tempfile.mkdtemp()
+    try:
+        for size in args.sizes:
+            results['results'] += run_size(size, tempdir, args.repeat)
+    finally:
+        shutil.rmtree(tempdir)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    else:
+        print(output)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            sys.stderr.write(regression + '\n')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,10 @@
+##############################################################################
+# benchmark
+##############################################################################
+
+BENCHMARK_OUTPUT?=bench_output.json
+
+.PHONY: benchmark
+benchmark: $(PACKAGES_TARGET)
+	@echo "Run benchmarks, write results to $(BENCHMARK_OUTPUT)"
+	@$(MXENV_PYTHON) benchmarks/suite.py --output $(BENCHMARK_OUTPUT)
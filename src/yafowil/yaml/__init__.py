@@ -1,3 +1,6 @@
+from yafowil.yaml.cache import definition_cache  # noqa
+from yafowil.yaml.compiled import CompiledDefinition  # noqa
 from yafowil.yaml.parser import YAMLParser  # noqa
 from yafowil.yaml.parser import parse_from_YAML  # noqa
+from yafowil.yaml.parser import parse_from_source  # noqa
 from yafowil.yaml.parser import python_expression_globals  # noqa
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+from yafowil.yaml.cache import definition_cache
+from yafowil.yaml.cache import message_cache
+from yafowil.yaml.parser import YAMLParser
+from yafowil.yaml.parser import is_resource
+from yafowil.yaml.parser import translate_path
+import asyncio
+import functools
+import os
+
+
+# pending loads by event loop and definition
+_pending = dict()
+
+
+def _run(executor, function, *args):
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(
+        executor,
+        functools.partial(function, *args)
+    )
+
+
+async def load_definition(parser, path, executor=None):
+    """Load widget definition for ``path`` using ``parser`` in ``executor``.
+
+    Concurrent loads of the same definition are collapsed into a single load.
+    Cancelling a waiting task does not cancel the load.
+    """
+    key = (
+        asyncio.get_running_loop(),
+        path if is_resource(path) else os.path.abspath(path),
+        id(parser.cache),
+        parser.yaml_loader
+    )
+    future = _pending.get(key)
+    if future is None:
+        future = _run(executor, parser.load, path)
+        _pending[key] = future
+
+        def done(future):
+            if _pending.get(key) is future:
+                del _pending[key]
+
+        future.add_done_callback(done)
+    return await asyncio.shield(future)
+
+
+async def load_nested(parser, definition, executor=None):
+    """Load all nested definitions contained in ``definition`` and their
+    nested definitions in ``executor``.
+
+    Independent nested definitions are loaded concurrently. Return dict
+    like used by ``YAMLParser.load_nested``.
+    """
+    nested = dict()
+
+    def collect(definition):
+        nests = list()
+        stack = list(definition.widgets)
+        while stack:
+            child = stack.pop()
+            if child.nest:
+                if child.nest not in nested:
+                    nested[child.nest] = None
+                    nests.append(child.nest)
+                continue
+            stack.extend(child.widgets)
+        return nests
+
+    async def load(nest):
+        if parser.nest_resolver is not None:
+            return await _run(executor, parser.load_nested, nest, ())
+        if is_resource(nest):
+            nest_path = await _run(executor, parser.resolve_nest_path, nest)
+        else:
+            nest_path = parser.resolve_nest_path(nest)
+        return (
+            nest_path,
+            os.path.abspath(nest_path),
+            await load_definition(parser, nest_path, executor=executor)
+        )
+
+    nests = collect(definition)
+    while nests:
+        entries = await asyncio.gather(*[load(nest) for nest in nests])
+        for nest, entry in zip(nests, entries):
+            nested[nest] = entry
+        nests = list()
+        for entry in entries:
+            nests.extend(collect(entry[2]))
+    return nested
+
+
+async def parse_from_YAML_async(
+    path,
+    context=None,
+    message_factory=None,
+    expression_globals=None,
+    cache=definition_cache,
+    yaml_loader=None,
+    nest_cache=None,
+    disk_cache=None,
+    instrumentation=None,
+    symbolic_props=None,
+    lazy=False,
+    nest_resolver=None,
+    message_cache=message_cache,
+    executor=None
+):
+    """Asynchronous counterpart of ``parse_from_YAML``.
+
+    Resolving package resources, reading and parsing the definition files is
+    done in ``executor``, which defaults to the default executor of the
+    running event loop. Independent nested definitions are loaded
+    concurrently and concurrent loads of the same definition are collapsed
+    into a single load. The widget tree is created in the event loop.
+    """
+    # package resources may need to import the package
+    if is_resource(path):
+        path = await _run(executor, translate_path, path)
+    parser = YAMLParser(
+        path,
+        context,
+        message_factory,
+        expression_globals,
+        cache,
+        yaml_loader,
+        nest_cache,
+        disk_cache,
+        instrumentation,
+        symbolic_props,
+        lazy,
+        nest_resolver,
+        message_cache
+    )
+    definition = await load_definition(parser, path, executor=executor)
+    nested = await load_nested(parser, definition, executor=executor)
+    return parser.create_tree(definition, path, nested)
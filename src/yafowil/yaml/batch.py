@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from yafowil.yaml.cache import definition_cache
+from yafowil.yaml.definition import WidgetDefinition
+from yafowil.yaml.definition import iter_values
+from yafowil.yaml.parser import CommonTransformationError
+from yafowil.yaml.parser import YAMLParser
+from yafowil.yaml.parser import compile_expression
+from yafowil.yaml.parser import expression_error
+from yafowil.yaml.parser import is_resource
+from yafowil.yaml.parser import translate_path
+import os
+
+
+class BatchTransformationError(CommonTransformationError):
+    """Raised if one or more form definitions could not be loaded.
+
+    ``errors`` maps paths to the raised exceptions, ``definitions`` maps paths
+    to the successfully loaded widget definitions.
+    """
+
+    def __init__(self, errors, definitions):
+        self.errors = errors
+        self.definitions = definitions
+        msg = u'Cannot load {0} form definition(s):\n{1}'.format(
+            len(errors),
+            u'\n'.join([
+                u'{0}: {1}: {2}'.format(path, e.__class__.__name__, e)
+                for path, e in errors.items()
+            ])
+        )
+        super(BatchTransformationError, self).__init__(msg)
+
+
+def _load_data(path, yaml_loader):
+    # called in worker process, loaded data gets pickled
+    parser = YAMLParser(path, cache=None, yaml_loader=yaml_loader)
+    return parser.load_file(path)
+
+
+def validate_definition(definition, path):
+    """Compile expressions contained in widget definition and its children.
+
+    Return nest values of widget definitions. Raise
+    ``YAMLTransformationError`` if an expression cannot be compiled.
+    """
+    nests = list()
+    stack = [definition]
+    while stack:
+        definition = stack.pop()
+        if definition.nest:
+            nests.append(definition.nest)
+        stack.extend(reversed(definition.widgets))
+        values = (
+            definition.props,
+            definition.custom,
+            definition.value,
+            definition.mode
+        )
+        for value in iter_values(values):
+            try:
+                if value.startswith('python:'):
+                    compile_expression(value[7:])
+                elif value.startswith('expr:'):
+                    compile_expression(value[5:])
+            except SyntaxError as e:
+                raise expression_error(definition.name, path, e)
+    return nests
+
+
+def load_definitions(
+    paths,
+    cache=definition_cache,
+    yaml_loader=None,
+    max_workers=None,
+    executor=None
+):
+    """Load and validate form definitions and their nested definitions.
+
+    ``paths`` are file paths or package resources like accepted by
+    ``parse_from_YAML``. YAML and JSON files are parsed in a process pool
+    with ``max_workers`` processes, alternatively a custom
+    ``concurrent.futures`` executor can be passed. Loaded definitions are
+    added to ``cache``.
+
+    Return dict mapping paths to widget definitions. Nested definitions are
+    contained by their resolved path. If loading fails for one or more files,
+    ``BatchTransformationError`` is raised after all files have been
+    processed.
+    """
+    definitions = dict()
+    errors = dict()
+    pending = dict()
+    seen = set()
+    shutdown = executor is None
+    if shutdown:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def submit(spec, path, root):
+        # ``root`` is the path of the definition given in ``paths`` which
+        # includes the definition. nests are resolved relative to it like
+        # done when parsing, thus definitions included by roots in different
+        # directories are processed per directory
+        key = (
+            os.path.abspath(path),
+            os.path.dirname(os.path.abspath(root))
+        )
+        if key in seen:
+            return
+        seen.add(key)
+        future = executor.submit(_load_data, path, yaml_loader)
+        pending[future] = (spec, path, root)
+
+    try:
+        for spec in paths:
+            try:
+                path = translate_path(spec)
+            # report invalid package resources like other errors
+            except Exception as e:
+                errors[spec] = e
+                continue
+            submit(spec, path, path)
+        while pending:
+            done = wait(pending, return_when=FIRST_COMPLETED)[0]
+            for future in done:
+                spec, path, root = pending.pop(future)
+                try:
+                    definition = WidgetDefinition.from_data(future.result())
+                    nests = validate_definition(definition, path)
+                # collect errors of all files, including malformed data
+                except Exception as e:
+                    errors[spec] = e
+                    continue
+                parser = YAMLParser(root, yaml_loader=yaml_loader)
+                if cache is not None:
+                    definition = cache.load(
+                        path,
+                        lambda path, definition=definition: definition,
+                        immutable=is_resource(path),
+                        variant=parser.cache_variant
+                    )
+                definitions[spec] = definition
+                for nest in nests:
+                    try:
+                        nest_path = parser.resolve_nest_path(nest)
+                    except Exception as e:
+                        errors[nest] = e
+                        continue
+                    submit(nest_path, nest_path, root)
+    finally:
+        if shutdown:
+            executor.shutdown()
+    if errors:
+        raise BatchTransformationError(errors, definitions)
+    return definitions
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import weakref
+
+
+_marker = object()
+
+
+class LRUCache(object):
+    """Bounded, thread safe mapping evicting least recently used entries.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _marker)
+            if value is _marker:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def update(self, items):
+        """Set ``(key, value)`` pairs of ``items`` at once. Concurrent readers
+        either see all or none of the new values.
+        """
+        with self._lock:
+            for key, value in items:
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset hit and miss counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class DefinitionCache(LRUCache):
+    """Cache for loaded form definitions.
+
+    Entries are keyed by absolute file path and invalidated if modification
+    time or size of the file changes. Cached definitions are shared between
+    parser runs and must be treated as read only.
+    """
+
+    def key(self, path, immutable=False, variant=None):
+        """Create cache key for definition at ``path``.
+
+        ``variant`` identifies the loaders used for loading the definition,
+        see ``yafowil.yaml.parser.YAMLParser.cache_variant``. Definitions
+        loaded by different loaders are cached separately.
+        """
+        key = path if immutable else os.path.abspath(path)
+        if variant is None:
+            return key
+        return (key, variant)
+
+    def load(self, path, loader, immutable=False, variant=None):
+        """Return definition for ``path``, calling ``loader`` on cache miss.
+
+        If ``immutable`` is set, the file is not checked for modifications,
+        e.g. for package resources in zipped packages.
+        """
+        if immutable:
+            signature = None
+        else:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # let the loader raise the appropriate error
+                return loader(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        key = self.key(path, immutable, variant)
+        entry = self.get(key)
+        if entry is not None:
+            if entry[0] == signature:
+                return entry[1]
+            # stale entry, count as miss
+            with self._lock:
+                self.hits -= 1
+                self.misses += 1
+        data = loader(path)
+        self.set(key, (signature, data))
+        return data
+
+
+class WatchedDefinitionCache(DefinitionCache):
+    """Definition cache kept up to date by
+    ``yafowil.yaml.watch.DefinitionWatcher``.
+
+    Files are not checked for modifications on load, changed definitions get
+    replaced by the watcher.
+    """
+
+    def __init__(self, maxsize=1024):
+        super(WatchedDefinitionCache, self).__init__(maxsize=maxsize)
+
+    def load(self, path, loader, immutable=False, variant=None):
+        key = self.key(path, immutable, variant)
+        entry = self.get(key)
+        if entry is not None:
+            return entry[1]
+        data = loader(path)
+        self.set(key, (None, data))
+        return data
+
+
+class MessageCache(object):
+    """Cache for i18n messages, kept per message factory.
+
+    Messages are keyed by definition value and held in a ``LRUCache`` per
+    message factory with ``maxsize`` entries. Entries are dropped with their
+    message factory. Messages are shared between parser runs and must be
+    immutable, like ``zope.i18nmessageid.Message`` is.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._caches = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._caches)
+
+    def get(self, message_factory):
+        """Return ``LRUCache`` for ``message_factory`` or ``None`` if message
+        factory cannot be weakly referenced.
+        """
+        try:
+            cache = self._caches.get(message_factory)
+        except TypeError:
+            return None
+        if cache is None:
+            with self._lock:
+                try:
+                    cache = self._caches.setdefault(
+                        message_factory,
+                        LRUCache(maxsize=self.maxsize)
+                    )
+                except TypeError:
+                    return None
+        return cache
+
+    def clear(self):
+        """Remove all entries.
+        """
+        with self._lock:
+            self._caches.clear()
+
+
+class DiskCache(object):
+    """Cache for loaded definition data on disk.
+
+    Entries are stored in ``directory`` in python's ``marshal`` format and
+    keyed by a hash of source, source kind, loading backend and versions of
+    python, ``yafowil.yaml`` and ``PyYAML``. Data which cannot be marshaled,
+    e.g. if YAML contains timestamps, is not cached. The cache directory must
+    not be writable by untrusted parties.
+    """
+    format_version = 1
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        try:
+            import importlib.metadata
+            version = importlib.metadata.version('yafowil.yaml')
+        except importlib.metadata.PackageNotFoundError:  # pragma: no cover
+            version = 'unknown'
+        try:
+            import yaml
+            yaml_version = yaml.__version__
+        except ImportError:  # pragma: no cover
+            yaml_version = 'unknown'
+        self.salt = '{0}:{1}:{2}:{3}'.format(
+            self.format_version,
+            sys.version_info[:2],
+            version,
+            yaml_version
+        ).encode('utf-8')
+
+    def key(self, source, kind, backend=None):
+        """Create cache key for ``source`` of ``kind`` loaded by ``backend``,
+        e.g. the YAML loader class.
+        """
+        sha = hashlib.sha256(self.salt)
+        sha.update(kind.encode('utf-8'))
+        sha.update(b'\0')
+        if backend is not None:
+            sha.update(u'{0}.{1}'.format(
+                backend.__module__,
+                backend.__qualname__
+            ).encode('utf-8'))
+        sha.update(b'\0')
+        if not isinstance(source, bytes):
+            source = source.encode('utf-8')
+        sha.update(source)
+        return sha.hexdigest()
+
+    def load(self, source, kind, loader, backend=None):
+        """Return data for ``source``, calling ``loader`` on cache miss.
+        """
+        path = os.path.join(self.directory, self.key(source, kind, backend))
+        try:
+            with open(path, 'rb') as file:
+                data = marshal.loads(file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        else:
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = loader(source)
+        try:
+            raw = marshal.dumps(data)
+        except ValueError:
+            return data
+        os.makedirs(self.directory, exist_ok=True)
+        # write to temporary file and rename for atomic cache updates
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(raw)
+            os.replace(tmp_path, path)
+        except OSError:  # pragma: no cover
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return data
+
+    def clear(self):
+        """Remove all cache files and reset hit and miss counters.
+        """
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                # only remove cache entries, named by sha256 hex digest
+                if len(name) == 64:
+                    os.remove(os.path.join(self.directory, name))
+        self.hits = 0
+        self.misses = 0
+
+
+definition_cache = DefinitionCache()
+expression_cache = LRUCache(maxsize=1024)
+callable_cache = LRUCache(maxsize=1024)
+source_cache = LRUCache(maxsize=256)
+resource_cache = LRUCache(maxsize=1024)
+message_cache = MessageCache()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+from types import MappingProxyType
+from yafowil.yaml.cache import definition_cache
+from yafowil.yaml.cache import message_cache
+from yafowil.yaml.parser import YAMLParser
+from yafowil.yaml.parser import python_expression_globals
+from yafowil.yaml.parser import translate_path
+import builtins
+import os
+
+
+class CompiledDefinition(object):
+    """Immutable form definition including all nested definitions, which can
+    be shared between threads.
+
+    The form definition and its nested definitions are loaded once when
+    creating the compiled definition. Calling it with the rendering context,
+    message factory and expression globals creates a new widget tree. Each
+    call uses its own ``YAMLParser`` as build context, nothing is read from
+    files or written to shared state while building the widget tree.
+
+    ``python_expression_globals`` are taken over on creation, later changes
+    are not considered. ``python_globals`` is shared between calls and must
+    not be modified.
+    """
+    __slots__ = (
+        'path',
+        'definition',
+        'nested',
+        'python_globals',
+        'symbolic_props',
+        'lazy',
+        'message_cache'
+    )
+
+    def __init__(
+        self,
+        path,
+        cache=definition_cache,
+        yaml_loader=None,
+        nest_cache=None,
+        disk_cache=None,
+        symbolic_props=None,
+        lazy=False,
+        nest_resolver=None,
+        message_cache=message_cache
+    ):
+        path = translate_path(path)
+        parser = YAMLParser(
+            path,
+            cache=cache,
+            yaml_loader=yaml_loader,
+            nest_cache=nest_cache,
+            disk_cache=disk_cache,
+            symbolic_props=symbolic_props,
+            nest_resolver=nest_resolver
+        )
+        definition = parser.load(path)
+        # resolve and load all nested definitions. raises on circular nesting
+        nested = dict()
+        chain = (os.path.abspath(path),)
+        stack = [(child, chain) for child in definition.widgets]
+        while stack:
+            child, chain = stack.pop()
+            if child.nest:
+                _, key, child = parser.load_nested(child.nest, chain, nested)
+                chain = chain + (key,)
+            stack.extend([(sub, chain) for sub in child.widgets])
+        python_globals = dict(python_expression_globals)
+        # avoid ``eval`` writing builtins to shared globals
+        python_globals.setdefault('__builtins__', builtins.__dict__)
+        setattr_ = object.__setattr__
+        setattr_(self, 'path', path)
+        setattr_(self, 'definition', definition)
+        setattr_(self, 'nested', MappingProxyType(nested))
+        setattr_(self, 'python_globals', python_globals)
+        setattr_(self, 'symbolic_props', parser.symbolic_props)
+        setattr_(self, 'lazy', lazy)
+        setattr_(self, 'message_cache', message_cache)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Compiled definition is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Compiled definition is immutable')
+
+    def __repr__(self):
+        return '<{0} path={1!r}>'.format(self.__class__.__name__, self.path)
+
+    def parser(
+        self,
+        context=None,
+        message_factory=None,
+        expression_globals=None,
+        instrumentation=None
+    ):
+        """Create build context for one call.
+        """
+        parser = YAMLParser(
+            self.path,
+            context=context,
+            message_factory=message_factory,
+            expression_globals=expression_globals,
+            cache=None,
+            instrumentation=instrumentation,
+            symbolic_props=self.symbolic_props,
+            lazy=self.lazy,
+            message_cache=self.message_cache
+        )
+        python_globals = self.python_globals
+        if expression_globals:
+            python_globals = dict(python_globals)
+            python_globals.update(expression_globals)
+        parser._python_globals = python_globals
+        return parser
+
+    def __call__(
+        self,
+        context=None,
+        message_factory=None,
+        expression_globals=None,
+        instrumentation=None
+    ):
+        """Create widget tree.
+        """
+        parser = self.parser(
+            context=context,
+            message_factory=message_factory,
+            expression_globals=expression_globals,
+            instrumentation=instrumentation
+        )
+        definition = self.definition
+        path = self.path
+        root = parser.create_widget(definition, path)
+        parser.create_children(
+            root,
+            definition,
+            path,
+            (os.path.abspath(path),),
+            # all nested definitions are resolved, read only
+            self.nested
+        )
+        return root
@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+from node.utils import UNSET
+from types import MappingProxyType
+from yafowil.compat import STR_TYPE
+from yafowil.yaml.cache import definition_cache
+from yafowil.yaml.parser import CommonTransformationError
+from yafowil.yaml.parser import YAMLParser
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.parser import callable_template
+from yafowil.yaml.parser import compile_expression
+from yafowil.yaml.parser import expression_error
+from yafowil.yaml.parser import parse_message
+from yafowil.yaml.parser import python_expression_globals
+from yafowil.yaml.parser import resolve_name
+from yafowil.yaml.parser import translate_path
+import argparse
+import datetime
+import dis
+import importlib
+import math
+import os
+import sys
+import types
+
+
+module_header = '''\
+# -*- coding: utf-8 -*-
+# Generated by yafowil.yaml.compiler from {source!r}. Do not edit.
+from node.utils import UNSET
+from yafowil.base import factory
+import datetime  # noqa
+import importlib
+import yafowil.loader  # noqa  # loads registry
+
+
+def _resolve(module, names):
+    ob = importlib.import_module(module)
+    for name in names:
+        ob = getattr(ob, name)
+    return ob
+
+
+def _lookup(context, names, value):
+    ob = context
+    for name in names:
+        if not hasattr(ob, name):
+            return value
+        ob = getattr(ob, name)
+    if not callable(ob):
+        return value
+    return ob
+
+
+def _expr(code, context):
+    return eval(code, dict(context=context))
+'''
+
+
+# types of ``python_expression_globals`` values written to generated modules
+# as literals
+literal_types = (
+    type(None),
+    bool,
+    int,
+    float,
+    STR_TYPE,
+    bytes,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta
+)
+
+
+def global_names(code):
+    """Return names of globals loaded by ``code`` and nested code objects.
+    """
+    names = set()
+    stack = [code]
+    while stack:
+        code = stack.pop()
+        for instruction in dis.get_instructions(code):
+            if instruction.opname in ('LOAD_NAME', 'LOAD_GLOBAL'):
+                names.add(instruction.argval)
+        stack.extend([
+            const for const in code.co_consts
+            if isinstance(const, types.CodeType)
+        ])
+    return names
+
+
+class ModuleCompiler(YAMLParser):
+    """Compile form definition including nested definitions to python module
+    source.
+
+    The generated module provides a ``build`` function accepting ``context``,
+    ``message_factory`` and ``expression_globals``, which creates the widget
+    tree by calling ``yafowil.base.factory`` directly.
+
+    Dotted names are resolved at compile time, thus modules containing
+    referenced callables must be imported before compiling. Values of
+    ``yafowil.yaml.python_expression_globals`` used by ``python:``
+    expressions are written to the module at compile time, either as literal
+    or as reference to an importable object. ``expression_globals`` passed to
+    ``build`` take precedence.
+    """
+
+    def __init__(
+        self,
+        path,
+        cache=definition_cache,
+        yaml_loader=None,
+        symbolic_props=None
+    ):
+        super(ModuleCompiler, self).__init__(
+            path,
+            cache=cache,
+            yaml_loader=yaml_loader,
+            symbolic_props=symbolic_props
+        )
+
+    def __call__(self):
+        return self.compile_module(self.load(self.path))
+
+    def compile_module(self, definition, path=None):
+        if path is None:
+            path = self.path
+        self._constants = list()
+        self._code_names = dict()
+        self._ref_names = dict()
+        self._functions = list()
+        self._nested = dict()
+        self._global_names = set()
+        # nested definitions are compiled to separate functions, which get
+        # queued instead of compiled recursively
+        self._queue = [(
+            'build',
+            'context=None, message_factory=None, expression_globals=None',
+            [
+                '    _globals = dict(_python_globals)',
+                '    _globals.update(expression_globals or ())'
+            ],
+            definition,
+            path,
+            (os.path.abspath(path),)
+        )]
+        while self._queue:
+            self._compile_function(*self._queue.pop(0))
+        python_globals = ', '.join([
+            '{0!r}: {1}'.format(name, self.compile_global(name))
+            for name in sorted(self._global_names)
+        ])
+        self._constants.append('_python_globals = {{{0}}}'.format(
+            python_globals
+        ))
+        parts = [module_header.format(source=path)]
+        parts.append('\n'.join(self._constants) + '\n')
+        parts.extend(self._functions)
+        return '\n\n'.join(parts)
+
+    def _compile_function(
+        self,
+        name,
+        signature,
+        lines,
+        definition,
+        path,
+        chain
+    ):
+        lines = ['def {0}({1}):'.format(name, signature)] + lines
+        counter = [0]
+
+        def compile_widget(defs, path):
+            var = 'w{0}'.format(counter[0])
+            counter[0] += 1
+            try:
+                props = '{{{0}}}'.format(', '.join([
+                    '{0!r}: {1}'.format(key, self.compile_prop(key, value))
+                    for key, value in defs.props.items()
+                ]))
+                custom = ', '.join([
+                    '{0!r}: [{1}]'.format(custom_key, ', '.join([
+                        '[{0}]'.format(', '.join([
+                            self.compile_definition_value(pt) for pt in part
+                        ]))
+                        for part in parts
+                    ]))
+                    for custom_key, parts in defs.custom
+                ])
+                value = self.compile_definition_value(defs.value)
+                mode = self.compile_definition_value(defs.mode)
+            except SyntaxError as e:
+                raise expression_error(defs.name, path, e)
+            lines.extend([
+                '    {0} = factory('.format(var),
+                '        {0},'.format(self.compile_literal(defs.factory)),
+                '        name={0!r},'.format(defs.name),
+                '        value={0},'.format(value),
+                '        props={0},'.format(props),
+                '        custom={{{0}}},'.format(custom),
+                '        mode={0},'.format(mode),
+                '    )'
+            ])
+            return var
+
+        root = compile_widget(definition, path)
+        # widgets are compiled depth first in definition order. an explicit
+        # stack is used instead of recursion to support arbitrary depth
+        stack = [(root, iter(definition.widgets))]
+        while stack:
+            parent, children = stack[-1]
+            child_def = next(children, None)
+            if child_def is None:
+                stack.pop()
+                continue
+            nest = child_def.nest
+            if nest:
+                nest_path, key, nest_def = self.load_nested(nest, chain)
+                func_name = self._nested.get(key)
+                if func_name is None:
+                    func_name = '_build_{0}'.format(len(self._nested))
+                    self._queue.append((
+                        func_name,
+                        'context, message_factory, _globals',
+                        [],
+                        nest_def,
+                        nest_path,
+                        chain + (key,)
+                    ))
+                    self._nested[key] = func_name
+                var = 'w{0}'.format(counter[0])
+                counter[0] += 1
+                lines.append((
+                    '    {0} = {1}(context, message_factory, _globals)'
+                ).format(var, func_name))
+            else:
+                var = compile_widget(child_def, path)
+                stack.append((var, iter(child_def.widgets)))
+            lines.append('    {0}[{1!r}] = {2}'.format(
+                parent,
+                child_def.name,
+                var
+            ))
+        lines.append('    return {0}'.format(root))
+        self._functions.append('\n'.join(lines) + '\n')
+
+    def compile_prop(self, name, value):
+        symbolic_props = self.symbolic_props
+        return self.compile_attribute(
+            value,
+            resolve=symbolic_props is None or name in symbolic_props
+        )
+
+    def compile_attribute(self, value, resolve=True):
+        if not isinstance(value, (dict, MappingProxyType)):
+            return self.compile_definition_value(value, resolve=resolve)
+        return '{{{0}}}'.format(', '.join([
+            '{0!r}: {1}'.format(k, self.compile_attribute(v, resolve=resolve))
+            for k, v in value.items()
+        ]))
+
+    def compile_definition_value(self, value, resolve=True):
+        if not isinstance(value, STR_TYPE):
+            return self.compile_literal(value)
+        if value.startswith('python:'):
+            return 'eval({0}, _globals, {{}})'.format(
+                self._code_name(value[7:])
+            )
+        elif value.startswith('expr:'):
+            return '_expr({0}, context)'.format(
+                self._code_name(value[5:], expression=True)
+            )
+        elif value.startswith('i18n:'):
+            msgid, default = parse_message(value)
+            if default is None:
+                return 'message_factory({0!r})'.format(msgid)
+            return 'message_factory({0!r}, default={1!r})'.format(
+                msgid,
+                default
+            )
+        elif not resolve or '.' not in value:
+            return repr(value)
+        names = value.split('.')
+        for name in names:
+            if not name.isidentifier():
+                return repr(value)
+        if names[0] == 'context':
+            return '_lookup(context, {0!r}, {1!r})'.format(
+                tuple(names[1:]),
+                value
+            )
+        if self.parse_definition_value(value) is value:
+            return repr(value)
+        return self._ref_name(names)
+
+    def compile_literal(self, value):
+        if value is UNSET:
+            return 'UNSET'
+        if isinstance(value, (dict, MappingProxyType)):
+            return '{{{0}}}'.format(', '.join([
+                '{0!r}: {1}'.format(k, self.compile_literal(v))
+                for k, v in value.items()
+            ]))
+        if isinstance(value, (list, tuple)):
+            return '[{0}]'.format(', '.join([
+                self.compile_literal(v) for v in value
+            ]))
+        if isinstance(value, (set, frozenset)):
+            return 'set([{0}])'.format(', '.join([
+                self.compile_literal(v) for v in value
+            ]))
+        if isinstance(value, float) and (math.isinf(value) or value != value):
+            return 'float({0!r})'.format(repr(value))
+        # dates and datetimes are represented as ``datetime.*(...)``, the
+        # generated module imports ``datetime``
+        return repr(value)
+
+    def compile_global(self, name):
+        """Return source of value of ``python_expression_globals`` entry
+        ``name``. Raise ``YAMLTransformationError`` if value is neither a
+        literal nor importable.
+        """
+        value = python_expression_globals[name]
+        if isinstance(value, types.ModuleType):
+            return self._ref_name(value.__name__.split('.'))
+        module = getattr(value, '__module__', None)
+        qualname = getattr(value, '__qualname__', None)
+        if isinstance(module, STR_TYPE) and isinstance(qualname, STR_TYPE):
+            dotted = '{0}.{1}'.format(module, qualname)
+            if resolve_name(dotted) is value:
+                return self._ref_name(dotted.split('.'))
+        # check literals including contained values
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, (dict, MappingProxyType)):
+                stack.extend(item.keys())
+                stack.extend(item.values())
+            elif isinstance(item, (list, set, frozenset)):
+                stack.extend(item)
+            elif not isinstance(item, literal_types):
+                msg = (
+                    u"Cannot compile expression global '{0}' of type '{1}'. "
+                    u"Value must be a literal or importable by dotted name."
+                ).format(name, type(item).__name__)
+                raise YAMLTransformationError(msg)
+        return self.compile_literal(value)
+
+    def _code_name(self, source, expression=False):
+        # ``expression`` code creates function for ``expr:`` expressions
+        key = (source, expression)
+        name = self._code_names.get(key)
+        if name is None:
+            # raises SyntaxError at compile time
+            code = compile_expression(source)
+            if not expression:
+                # ``python:`` expressions get ``python_expression_globals``
+                self._global_names.update([
+                    global_name for global_name in global_names(code)
+                    if global_name in python_expression_globals
+                ])
+            name = self._code_names[key] = '_code_{0}'.format(
+                len(self._code_names)
+            )
+            self._constants.append(
+                '{0} = compile({1!r}, {2!r}, {3!r})'.format(
+                    name,
+                    callable_template.format(source) if expression else source,
+                    '<expression>',
+                    'eval'
+                )
+            )
+        return name
+
+    def _ref_name(self, names):
+        dotted = '.'.join(names)
+        name = self._ref_names.get(dotted)
+        if name is not None:
+            return name
+        # import the most specific module found in the dotted name
+        for index in range(len(names), 0, -1):
+            module = sys.modules.get('.'.join(names[:index]))
+            if isinstance(module, types.ModuleType):
+                break
+        name = self._ref_names[dotted] = '_ref_{0}'.format(
+            len(self._ref_names)
+        )
+        self._constants.append('{0} = _resolve({1!r}, {2!r})'.format(
+            name,
+            '.'.join(names[:index]),
+            tuple(names[index:])
+        ))
+        return name
+
+
+def compile_module(path, yaml_loader=None, symbolic_props=None):
+    """Compile YAML or JSON form definition at ``path`` to python module
+    source.
+    """
+    return ModuleCompiler(
+        translate_path(path),
+        yaml_loader=yaml_loader,
+        symbolic_props=symbolic_props
+    )()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='yafowil-yaml-compile',
+        description='Compile YAML or JSON form definitions to python modules.'
+    )
+    parser.add_argument(
+        'definition',
+        help='Path to form definition, e.g. "form.yaml" or '
+             '"my.package:forms/form.yaml"'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='Path of python module to write. Defaults to stdout.'
+    )
+    parser.add_argument(
+        '-i',
+        '--import',
+        dest='imports',
+        action='append',
+        default=[],
+        help='Import module before compiling. Modules containing callables '
+             'referenced by dotted names must be imported. Can be given '
+             'multiple times.'
+    )
+    args = parser.parse_args(argv)
+    for module in args.imports:
+        importlib.import_module(module)
+    try:
+        source = compile_module(args.definition)
+    except CommonTransformationError as e:
+        sys.stderr.write(u'{0}\n'.format(e))
+        return 1
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(source)
+    else:
+        sys.stdout.write(source)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())                                     # pragma: no cover
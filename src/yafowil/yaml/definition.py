@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+from node.utils import UNSET
+from types import MappingProxyType
+from yafowil.compat import ITER_TYPES
+from yafowil.compat import STR_TYPE
+
+
+CUSTOM_KEYS = (
+    'extractors',
+    'edit_renderers',
+    'preprocessors',
+    'builders',
+    'display_renderers'
+)
+
+
+def freeze(value):
+    """Convert loaded definition data to an immutable representation.
+
+    Dicts are converted to read only mapping proxies and lists to tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType(
+            dict([(k, freeze(v)) for k, v in value.items()])
+        )
+    if isinstance(value, list):
+        return tuple([freeze(v) for v in value])
+    return value
+
+
+def thaw(value):
+    """Create mutable copy of frozen definition data.
+
+    Since loaded definitions never contain tuples, all tuples are converted
+    back to lists.
+    """
+    if isinstance(value, MappingProxyType):
+        return dict([(k, thaw(v)) for k, v in value.items()])
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def iter_values(value):
+    """Yield all strings contained in frozen definition data.
+    """
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, MappingProxyType):
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, tuple):
+            stack.extend(reversed(value))
+        elif isinstance(value, STR_TYPE):
+            yield value
+
+
+class WidgetDefinition(object):
+    """Immutable widget definition.
+
+    Widget definitions are created once from loaded data and only read while
+    creating widget trees, thus they can be shared between parser runs and
+    threads.
+    """
+    __slots__ = (
+        'name',
+        'factory',
+        'value',
+        'props',
+        'custom',
+        'mode',
+        'nest',
+        'widgets'
+    )
+
+    def __init__(
+        self,
+        name=None,
+        factory='form',
+        value=UNSET,
+        props=MappingProxyType({}),
+        custom=(),
+        mode='edit',
+        nest=None,
+        widgets=()
+    ):
+        setattr_ = object.__setattr__
+        setattr_(self, 'name', name)
+        setattr_(self, 'factory', factory)
+        setattr_(self, 'value', value)
+        setattr_(self, 'props', props)
+        setattr_(self, 'custom', custom)
+        setattr_(self, 'mode', mode)
+        setattr_(self, 'nest', nest)
+        setattr_(self, 'widgets', widgets)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Widget definition is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Widget definition is immutable')
+
+    def __repr__(self):
+        return '<{0} name={1!r} factory={2!r} nest={3!r}>'.format(
+            self.__class__.__name__,
+            self.name,
+            self.factory,
+            self.nest
+        )
+
+    @classmethod
+    def from_data(cls, data, name=None):
+        """Create widget definition from loaded YAML or JSON data.
+
+        ``name`` takes precedence over name contained in ``data``. It is
+        passed for child widgets, where the name is the key of the child
+        definition.
+        """
+        # child definitions are created before their parent. an explicit stack
+        # is used instead of recursion to support arbitrary depth
+        stack = [(data, name, iter(data.get('widgets', [])), list())]
+        while True:
+            data, name, children, widgets = stack[-1]
+            for child in children:
+                for key in child:
+                    child_name = key
+                    break
+                child_data = child[child_name]
+                stack.append((
+                    child_data,
+                    child_name,
+                    iter(child_data.get('widgets', [])),
+                    list()
+                ))
+                break
+            else:
+                stack.pop()
+                definition = cls._create(data, name, tuple(widgets))
+                if not stack:
+                    return definition
+                stack[-1][3].append(definition)
+
+    @classmethod
+    def _create(cls, data, name, widgets):
+        if name is None:
+            name = data.get('name', None)
+        custom = list()
+        for custom_key, custom_value in data.get('custom', dict()).items():
+            parts = list()
+            for key in CUSTOM_KEYS:
+                part = custom_value.get(key, [])
+                if not type(part) in ITER_TYPES:
+                    part = [part]
+                parts.append(tuple([freeze(pt) for pt in part]))
+            custom.append((custom_key, tuple(parts)))
+        return cls(
+            name=name,
+            factory=freeze(data.get('factory', 'form')),  # defaults to 'form'
+            value=freeze(data.get('value', UNSET)),
+            props=freeze(data.get('props', dict())),
+            custom=tuple(custom),
+            mode=freeze(data.get('mode', 'edit')),
+            nest=data.get('nest'),
+            widgets=widgets
+        )
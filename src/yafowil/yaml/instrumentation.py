@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+import threading
+import time
+
+
+class Instrumentation(object):
+    """Collect timings and counters of parser runs.
+
+    Pass an instance as ``instrumentation`` to ``YAMLParser`` respective
+    ``parse_from_YAML``. Recorded timing phases are:
+
+    ``io``
+        Reading definition files.
+
+    ``scan``
+        Parsing YAML or JSON source.
+
+    ``load_definition``
+        Creating widget definitions from loaded data.
+
+    ``nest``
+        Resolving and loading nested definitions.
+
+    ``resolve``
+        Parsing definition values, i.e. resolving dotted names, expressions
+        and i18n messages.
+
+    ``factory``
+        Calling ``yafowil.base.factory``.
+
+    ``total``
+        Complete parser run.
+
+    Recorded counters are ``nodes``, ``expressions`` and ``nest_loads``.
+    """
+
+    def __init__(self):
+        self.timings = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.hooks = list()
+        self._lock = threading.Lock()
+
+    def subscribe(self, hook):
+        """Register hook called with ``kind``, ``name`` and ``value`` on every
+        recorded timing and counter. ``kind`` is either ``timing`` or
+        ``counter``.
+        """
+        self.hooks.append(hook)
+
+    def unsubscribe(self, hook):
+        self.hooks.remove(hook)
+
+    def timing(self, name, seconds):
+        with self._lock:
+            self.timings[name] += seconds
+        for hook in self.hooks:
+            hook('timing', name, seconds)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+        for hook in self.hooks:
+            hook('counter', name, value)
+
+    def timer(self):
+        return time.perf_counter()
+
+    def metrics(self, prefix=''):
+        """Return flat dict containing timings in seconds and counters.
+        """
+        with self._lock:
+            metrics = dict([
+                ('{0}{1}.seconds'.format(prefix, name), value)
+                for name, value in self.timings.items()
+            ])
+            metrics.update([
+                ('{0}{1}'.format(prefix, name), value)
+                for name, value in self.counters.items()
+            ])
+        return metrics
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
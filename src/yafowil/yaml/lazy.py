@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from yafowil.base import Widget
+
+
+class LazyWidget(Widget):
+    """Widget creating its children on first access.
+
+    Children are created by calling ``materialize`` with the widget as
+    argument once the child storage gets accessed, e.g. while rendering,
+    extracting or iterating the widget.
+    """
+
+    @property
+    def storage(self):
+        storage = super(LazyWidget, self).storage
+        materialize = self.__dict__.pop('_materialize', None)
+        if materialize is not None:
+            materialize(self)
+        return storage
+
+    @property
+    def materialized(self):
+        return '_materialize' not in self.__dict__
+
+
+def lazy_widget(widget, materialize):
+    """Create lazy widget from widget created by factory.
+
+    Children added to ``widget`` by builders are taken over, ``materialize``
+    gets called on first access of the children of the created widget.
+    """
+    lazy = LazyWidget(
+        widget.blueprints,
+        widget.extractors,
+        widget.edit_renderers,
+        widget.display_renderers,
+        widget.preprocessors,
+        uniquename=widget.name,
+        value_or_getter=widget.getter,
+        properties=widget.properties,
+        custom=widget.custom,
+        defaults=widget.defaults,
+        mode=widget.mode
+    )
+    # attributes and children might have been added by builders
+    lazy.attrs.storage.update(widget.attrs.storage)
+    for name, child in list(widget.items()):
+        del widget[name]
+        lazy[name] = child
+    lazy.__dict__['_materialize'] = materialize
+    return lazy
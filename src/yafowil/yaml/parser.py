@@ -1,43 +1,250 @@
 # -*- coding: utf-8 -*-
-from node.utils import UNSET
-from yafowil.base import factory
-from yafowil.compat import ITER_TYPES
+from types import MappingProxyType
 from yafowil.compat import STR_TYPE
-from yaml.error import YAMLError
-import importlib
+from yafowil.yaml.cache import callable_cache
+from yafowil.yaml.cache import definition_cache
+from yafowil.yaml.cache import expression_cache
+from yafowil.yaml.cache import message_cache
+from yafowil.yaml.cache import resource_cache
+from yafowil.yaml.cache import source_cache
+from yafowil.yaml.definition import WidgetDefinition
+from yafowil.yaml.definition import iter_values
+from yafowil.yaml.definition import thaw
+import hashlib
+import importlib.resources
 import json
 import os
+import pathlib
+import re
 import sys
-import yafowil.loader  # noqa  # loads registry
-import yaml
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# fast JSON backend, stdlib ``json`` is used as fallback
+json_backend = orjson.loads if orjson is not None else None
+_default_json_backend = json_backend
+
+
+def get_yaml_loader():
+    """Return default YAML loader. PyYAML is imported on first use.
+
+    The default loader is customizable by setting ``yaml_loader`` on this
+    module.
+    """
+    loader = globals().get('yaml_loader')
+    if loader is None:
+        import yaml
+        # use libyaml based loader if available, it is significantly faster
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        globals()['yaml_loader'] = loader
+    return loader
+
+
+_factory = None
+
+
+def widget_factory():
+    """Return yafowil widget factory. The widget registry gets loaded on
+    first use.
+    """
+    global _factory
+    if _factory is None:
+        from yafowil.base import factory
+        import yafowil.loader  # noqa  # loads registry
+        _factory = factory
+    return _factory
+
+
+def __getattr__(name):
+    # ``yaml_loader`` gets computed on first access
+    if name == 'yaml_loader':
+        return get_yaml_loader()
+    raise AttributeError(
+        "module '{0}' has no attribute '{1}'".format(__name__, name)
+    )
+
+
+# package resource like ``my.package:forms/form.yaml``. single characters
+# followed by a path separator are windows drive letters
+resource_spec = re.compile(r'^[A-Za-z_][\w.]*:(?![\\/])')
+
+
+def is_resource(path):
+    """Check whether path is a package resource specification.
+    """
+    return path is not None and resource_spec.match(path) is not None
+
+
+def resolve_resource(spec):
+    """Return ``importlib.resources`` traversable for package resource.
+    """
+    package, subpath = spec.split(':')
+    return importlib.resources.files(package).joinpath(*subpath.split('/'))
 
 
 def translate_path(path):
-    if path.find(':') > -1:
-        package, subpath = path.split(':')
-        subpath = subpath.split('/')
-        # importlib.resources.path is clumsy below python 3.13
-        with importlib.resources.path(package, subpath[0]) as path:
-            for part in subpath[1:]:
-                path = path / part
-            return str(path)
-    return path
+    """Translate package resource to file system path.
+
+    Package resources not located on the file system, e.g. in zipped
+    packages, are returned unchanged and read via ``importlib.resources``.
+    Results are cached in ``yafowil.yaml.cache.resource_cache``.
+    """
+    if not is_resource(path):
+        return path
+    translated = resource_cache.get(path)
+    if translated is None:
+        resource = resolve_resource(path)
+        if isinstance(resource, pathlib.Path):
+            translated = str(resource)
+        else:
+            translated = path
+        resource_cache.set(path, translated)
+    return translated
+
+
+def compile_expression(source):
+    """Compile expression source to code object.
+
+    Code objects are cached and shared between parser runs.
+    """
+    code = expression_cache.get(source)
+    if code is None:
+        code = compile(source, '<expression>', 'eval')
+        expression_cache.set(source, code)
+    return code
+
+
+#: Source of functions created for ``expr:`` expressions.
+callable_template = 'lambda widget=None, data=None: (\n{0}\n)'
+
+
+def compile_callable(source):
+    """Compile expression source to code object creating a function, which
+    accepts ``widget`` and ``data`` and returns the expression result.
+
+    Expression source is compiled with ``compile_expression`` first, thus
+    syntax errors are reported for the original source. Code objects are
+    cached in ``callable_cache``.
+    """
+    compile_expression(source)
+    code = callable_cache.get(source)
+    if code is None:
+        code = compile(
+            callable_template.format(source),
+            '<expression>',
+            'eval'
+        )
+        callable_cache.set(source, code)
+    return code
+
+
+def parse_message(value):
+    """Parse ``i18n:`` definition value.
+
+    Return ``(msgid, default)`` tuple, ``default`` is ``None`` if value
+    contains no default.
+    """
+    parts = value.split(':')
+    if len(parts) > 3:
+        raise YAMLTransformationError('to many : in {0}'.format(value))
+    if len(parts) == 2:
+        return parts[1], None
+    return parts[1], parts[2]
+
+
+_marker = object()
+
+
+def resolve_name(value):
+    """Resolve dotted name to callable defined in an imported module.
+
+    Return ``None`` if name cannot be resolved or does not point to a
+    callable. Names are looked up on each call, thus reloaded modules and
+    replaced attributes are taken into account.
+    """
+    names = value.split('.')
+    part = sys.modules.get(names[0])
+    if part is None:
+        return None
+    for name in names[1:]:
+        part = getattr(part, name, None)
+        if part is None:
+            return None
+    return part if callable(part) else None
 
 
 def parse_from_YAML(
     path,
     context=None,
     message_factory=None,
-    expression_globals={}
+    expression_globals=None,
+    cache=definition_cache,
+    yaml_loader=None,
+    nest_cache=None,
+    disk_cache=None,
+    instrumentation=None,
+    symbolic_props=None,
+    lazy=False,
+    nest_resolver=None,
+    message_cache=message_cache
 ):
     return YAMLParser(
         translate_path(path),
         context,
         message_factory,
-        expression_globals
+        expression_globals,
+        cache,
+        yaml_loader,
+        nest_cache,
+        disk_cache,
+        instrumentation,
+        symbolic_props,
+        lazy,
+        nest_resolver,
+        message_cache
     )()
 
 
+def parse_from_source(
+    source,
+    format=None,
+    context=None,
+    message_factory=None,
+    expression_globals=None,
+    cache=source_cache,
+    yaml_loader=None,
+    instrumentation=None,
+    symbolic_props=None,
+    lazy=False,
+    nest_resolver=None,
+    message_cache=message_cache
+):
+    """Create widget tree from form definition ``source``.
+
+    See ``YAMLParser.load_source`` for supported sources. If no
+    ``nest_resolver`` is given, nested definitions are loaded from files
+    relative to the current working directory.
+    """
+    parser = YAMLParser(
+        None,
+        context=context,
+        message_factory=message_factory,
+        expression_globals=expression_globals,
+        yaml_loader=yaml_loader,
+        instrumentation=instrumentation,
+        symbolic_props=symbolic_props,
+        lazy=lazy,
+        nest_resolver=nest_resolver,
+        message_cache=message_cache
+    )
+    return parser.create_tree(parser.load_source(source, format, cache=cache))
+
+
 class CommonTransformationError(Exception):
     """Raised if yafowil widget tree could not be build by YAML definitions.
     """
@@ -53,6 +260,17 @@ class JSONTransformationError(CommonTransformationError):
     """
 
 
+def expression_error(name, path, e):
+    """Return ``YAMLTransformationError`` reporting that an expression of
+    widget ``name`` defined in ``path`` cannot be compiled due to ``e``.
+    """
+    msg = (
+        u"Cannot compile expression of widget '{0}' in '{1}'. "
+        u"Original exception was:\n{2}: {3}"
+    ).format(name, path, e.__class__.__name__, e)
+    return YAMLTransformationError(msg)
+
+
 class TBSupplement(object):
 
     def __init__(self, obj, msg):
@@ -66,6 +284,253 @@ class TBSupplement(object):
 python_expression_globals = {}
 
 
+class DefinitionLoader(object):
+    """Loader for form definition files of a specific format.
+    """
+    #: Format name, used as disk cache kind and in error messages.
+    name = None
+    #: File name endings handled by this loader.
+    extensions = ()
+    #: Optional callable getting passed the first bytes of a file without
+    #: known extension. Returns whether the file is handled by this loader.
+    sniff = None
+    #: Whether file is read as bytes.
+    binary = False
+    #: Exceptions raised by ``loads`` if source cannot be parsed.
+    errors = (SyntaxError, ValueError)
+    #: Error raised if file cannot be loaded.
+    error_class = CommonTransformationError
+
+    def loads(self, parser, source):
+        """Return data loaded from ``source``.
+        """
+        raise NotImplementedError(
+            'Abstract ``DefinitionLoader`` does not implement ``loads``'
+        )
+
+    def error(self, parser, source, e):
+        """Return exception to report if ``source`` cannot be parsed.
+        """
+        return e
+
+    def backend(self, parser):
+        """Return backend used by ``loads``, e.g. the YAML loader class, or
+        ``None``. Used in disk cache keys.
+        """
+        return None
+
+    def load(self, parser, path):
+        try:
+            source = parser.read_file(path, binary=self.binary)
+        except IOError:
+            msg = u"File not found: '{0}'".format(path)
+            raise self.error_class(msg)
+        return self.load_source(parser, source, path)
+
+    def load_source(self, parser, source, path='<source>'):
+        """Return data loaded from ``source``, which is either a string or
+        bytes. ``path`` is used in error messages.
+        """
+        if self.binary and not isinstance(source, bytes):
+            source = source.encode('utf-8')
+        try:
+            return parser.scan(
+                source,
+                self.name,
+                lambda source: self.loads(parser, source),
+                self.backend(parser)
+            )
+        except self.errors as e:
+            e = self.error(parser, source, e)
+            msg = (
+                u"Cannot parse {0} from given path '{1}'. "
+                u"Original exception was:\n{2}: {3}"
+            ).format(self.name.upper(), path, e.__class__.__name__, e)
+            raise self.error_class(msg)
+
+
+class YAMLLoader(DefinitionLoader):
+    name = 'yaml'
+    extensions = ('yaml', 'yml')
+    error_class = YAMLTransformationError
+
+    @property
+    def errors(self):
+        from yaml.error import YAMLError
+        return (YAMLError,)
+
+    def backend(self, parser):
+        loader = parser.yaml_loader
+        if loader is None:
+            loader = get_yaml_loader()
+        return loader
+
+    def loads(self, parser, source):
+        import yaml
+        return yaml.load(source, self.backend(parser))
+
+    def error(self, parser, source, e):
+        import yaml
+        loader = self.backend(parser)
+        if loader is getattr(yaml, 'CSafeLoader', None):
+            # libyaml does not provide problem snippets, parse again with
+            # pure python loader to get identical error messages
+            try:
+                yaml.load(source, yaml.SafeLoader)
+            except yaml.YAMLError as err:
+                e = err
+        return e
+
+
+class JSONLoader(DefinitionLoader):
+    name = 'json'
+    extensions = ('json',)
+    error_class = JSONTransformationError
+
+    def sniff(self, head):
+        # JSON objects start with ``{`` followed by a key or ``}``, which
+        # distinguishes them from most YAML flow mappings
+        head = head.lstrip()
+        if head.startswith(b'['):
+            return True
+        return head.startswith(b'{') and head[1:].lstrip()[:1] in (
+            b'"',
+            b'}'
+        )
+
+    def backend(self, parser):
+        return json_backend if json_backend is not None else json.loads
+
+    def loads(self, parser, source):
+        if json_backend is not None:
+            try:
+                return json_backend(source)
+            except ValueError:
+                # stdlib ``json`` accepts ``NaN`` and ``Infinity`` and is used
+                # for consistent error messages
+                pass
+        return json.loads(source)
+
+
+class LoaderRegistry(object):
+    """Registry of definition loaders.
+
+    Loaders are looked up by file name ending. If no loader handles the
+    ending, registered sniffing loaders are asked with the first bytes of the
+    file. Falls back to ``default``.
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self.loaders = list()
+
+    def register(self, loader):
+        """Register loader. Loaders registered later take precedence.
+        """
+        self.loaders.insert(0, loader)
+
+    def unregister(self, loader):
+        self.loaders.remove(loader)
+
+    def get(self, name):
+        """Return loader by format name.
+        """
+        for loader in self.loaders:
+            if loader.name == name:
+                return loader
+        raise KeyError(u"No definition loader for '{0}'".format(name))
+
+    def lookup(self, path):
+        for loader in self.loaders:
+            for extension in loader.extensions:
+                if path.endswith(extension):
+                    return loader
+        if any([loader.sniff for loader in self.loaders]):
+            try:
+                with open(path, 'rb') as file:
+                    head = file.read(64)
+            except IOError:
+                # let default loader report missing file
+                return self.default
+            return self.sniff(head)
+        return self.default
+
+    def sniff(self, head):
+        """Return loader by first bytes of source.
+        """
+        for loader in self.loaders:
+            if loader.sniff and loader.sniff(head):
+                return loader
+        return self.default
+
+
+yaml_definition_loader = YAMLLoader()
+json_definition_loader = JSONLoader()
+definition_loaders = LoaderRegistry(default=yaml_definition_loader)
+definition_loaders.register(yaml_definition_loader)
+definition_loaders.register(json_definition_loader)
+
+
+class NestResolver(object):
+    """Resolver for ``nest`` references of form definitions.
+    """
+
+    def resolve(self, parser, nest):
+        """Return key of nested definition. The key is used for detecting
+        circular nesting and in error messages.
+        """
+        raise NotImplementedError(
+            'Abstract ``NestResolver`` does not implement ``resolve``'
+        )
+
+    def load(self, parser, key):
+        """Return widget definition by key.
+        """
+        raise NotImplementedError(
+            'Abstract ``NestResolver`` does not implement ``load``'
+        )
+
+
+class FileNestResolver(NestResolver):
+    """Resolve nest references to files relative to ``directory``.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def resolve(self, parser, nest):
+        return os.path.abspath(os.path.join(
+            self.directory,
+            translate_path(nest)
+        ))
+
+    def load(self, parser, key):
+        return parser.load(key)
+
+
+class SourceNestResolver(NestResolver):
+    """Resolve nest references by calling ``lookup`` with the reference,
+    which returns the source of the nested definition, e.g. read from a
+    database.
+    """
+
+    def __init__(self, lookup, format=None, cache=source_cache):
+        self.lookup = lookup
+        self.format = format
+        self.cache = cache
+
+    def resolve(self, parser, nest):
+        return nest
+
+    def load(self, parser, key):
+        return parser.load_source(
+            self.lookup(key),
+            self.format,
+            path=key,
+            cache=self.cache
+        )
+
+
 class YAMLParser(object):
 
     def __init__(
@@ -73,153 +538,487 @@ class YAMLParser(object):
         path,
         context=None,
         message_factory=None,
-        expression_globals={}
+        expression_globals=None,
+        cache=definition_cache,
+        yaml_loader=None,
+        nest_cache=None,
+        disk_cache=None,
+        instrumentation=None,
+        symbolic_props=None,
+        lazy=False,
+        nest_resolver=None,
+        message_cache=message_cache
     ):
         self.path = path
         self.context = context
         self.message_factory = message_factory
-        self.expression_globals = expression_globals
+        self.expression_globals = (
+            expression_globals if expression_globals is not None else {}
+        )
+        self.cache = cache
+        self.yaml_loader = yaml_loader
+        self.nest_cache = nest_cache
+        self.disk_cache = disk_cache
+        self.instrumentation = instrumentation
+        # names of properties containing dotted names to resolve. if None,
+        # dotted names are resolved in all properties
+        self.symbolic_props = (
+            frozenset(symbolic_props) if symbolic_props is not None else None
+        )
+        # children of nested definitions get created on first access
+        self.lazy = lazy
+        self.nest_resolver = nest_resolver
+        # i18n messages are created once per message factory and value. pass
+        # ``None`` for message factories translating eagerly
+        self.message_cache = message_cache
 
     def __call__(self):
-        return self.create_tree(self.load(self.path))
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self.create_tree(self.load(self.path))
+        start = instrumentation.timer()
+        tree = self.create_tree(self.load(self.path))
+        instrumentation.timing('total', instrumentation.timer() - start)
+        return tree
+
+    @property
+    def cache_variant(self):
+        """Identifier of the loaders used by this parser if they differ from
+        the defaults, otherwise ``None``. Loaded definitions are cached per
+        variant.
+        """
+        if self.yaml_loader is None and json_backend is _default_json_backend:
+            return None
+        return (self.yaml_loader, json_backend)
 
     def load(self, path):
-        if path.endswith('json'):
-            # we support json too
-            return self.load_json(path)
-        return self.load_yaml(path)
+        # widget definitions are shared between parser runs if cache is used
+        if self.cache is not None:
+            return self.cache.load(
+                path,
+                self.load_definition,
+                immutable=is_resource(path),
+                variant=self.cache_variant
+            )
+        return self.load_definition(path)
 
-    def load_json(self, path):
-        data = None
-        try:
-            with open(path, 'r') as file:
-                data = json.load(file)
-        except (SyntaxError, ValueError) as e:
-            msg = (
-                u"Cannot parse JSON from given path '{0}'. "
-                u"Original exception was:\n{1}: {2}"
-            ).format(path, e.__class__.__name__, e)
-            raise JSONTransformationError(msg)
-        except IOError:
-            msg = u"File not found: '{0}'".format(path)
-            raise JSONTransformationError(msg)
+    def load_definition(self, path):
+        data = self.load_file(path)
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return WidgetDefinition.from_data(data)
+        start = instrumentation.timer()
+        definition = WidgetDefinition.from_data(data)
+        instrumentation.timing(
+            'load_definition',
+            instrumentation.timer() - start
+        )
+        return definition
+
+    def open_file(self, path, binary=False):
+        """Open definition file, which is either a file system path or a
+        package resource not located on the file system.
+        """
+        if is_resource(path):
+            return resolve_resource(path).open(
+                'rb' if binary else 'r',
+                **({} if binary else {'encoding': 'utf-8'})
+            )
+        return open(path, 'rb' if binary else 'r')
+
+    def read_file(self, path, binary=False):
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = instrumentation.timer()
+        with self.open_file(path, binary=binary) as file:
+            source = file.read()
+        if instrumentation is not None:
+            instrumentation.timing('io', instrumentation.timer() - start)
+        return source
+
+    def scan(self, source, kind, loader, backend=None):
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = instrumentation.timer()
+        if self.disk_cache is not None:
+            data = self.disk_cache.load(source, kind, loader, backend)
+        else:
+            data = loader(source)
+        if instrumentation is not None:
+            instrumentation.timing('scan', instrumentation.timer() - start)
         return data
 
-    def load_yaml(self, path):
-        data = None
+    def load_source(self, source, format=None, path='<source>', cache=None):
+        """Return widget definition loaded from ``source``.
+
+        ``source`` is either a dict containing loaded data, a string, bytes,
+        an object supporting the buffer protocol like ``memoryview`` or
+        ``mmap.mmap``, or a file like object. ``format`` is the name of the
+        definition loader. If omitted, the loader is detected by sniffing,
+        defaulting to YAML. ``path`` is used in error messages. Definitions
+        are cached in ``cache`` by content hash and ``cache_variant``.
+        """
+        if isinstance(source, dict):
+            return WidgetDefinition.from_data(source)
+        if hasattr(source, 'read'):
+            source = source.read()
+        if isinstance(source, STR_TYPE):
+            content = source.encode('utf-8')
+        else:
+            # hash buffers without copying
+            content = source if isinstance(source, bytes) else memoryview(
+                source
+            ).cast('B')
         try:
-            with open(path, 'r') as file:
-                data = yaml.load(file.read(), yaml.SafeLoader)
-        except YAMLError as e:
-            msg = (
-                u"Cannot parse YAML from given path '{0}'. "
-                u"Original exception was:\n{1}: {2}"
-            ).format(path, e.__class__.__name__, e)
-            raise YAMLTransformationError(msg)
-        except IOError:
-            msg = u"File not found: '{0}'".format(path)
+            if format is not None:
+                loader = definition_loaders.get(format)
+            else:
+                loader = definition_loaders.sniff(bytes(content[:64]))
+            if cache is not None:
+                key = (
+                    loader.name,
+                    self.cache_variant,
+                    hashlib.sha256(content).hexdigest()
+                )
+                definition = cache.get(key)
+                if definition is not None:
+                    return definition
+            if not isinstance(source, STR_TYPE):
+                source = bytes(content)
+        finally:
+            # release buffer, otherwise mmap cannot be closed
+            if isinstance(content, memoryview):
+                content.release()
+        definition = WidgetDefinition.from_data(
+            loader.load_source(self, source, path)
+        )
+        if cache is not None:
+            cache.set(key, definition)
+        return definition
+
+    def load_file(self, path):
+        return definition_loaders.lookup(path).load(self, path)
+
+    def load_json(self, path):
+        return json_definition_loader.load(self, path)
+
+    def load_yaml(self, path):
+        return yaml_definition_loader.load(self, path)
+
+    def resolve_nest_path(self, nest):
+        cache = self.nest_cache
+        if cache is not None:
+            key = (self.path, nest)
+            nest_path = cache.get(key)
+            if nest_path is not None:
+                return nest_path
+        nest_path = translate_path(nest)
+        # case same directory as main form yaml
+        if (
+            self.path is not None
+            and not is_resource(nest_path)
+            and len([it for it in os.path.split(nest_path) if it]) == 1
+        ):
+            if is_resource(self.path):
+                # main form is a package resource not on file system
+                if '/' in self.path:
+                    base_path = self.path.rsplit('/', 1)[0] + '/'
+                else:
+                    base_path = self.path.split(':')[0] + ':'
+                nest_path = base_path + nest_path
+            else:
+                base_path = self.path.split(os.path.sep)[:-1]
+                nest_path = [os.path.sep] + base_path + [nest_path]
+                nest_path = os.path.join(*nest_path)
+        if cache is not None:
+            cache.set(key, nest_path)
+        return nest_path
+
+    def load_nested(self, nest, chain, nested=None):
+        """Resolve and load nested definition.
+
+        ``chain`` is a tuple of absolute paths of the definitions including
+        this one. ``nested`` is an optional dict used to resolve and load each
+        nested definition only once. Return tuple containing nest path,
+        absolute nest path and widget definition.
+        """
+        entry = nested.get(nest) if nested is not None else None
+        if entry is None:
+            instrumentation = self.instrumentation
+            if instrumentation is not None:
+                start = instrumentation.timer()
+            resolver = self.nest_resolver
+            if resolver is not None:
+                key = resolver.resolve(self, nest)
+                entry = (key, key, resolver.load(self, key))
+            else:
+                nest_path = self.resolve_nest_path(nest)
+                entry = (
+                    nest_path,
+                    os.path.abspath(nest_path),
+                    self.load(nest_path)
+                )
+            if nested is not None:
+                nested[nest] = entry
+            if instrumentation is not None:
+                instrumentation.timing('nest', instrumentation.timer() - start)
+                instrumentation.count('nest_loads')
+        if entry[1] in chain:
+            msg = u"Circular nesting detected: {0}".format(
+                u' -> '.join(chain + (entry[1],))
+            )
             raise YAMLTransformationError(msg)
-        return data
+        return entry
 
-    def create_tree(self, data):
-        def call_factory(defs):
+    def create_widget(self, definition, path=None):
+        """Create widget from widget definition without children.
+        """
+        factory = _factory or widget_factory()
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = instrumentation.timer()
+        try:
+            # props get modified by factory, always pass new dict
             props = dict()
-            props = self.parse_attribute(defs.get('props', dict()))
+            for key, value in definition.props.items():
+                props[key] = self.parse_prop(key, value)
             custom = dict()
-            for custom_key, custom_value in defs.get('custom', dict()).items():
-                custom_props = list()
-                for key in [
-                    'extractors',
-                    'edit_renderers',
-                    'preprocessors',
-                    'builders',
-                    'display_renderers'
-                ]:
-                    part = custom_value.get(key, [])
-                    if not type(part) in ITER_TYPES:
-                        part = [part]
-                    part = [self.parse_definition_value(pt) for pt in part]
-                    custom_props.append(part)
-                custom[custom_key] = custom_props
+            if definition.custom:
+                parse_value = self.parse_definition_value
+                for custom_key, parts in definition.custom:
+                    custom[custom_key] = [
+                        [parse_value(pt) for pt in part] for part in parts
+                    ]
+            value = self.parse_definition_value(definition.value)
+            mode = self.parse_definition_value(definition.mode)
+        except SyntaxError as e:
+            raise expression_error(
+                definition.name,
+                path if path is not None else self.path,
+                e
+            )
+        if instrumentation is None:
             return factory(
-                defs.get('factory', 'form'),  # defaults to 'form'
-                name=defs.get('name', None),
-                value=self.parse_definition_value(defs.get('value', UNSET)),
+                thaw(definition.factory),
+                name=definition.name,
+                value=value,
                 props=props,
                 custom=custom,
-                mode=self.parse_definition_value(defs.get('mode', 'edit')),
+                mode=mode,
             )
+        resolved = instrumentation.timer()
+        instrumentation.timing('resolve', resolved - start)
+        widget = factory(
+            thaw(definition.factory),
+            name=definition.name,
+            value=value,
+            props=props,
+            custom=custom,
+            mode=mode,
+        )
+        instrumentation.timing('factory', instrumentation.timer() - resolved)
+        instrumentation.count('nodes')
+        return widget
 
-        def create_children(node, children_defs):
-            for child in children_defs:
-                for key in child:
-                    name = key
-                    break
-                child_def = child[name]
-                child_def['name'] = name
-                # sub form nesting
-                nest = child_def.get('nest')
-                if nest:
-                    nest_path = translate_path(nest)
-                    # case same directory as main form yaml
-                    if len([it for it in os.path.split(nest_path) if it]) == 1:
-                        base_path = self.path.split(os.path.sep)[:-1]
-                        nest_path = [os.path.sep] + base_path + [nest_path]
-                        nest_path = os.path.join(*nest_path)
-                    node[name] = self.create_tree(self.load(nest_path))
-                # regular child parsing
-                else:
-                    node[name] = call_factory(child_def)
-                    create_children(node[name], child_def.get('widgets', []))
-        root = call_factory(data)
-        create_children(root, data.get('widgets', []))
+    def create_tree(self, definition, path=None, nested=None):
+        """Create widget tree from widget definition.
+
+        ``nested`` is an optional dict containing already loaded nested
+        definitions like used by ``load_nested``.
+        """
+        if path is None:
+            path = self.path
+        if not isinstance(definition, WidgetDefinition):
+            definition = WidgetDefinition.from_data(definition)
+        root = self.create_widget(definition, path)
+        chain = (os.path.abspath(path),) if path is not None else ()
+        # nested definitions get resolved and loaded once per parser run
+        if nested is None:
+            nested = dict()
+        self.create_children(root, definition, path, chain, nested)
         return root
 
-    def parse_attribute(self, value):
-        if not isinstance(value, dict):
-            return self.parse_definition_value(value)
-        for k, v in value.items():
-            if isinstance(v, dict):
-                self.parse_attribute(v)
-            else:
-                value[k] = self.parse_definition_value(v)
-        return value
+    def create_children(self, widget, definition, path, chain, nested):
+        """Create children of ``widget`` from child widget definitions of
+        ``definition``.
 
-    def parse_definition_value(self, value):
+        ``chain`` is a tuple of absolute paths of the definitions including
+        ``definition``. ``nested`` is a dict used to resolve and load each
+        nested definition only once.
+        """
+        create_widget = self.create_widget
+        # widgets are created depth first in definition order. an explicit
+        # stack is used instead of recursion to support arbitrary depth
+        stack = [(widget, iter(definition.widgets), path, chain)]
+        while stack:
+            node, children, path, chain = stack[-1]
+            child_def = next(children, None)
+            if child_def is None:
+                stack.pop()
+                continue
+            name = child_def.name
+            # sub form nesting
+            nest = child_def.nest
+            if nest:
+                path, key, child_def = self.load_nested(nest, chain, nested)
+                chain = chain + (key,)
+                if self.lazy:
+                    node[name] = self.create_lazy(
+                        child_def,
+                        path,
+                        chain,
+                        nested
+                    )
+                    continue
+            widget = node[name] = create_widget(child_def, path)
+            if child_def.widgets:
+                stack.append((widget, iter(child_def.widgets), path, chain))
+
+    def create_lazy(self, definition, path, chain, nested):
+        """Create widget from widget definition, children get created on
+        first access.
+        """
+        def materialize(widget):
+            self.create_children(widget, definition, path, chain, nested)
+        from yafowil.yaml.lazy import lazy_widget
+        return lazy_widget(self.create_widget(definition, path), materialize)
+
+    @property
+    def python_globals(self):
+        """Globals of ``python:`` expressions.
+
+        Merged once per parser from ``python_expression_globals`` and
+        ``expression_globals`` on first access.
+        """
+        python_globals = self.__dict__.get('_python_globals')
+        if python_globals is None:
+            python_globals = dict(python_expression_globals)
+            python_globals.update(self.expression_globals)
+            self._python_globals = python_globals
+        return python_globals
+
+    @property
+    def context_globals(self):
+        """Globals of ``expr:`` expressions. Shared by all functions created
+        for ``expr:`` expressions of this parser.
+        """
+        context_globals = self.__dict__.get('_context_globals')
+        if context_globals is None:
+            context_globals = self._context_globals = dict(
+                context=self.context
+            )
+        return context_globals
+
+    def create_message(self, value):
+        """Create message for ``i18n:`` definition value.
+
+        Messages are created once per message factory and value and cached in
+        ``message_cache`` if given.
+        """
+        message_factory = self.message_factory
+        cache = self.message_cache
+        if cache is not None:
+            cache = cache.get(message_factory)
+        if cache is not None:
+            message = cache.get(value, _marker)
+            if message is not _marker:
+                return message
+        msgid, default = parse_message(value)
+        if default is None:
+            message = message_factory(msgid)
+        else:
+            message = message_factory(msgid, default=default)
+        if cache is not None:
+            cache.set(value, message)
+        return message
+
+    def extract_messages(self, definition=None):
+        """Return list of ``(msgid, default)`` tuples of all ``i18n:`` values
+        contained in ``definition`` and its nested definitions.
+
+        If no definition is given, the definition of the parser path is
+        loaded. Each message is contained once, in order of occurrence.
+        ``default`` is ``None`` if value contains no default.
+        """
+        if definition is None:
+            definition = self.load(self.path)
+        path = self.path
+        chain = (os.path.abspath(path),) if path is not None else ()
+        nested = dict()
+        messages = dict()
+        stack = [(definition, chain)]
+        while stack:
+            definition, chain = stack.pop()
+            if definition.nest:
+                _, key, definition = self.load_nested(
+                    definition.nest,
+                    chain,
+                    nested
+                )
+                chain = chain + (key,)
+            stack.extend([
+                (child, chain) for child in reversed(definition.widgets)
+            ])
+            values = (
+                definition.props,
+                definition.custom,
+                definition.value,
+                definition.mode
+            )
+            for value in iter_values(values):
+                if value.startswith('i18n:'):
+                    messages.setdefault(parse_message(value), None)
+        return list(messages)
+
+    def parse_prop(self, name, value):
+        symbolic_props = self.symbolic_props
+        return self.parse_attribute(
+            value,
+            resolve=symbolic_props is None or name in symbolic_props
+        )
+
+    def parse_attribute(self, value, resolve=True):
+        if not isinstance(value, (dict, MappingProxyType)):
+            return self.parse_definition_value(value, resolve=resolve)
+        # create new dict, widget definition is immutable
+        return dict([
+            (k, self.parse_attribute(v, resolve=resolve))
+            for k, v in value.items()
+        ])
+
+    def parse_definition_value(self, value, resolve=True):
         if not isinstance(value, STR_TYPE):
-            return value
+            return thaw(value)
         if value.startswith('python:'):
-            expression_globals = {}
-            expression_globals.update(python_expression_globals)
-            expression_globals.update(self.expression_globals)
-            return eval(value[7:], expression_globals, {})
+            if self.instrumentation is not None:
+                self.instrumentation.count('expressions')
+            code = compile_expression(value[7:])
+            return eval(code, self.python_globals, {})
         elif value.startswith('expr:'):
+            if self.instrumentation is not None:
+                self.instrumentation.count('expressions')
+            expression = eval(
+                compile_callable(value[5:]),
+                self.context_globals
+            )
+
             def fetch_value(widget=None, data=None):
                 __traceback_supplement__ = (TBSupplement, self, str(value))
-                expression_globals = dict(
-                    context=self.context,
-                    widget=widget,
-                    data=data
-                )
-                return eval(value[5:], expression_globals, {})
+                return expression(widget, data)
             return fetch_value
         elif value.startswith('i18n:'):
-            parts = value.split(":")
-            if len(parts) > 3:
-                raise YAMLTransformationError('to many : in {0}'.format(value))
-            if len(parts) == 2:
-                return self.message_factory(parts[1])
-            return self.message_factory(parts[1], default=parts[2])
-        elif '.' not in value:
+            return self.create_message(value)
+        elif not resolve or '.' not in value:
             return value
         names = value.split('.')
-        if names[0] == 'context':
-            part = self.context
-        else:
-            try:
-                part = sys.modules[names[0]]
-            except KeyError:
+        # skip plain text containing periods
+        for name in names:
+            if not name.isidentifier():
                 return value
+        if names[0] != 'context':
+            part = resolve_name(value)
+            return part if part is not None else value
+        part = self.context
         for name in names[1:]:
             if hasattr(part, name):
                 part = getattr(part, name)
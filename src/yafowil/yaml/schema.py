@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+from yafowil.base import factory as yafowil_factory
+from yafowil.yaml.cache import DefinitionCache
+from yafowil.yaml.definition import CUSTOM_KEYS
+from yafowil.yaml.parser import CommonTransformationError
+from yafowil.yaml.parser import YAMLParser
+from yafowil.yaml.parser import definition_loaders
+from yafowil.yaml.parser import is_resource
+from yafowil.yaml.parser import translate_path
+from yafowil.yaml.parser import yaml_definition_loader
+from yaml.constructor import SafeConstructor
+from yaml.error import YAMLError
+from yaml.nodes import MappingNode
+from yaml.nodes import ScalarNode
+from yaml.nodes import SequenceNode
+from yaml.representer import SafeRepresenter
+import yafowil.loader  # noqa  # loads registry
+import yafowil.yaml.parser
+import yaml
+
+
+STR_TAG = 'tag:yaml.org,2002:str'
+MODES = ('edit', 'display', 'skip')
+
+
+def is_string(node):
+    return isinstance(node, ScalarNode) and node.tag == STR_TAG
+
+
+class DefinitionError(object):
+    """Error found while validating a form definition.
+
+    ``line`` and ``column`` are 1-based and ``None`` if the definition was not
+    loaded from YAML.
+    """
+    __slots__ = ('path', 'message', 'line', 'column')
+
+    def __init__(self, path, message, mark=None):
+        self.path = path
+        self.message = message
+        self.line = mark.line + 1 if mark is not None else None
+        self.column = mark.column + 1 if mark is not None else None
+
+    def __str__(self):
+        if self.line is None:
+            return u'{0}: {1}'.format(self.path, self.message)
+        return u'{0}:{1}:{2}: {3}'.format(
+            self.path,
+            self.line,
+            self.column,
+            self.message
+        )
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self)
+
+
+class DefinitionValidationError(CommonTransformationError):
+    """Raised if form definitions do not match the schema.
+
+    ``errors`` contains the ``DefinitionError`` instances.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        msg = u'Invalid form definition:\n{0}'.format(
+            u'\n'.join([str(error) for error in errors])
+        )
+        super(DefinitionValidationError, self).__init__(msg)
+
+
+class Schema(object):
+    """Compiled schema for structural validation of form definitions.
+
+    Definitions are validated in a single pass over the YAML node tree,
+    reporting all errors with line and column. Blueprints are checked
+    against the registry of ``factory``, pass ``None`` to skip the check.
+    Validation results of files are cached in ``cache``, which defaults to a
+    new ``yafowil.yaml.cache.DefinitionCache``.
+    """
+
+    def __init__(self, factory=yafowil_factory, cache=None):
+        self.factory = factory
+        self.cache = cache if cache is not None else DefinitionCache()
+        self.constructor = SafeConstructor()
+        # check functions by definition key
+        self.checks = dict(
+            name=self.check_string,
+            factory=self.check_factory,
+            value=None,
+            props=self.check_props,
+            custom=self.check_custom,
+            mode=self.check_mode,
+            nest=self.check_string,
+            widgets=self.check_widgets
+        )
+
+    def validate(self, node, path='<source>'):
+        """Validate definition ``node`` and return list of
+        ``DefinitionError``.
+        """
+        return self.check(node, path)[0]
+
+    def validate_data(self, data, path='<source>'):
+        """Validate loaded definition ``data`` and return list of
+        ``DefinitionError``.
+        """
+        representer = SafeRepresenter(sort_keys=False)
+        return self.validate(representer.represent_data(data), path)
+
+    def validate_file(self, parser, path):
+        """Validate definition file at ``path``. Return tuple containing
+        errors and nest values of the definition.
+        """
+        loader = definition_loaders.lookup(path)
+        try:
+            if loader is yaml_definition_loader:
+                yaml_loader = parser.yaml_loader
+                if yaml_loader is None:
+                    yaml_loader = yafowil.yaml.parser.yaml_loader
+                with parser.open_file(path) as file:
+                    node = yaml.compose(file, yaml_loader)
+            else:
+                node = SafeRepresenter(sort_keys=False).represent_data(
+                    loader.load(parser, path)
+                )
+        except YAMLError as e:
+            if loader is yaml_definition_loader:
+                # identical messages for libyaml and pure python loader
+                with parser.open_file(path) as file:
+                    e = yaml_definition_loader.error(parser, file.read(), e)
+            mark = getattr(e, 'problem_mark', None)
+            message = getattr(e, 'problem', None) or str(e)
+            return (DefinitionError(path, message, mark),), ()
+        except IOError:
+            msg = u"File not found: '{0}'".format(path)
+            return (DefinitionError(path, msg),), ()
+        except CommonTransformationError as e:
+            return (DefinitionError(path, str(e)),), ()
+        if node is None:
+            return (DefinitionError(path, u'Empty form definition'),), ()
+        errors, nests = self.check(node, path)
+        return tuple(errors), tuple(nests)
+
+    def check(self, node, path):
+        errors = list()
+        nests = list()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            children = self.check_definition(node, path, errors, nests)
+            stack.extend(reversed(children))
+        # report errors in order of occurrence
+        errors.sort(key=lambda error: (error.line or 0, error.column or 0))
+        return errors, nests
+
+    def check_definition(self, node, path, errors, nests):
+        """Check widget definition ``node``. Return child definition nodes.
+        """
+        if not isinstance(node, MappingNode):
+            errors.append(DefinitionError(
+                path,
+                u'Widget definition must be a mapping',
+                node.start_mark
+            ))
+            return []
+        try:
+            # resolve merge keys
+            self.constructor.flatten_mapping(node)
+        except YAMLError as e:
+            errors.append(DefinitionError(path, e.problem, e.problem_mark))
+            return []
+        items = dict()
+        for key_node, value_node in node.value:
+            key = key_node.value if isinstance(key_node, ScalarNode) else None
+            if key not in self.checks:
+                errors.append(DefinitionError(
+                    path,
+                    u'Unknown widget definition key {0!r}'.format(key),
+                    key_node.start_mark
+                ))
+                continue
+            items[key] = value_node
+        nest = items.get('nest')
+        if nest is not None and is_string(nest):
+            nests.append(nest.value)
+        children = []
+        for key, value_node in items.items():
+            check = self.checks[key]
+            if check is not None:
+                children.extend(check(value_node, items, path, errors) or ())
+        return children
+
+    def check_string(self, node, items, path, errors):
+        if not is_string(node):
+            errors.append(DefinitionError(
+                path,
+                u'Expected string',
+                node.start_mark
+            ))
+
+    def check_mode(self, node, items, path, errors):
+        if not is_string(node):
+            self.check_string(node, items, path, errors)
+            return
+        mode = node.value
+        # expressions and pointers to callables
+        if mode in MODES or ':' in mode or '.' in mode:
+            return
+        errors.append(DefinitionError(
+            path,
+            u'Invalid mode {0!r}, expected one of {1}'.format(
+                mode,
+                ', '.join(MODES)
+            ),
+            node.start_mark
+        ))
+
+    def check_factory(self, node, items, path, errors):
+        if not is_string(node):
+            self.check_string(node, items, path, errors)
+            return
+        factory = self.factory
+        if factory is None:
+            return
+        try:
+            blueprints, _ = factory._expand_blueprints(node.value, dict())
+        except ValueError as e:
+            errors.append(DefinitionError(path, str(e), node.start_mark))
+            return
+        custom = items.get('custom')
+        custom_names = set()
+        if isinstance(custom, MappingNode):
+            custom_names = set([key.value for key, _ in custom.value])
+        for blueprint in blueprints:
+            if blueprint.startswith('*'):
+                if blueprint[1:] not in custom_names:
+                    errors.append(DefinitionError(
+                        path,
+                        u"Custom blueprint {0!r} not defined in "
+                        u"'custom'".format(blueprint),
+                        node.start_mark
+                    ))
+                continue
+            try:
+                factory.extractors(blueprint)
+            except KeyError:
+                errors.append(DefinitionError(
+                    path,
+                    u'Unknown blueprint {0!r}'.format(blueprint),
+                    node.start_mark
+                ))
+
+    def check_props(self, node, items, path, errors):
+        if not isinstance(node, MappingNode):
+            errors.append(DefinitionError(
+                path,
+                u'Expected mapping',
+                node.start_mark
+            ))
+
+    def check_custom(self, node, items, path, errors):
+        if not isinstance(node, MappingNode):
+            errors.append(DefinitionError(
+                path,
+                u'Expected mapping',
+                node.start_mark
+            ))
+            return
+        for _, chain_node in node.value:
+            if not isinstance(chain_node, MappingNode):
+                errors.append(DefinitionError(
+                    path,
+                    u'Expected mapping',
+                    chain_node.start_mark
+                ))
+                continue
+            for key_node, value_node in chain_node.value:
+                if key_node.value not in CUSTOM_KEYS:
+                    errors.append(DefinitionError(
+                        path,
+                        u'Unknown custom chain key {0!r}, expected one of '
+                        u'{1}'.format(key_node.value, ', '.join(CUSTOM_KEYS)),
+                        key_node.start_mark
+                    ))
+                    continue
+                values = [value_node]
+                if isinstance(value_node, SequenceNode):
+                    values = value_node.value
+                for value in values:
+                    if not isinstance(value, ScalarNode):
+                        errors.append(DefinitionError(
+                            path,
+                            u'Expected string or list of strings',
+                            value.start_mark
+                        ))
+
+    def check_widgets(self, node, items, path, errors):
+        if not isinstance(node, SequenceNode):
+            errors.append(DefinitionError(
+                path,
+                u'Expected list of widgets',
+                node.start_mark
+            ))
+            return []
+        children = []
+        for item in node.value:
+            if not isinstance(item, MappingNode) or len(item.value) != 1:
+                errors.append(DefinitionError(
+                    path,
+                    u'Expected mapping containing widget name as only key',
+                    item.start_mark
+                ))
+                continue
+            key_node, child = item.value[0]
+            if not isinstance(key_node, ScalarNode):
+                errors.append(DefinitionError(
+                    path,
+                    u'Expected widget name',
+                    key_node.start_mark
+                ))
+                continue
+            children.append(child)
+        return children
+
+
+default_schema = Schema()
+
+
+def validate_file(path, schema=None, yaml_loader=None):
+    """Validate form definition at ``path`` and its nested definitions.
+
+    ``path`` is a file path or package resource like accepted by
+    ``parse_from_YAML``. Raise ``DefinitionValidationError`` containing all
+    errors found. Validation results are cached per file in the cache of
+    ``schema``, which defaults to ``default_schema``.
+    """
+    if schema is None:
+        schema = default_schema
+    path = translate_path(path)
+    parser = YAMLParser(path, cache=None, yaml_loader=yaml_loader)
+    errors = list()
+    seen = set([path])
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        file_errors, nests = schema.cache.load(
+            current,
+            lambda current: schema.validate_file(parser, current),
+            immutable=is_resource(current),
+            variant=parser.cache_variant
+        )
+        errors.extend(file_errors)
+        for nest in reversed(nests):
+            try:
+                nest_path = parser.resolve_nest_path(nest)
+            # report invalid package resources like other errors
+            except Exception as e:
+                errors.append(DefinitionError(current, str(e)))
+                continue
+            if nest_path not in seen:
+                seen.add(nest_path)
+                stack.append(nest_path)
+    if errors:
+        raise DefinitionValidationError(errors)
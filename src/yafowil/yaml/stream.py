@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+from yafowil.yaml.cache import definition_cache
+from yafowil.yaml.cache import message_cache
+from yafowil.yaml.definition import WidgetDefinition
+from yafowil.yaml.lazy import LazyWidget
+from yafowil.yaml.parser import YAMLParser
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.parser import definition_loaders
+from yafowil.yaml.parser import get_yaml_loader
+from yafowil.yaml.parser import translate_path
+from yafowil.yaml.parser import yaml_definition_loader
+from yaml.error import YAMLError
+from yaml.events import AliasEvent
+from yaml.events import MappingEndEvent
+from yaml.events import MappingStartEvent
+from yaml.events import ScalarEvent
+from yaml.events import SequenceEndEvent
+from yaml.events import SequenceStartEvent
+from yaml.nodes import MappingNode
+from yaml.nodes import ScalarNode
+from yaml.nodes import SequenceNode
+import os
+
+
+def stream_from_YAML(
+    path,
+    context=None,
+    message_factory=None,
+    expression_globals=None,
+    cache=definition_cache,
+    yaml_loader=None,
+    nest_cache=None,
+    disk_cache=None,
+    instrumentation=None,
+    symbolic_props=None,
+    lazy=False,
+    nest_resolver=None,
+    message_cache=message_cache
+):
+    """Return generator yielding ``(path, widget)`` tuples while the form
+    definition is read. See ``StreamingParser.iter_widgets``.
+    """
+    return StreamingParser(
+        translate_path(path),
+        context,
+        message_factory,
+        expression_globals,
+        cache,
+        yaml_loader,
+        nest_cache,
+        disk_cache,
+        instrumentation,
+        symbolic_props,
+        lazy,
+        nest_resolver,
+        message_cache
+    ).iter_widgets()
+
+
+class WidgetFrame(object):
+    """Widget definition currently read from the event stream.
+    """
+    __slots__ = ('name', 'path', 'data', 'merges', 'children', 'streamed')
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.data = dict()
+        self.merges = list()
+        self.children = list()
+        self.streamed = False
+
+
+class StreamingParser(YAMLParser):
+    """Parser creating widgets while reading the YAML event stream.
+
+    A widget is created as soon as its definition has been read completely,
+    thus children are created before their parent. Neither the file contents
+    nor the loaded data of the whole form definition are kept in memory.
+    """
+
+    def __call__(self):
+        widget = None
+        for _, widget in self.iter_widgets():
+            pass
+        return widget
+
+    def iter_widgets(self):
+        """Yield ``(path, widget)`` tuples, children before their parent.
+
+        ``path`` is a tuple of widget names relative to the root widget, which
+        is yielded last with an empty path. Children get added to their parent
+        widget after the parent has been created.
+        """
+        path = self.path
+        chain = (os.path.abspath(path),)
+        nested = dict()
+        if definition_loaders.lookup(path) is not yaml_definition_loader:
+            # other formats are loaded as a whole
+            definition = self.load(path)
+            root = self.create_tree(definition, path)
+            for item in self.walk(root, ()):
+                yield item
+            return
+        loader = self.yaml_loader
+        if loader is None:
+            loader = get_yaml_loader()
+        try:
+            with self.open_file(path) as file:
+                loader = loader(file)
+                try:
+                    for item in self._iter_events(loader, chain, nested):
+                        yield item
+                finally:
+                    loader.dispose()
+        except YAMLError as e:
+            # identical messages for libyaml and pure python loader
+            with self.open_file(path) as file:
+                e = yaml_definition_loader.error(self, file.read(), e)
+            msg = (
+                u"Cannot parse YAML from given path '{0}'. "
+                u"Original exception was:\n{1}: {2}"
+            ).format(path, e.__class__.__name__, e)
+            raise YAMLTransformationError(msg)
+        except IOError:
+            msg = u"File not found: '{0}'".format(path)
+            raise YAMLTransformationError(msg)
+
+    def walk(self, widget, path):
+        """Yield ``(path, widget)`` tuples of existing widget tree, children
+        before their parent. Children of lazy widgets are not created.
+        """
+        stack = [(widget, path, self._iter_children(widget))]
+        while stack:
+            widget, path, children = stack[-1]
+            for name, child in children:
+                stack.append((
+                    child,
+                    path + (name,),
+                    self._iter_children(child)
+                ))
+                break
+            else:
+                stack.pop()
+                yield path, widget
+
+    def _iter_children(self, widget):
+        if isinstance(widget, LazyWidget) and not widget.materialized:
+            return iter(())
+        return iter(widget.items())
+
+    def compose(self, loader, anchors):
+        """Compose node from event stream. Like ``yaml.composer.Composer``,
+        which is not available for the libyaml based loader.
+        """
+        event = loader.get_event()
+        if isinstance(event, AliasEvent):
+            if event.anchor not in anchors:
+                raise YAMLError(
+                    'found undefined alias {0!r}'.format(event.anchor)
+                )
+            return anchors[event.anchor]
+        if isinstance(event, ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(ScalarNode, event.value, event.implicit)
+            node = ScalarNode(
+                tag,
+                event.value,
+                event.start_mark,
+                event.end_mark,
+                style=event.style
+            )
+            if event.anchor is not None:
+                anchors[event.anchor] = node
+            return node
+        if isinstance(event, SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(SequenceNode, None, event.implicit)
+            node = SequenceNode(
+                tag,
+                [],
+                event.start_mark,
+                None,
+                flow_style=event.flow_style
+            )
+            if event.anchor is not None:
+                anchors[event.anchor] = node
+            while not loader.check_event(SequenceEndEvent):
+                node.value.append(self.compose(loader, anchors))
+            node.end_mark = loader.get_event().end_mark
+            return node
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = loader.resolve(MappingNode, None, event.implicit)
+        node = MappingNode(
+            tag,
+            [],
+            event.start_mark,
+            None,
+            flow_style=event.flow_style
+        )
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        while not loader.check_event(MappingEndEvent):
+            key = self.compose(loader, anchors)
+            node.value.append((key, self.compose(loader, anchors)))
+        node.end_mark = loader.get_event().end_mark
+        return node
+
+    def compose_value(self, loader, anchors):
+        return loader.construct_document(self.compose(loader, anchors))
+
+    def _iter_events(self, loader, chain, nested):
+        # stream and document start
+        loader.get_event()
+        loader.get_event()
+        anchors = dict()
+        root = self._enter_widget(loader, anchors, None, ())
+        if not isinstance(root, WidgetFrame):
+            widget = self.create_tree(root, self.path)
+            for item in self.walk(widget, ()):
+                yield item
+            return
+        stack = [root]
+        while True:
+            frame = stack[-1]
+            if frame.streamed:
+                # inside ``widgets`` sequence of frame
+                if loader.check_event(SequenceEndEvent):
+                    loader.get_event()
+                    frame.streamed = False
+                    continue
+                # child item, mapping containing the child name as only key
+                loader.get_event()
+                name = self.compose_value(loader, anchors)
+                child = self._enter_widget(
+                    loader,
+                    anchors,
+                    name,
+                    frame.path + (name,)
+                )
+                if isinstance(child, WidgetFrame):
+                    stack.append(child)
+                    continue
+                widget = self.create_tree(
+                    WidgetDefinition.from_data(child, name),
+                    self.path
+                )
+                self._close_item(loader, anchors)
+                for item in self.walk(widget, frame.path + (name,)):
+                    yield item
+                frame.children.append((name, widget))
+                continue
+            if not loader.check_event(MappingEndEvent):
+                key = self.compose(loader, anchors)
+                if key.tag == 'tag:yaml.org,2002:merge':
+                    frame.merges.append(self.compose_value(loader, anchors))
+                    continue
+                key = loader.construct_document(key)
+                if key == 'widgets' and not self._has_nest(frame):
+                    if loader.check_event(SequenceStartEvent):
+                        loader.get_event()
+                        frame.streamed = True
+                        continue
+                frame.data[key] = self.compose_value(loader, anchors)
+                continue
+            loader.get_event()
+            stack.pop()
+            widget = self._create_widget(frame, chain, nested)
+            for item in self._iter_created(widget, frame):
+                yield item
+            if not stack:
+                return
+            stack[-1].children.append((frame.name, widget))
+            self._close_item(loader, anchors)
+
+    def _enter_widget(self, loader, anchors, name, path):
+        """Return ``WidgetFrame`` if widget definition can be streamed,
+        otherwise the loaded definition data.
+        """
+        if (
+            loader.check_event(MappingStartEvent)
+            and loader.peek_event().anchor is None
+        ):
+            loader.get_event()
+            return WidgetFrame(name, path)
+        # aliased or anchored widget definitions are loaded as a whole
+        return self.compose_value(loader, anchors)
+
+    def _close_item(self, loader, anchors):
+        # ignore additional keys of child item like ``from_data`` does
+        while not loader.check_event(MappingEndEvent):
+            self.compose(loader, anchors)
+            self.compose(loader, anchors)
+        loader.get_event()
+
+    def _has_nest(self, frame):
+        if 'nest' in frame.data:
+            return True
+        for merge in frame.merges:
+            merges = merge if isinstance(merge, list) else [merge]
+            for merge_data in merges:
+                if 'nest' in merge_data:
+                    return True
+        return False
+
+    def _create_widget(self, frame, chain, nested):
+        data = frame.data
+        widgets = None
+        for merge in frame.merges:
+            merges = merge if isinstance(merge, list) else [merge]
+            for merge_data in merges:
+                for key, value in merge_data.items():
+                    if key == 'widgets':
+                        if widgets is None:
+                            widgets = value
+                    else:
+                        data.setdefault(key, value)
+        nest = data.get('nest')
+        if nest:
+            if frame.children:
+                # children have already been yielded
+                msg = (
+                    u"Cannot stream widget '{0}' in '{1}'. 'nest' must be "
+                    u"defined before 'widgets'"
+                ).format(
+                    frame.name if frame.name is not None else data.get('name'),
+                    self.path
+                )
+                raise YAMLTransformationError(msg)
+            path, key, definition = self.load_nested(nest, chain, nested)
+            if self.lazy:
+                return self.create_lazy(
+                    definition,
+                    path,
+                    chain + (key,),
+                    nested
+                )
+            widget = self.create_widget(definition, path)
+            self.create_children(
+                widget,
+                definition,
+                path,
+                chain + (key,),
+                nested
+            )
+            return widget
+        definition = WidgetDefinition.from_data(data, frame.name)
+        widget = self.create_widget(definition, self.path)
+        for name, child in frame.children:
+            widget[name] = child
+        if widgets and not frame.children:
+            children = WidgetDefinition.from_data(
+                {'widgets': widgets},
+                frame.name
+            )
+            self.create_children(widget, children, self.path, chain, nested)
+        return widget
+
+    def _iter_created(self, widget, frame):
+        # children not yielded yet were created from nested or non streamed
+        # definitions or have been added by builders
+        streamed = set([name for name, _ in frame.children])
+        for name, child in self._iter_children(widget):
+            if name not in streamed:
+                for item in self.walk(child, frame.path + (name,)):
+                    yield item
+        yield frame.path, widget
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+from types import MappingProxyType
+from yafowil.base import Widget
+from yafowil.compat import STR_TYPE
+from yafowil.yaml.cache import definition_cache
+from yafowil.yaml.parser import YAMLParser
+from yafowil.yaml.parser import translate_path
+import os
+
+
+def context_dependent(value):
+    """Check whether definition value depends on rendering context.
+    """
+    if isinstance(value, MappingProxyType):
+        for v in value.values():
+            if context_dependent(v):
+                return True
+        return False
+    if not isinstance(value, STR_TYPE):
+        return False
+    return value.startswith('expr:') or value.startswith('context.')
+
+
+def _copy_widget(widget):
+    copy = Widget(
+        widget.blueprints,
+        widget.extractors,
+        widget.edit_renderers,
+        widget.display_renderers,
+        widget.preprocessors,
+        uniquename=widget.name,
+        value_or_getter=widget.getter,
+        properties=widget.properties,
+        custom=widget.custom,
+        defaults=widget.defaults,
+        mode=widget.mode
+    )
+    # attributes might have been modified by builders
+    copy.attrs.storage.update(widget.attrs.storage)
+    return copy
+
+
+def clone_widget(widget):
+    """Create copy of widget and its children.
+
+    Blueprint chains, properties and values are shared with the original
+    widget and must not be modified.
+    """
+    clone = _copy_widget(widget)
+    # explicit stack instead of recursion to support arbitrary depth
+    stack = [(clone, widget)]
+    while stack:
+        target, source = stack.pop()
+        for name, child in source.items():
+            copy = target[name] = _copy_widget(child)
+            stack.append((copy, child))
+    return clone
+
+
+class TemplateNode(object):
+    """Node of a form template, referring to a widget definition and the
+    prototype widget created from it.
+    """
+    __slots__ = (
+        'definition',
+        'path',
+        'widget',
+        'children',
+        'props',
+        'value',
+        'mode',
+        'custom',
+        'attrs',
+        'extra'
+    )
+
+    def __init__(self, definition, path, widget):
+        self.definition = definition
+        self.path = path
+        self.widget = widget
+        self.children = list()
+        # attributes modified and names of children added by builders
+        self.attrs = None
+        self.extra = ()
+        # names of context dependent properties
+        self.props = tuple([
+            key for key, value in definition.props.items()
+            if context_dependent(value)
+        ])
+        self.value = context_dependent(definition.value)
+        self.mode = context_dependent(definition.mode)
+        # custom blueprint chains are compiled into the widget by factory,
+        # if they depend on context the widget needs to be created from scratch
+        self.custom = any([
+            context_dependent(pt)
+            for _, parts in definition.custom
+            for part in parts
+            for pt in part
+        ])
+
+
+class FormTemplate(object):
+    """Form template creating widget trees from a prototype.
+
+    The prototype widget tree is created once from the form definition.
+    Calling the template with a rendering context returns a copy of the
+    prototype, where only values depending on the rendering context are
+    created again. Values not depending on the rendering context are shared
+    between the created widget trees and must not be modified.
+    """
+
+    def __init__(
+        self,
+        path,
+        message_factory=None,
+        expression_globals=None,
+        cache=definition_cache,
+        yaml_loader=None,
+        symbolic_props=None
+    ):
+        self.path = translate_path(path)
+        self.message_factory = message_factory
+        self.expression_globals = expression_globals
+        self.cache = cache
+        self.yaml_loader = yaml_loader
+        self.symbolic_props = symbolic_props
+        self.root = self.create_prototype()
+
+    def parser(self, context=None):
+        return YAMLParser(
+            self.path,
+            context=context,
+            message_factory=self.message_factory,
+            expression_globals=self.expression_globals,
+            cache=self.cache,
+            yaml_loader=self.yaml_loader,
+            symbolic_props=self.symbolic_props
+        )
+
+    def create_prototype(self):
+        parser = self.parser()
+        nested = dict()
+
+        def create_node(definition, path):
+            return TemplateNode(
+                definition,
+                path,
+                parser.create_widget(definition, path)
+            )
+
+        def create_children(root, chain):
+            # nodes are created depth first in definition order. an explicit
+            # stack is used instead of recursion to support arbitrary depth
+            stack = [(root, iter(root.definition.widgets), chain)]
+            while stack:
+                node, children, chain = stack[-1]
+                child_def = next(children, None)
+                if child_def is None:
+                    stack.pop()
+                    continue
+                name = child_def.name
+                path = node.path
+                child_chain = chain
+                if child_def.nest:
+                    path, key, child_def = parser.load_nested(
+                        child_def.nest,
+                        chain,
+                        nested
+                    )
+                    child_chain = chain + (key,)
+                child = create_node(child_def, path)
+                node.widget[name] = child.widget
+                node.children.append((name, child))
+                stack.append((child, iter(child_def.widgets), child_chain))
+
+        def collect_builder_changes(root):
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                widget = node.widget
+                storage = widget.attrs.storage
+                if storage != widget.properties:
+                    node.attrs = dict(storage)
+                names = set([name for name, _ in node.children])
+                node.extra = tuple([
+                    name for name in widget.keys() if name not in names
+                ])
+                stack.extend([child for _, child in node.children])
+
+        root = create_node(parser.load(self.path), self.path)
+        create_children(root, (os.path.abspath(self.path),))
+        collect_builder_changes(root)
+        return root
+
+    @property
+    def prototype(self):
+        return self.root.widget
+
+    def __call__(self, context=None):
+        parser = self.parser(context)
+
+        def create_widget(node):
+            definition = node.definition
+            prototype = node.widget
+            if node.custom:
+                return parser.create_widget(definition, node.path)
+            props = prototype.properties
+            overrides = dict()
+            if node.props:
+                props = dict(props)
+                for key in node.props:
+                    overrides[key] = props[key] = parser.parse_prop(
+                        key,
+                        definition.props[key]
+                    )
+            value = prototype.getter
+            if node.value:
+                value = parser.parse_definition_value(definition.value)
+            mode = prototype.mode
+            if node.mode:
+                mode = parser.parse_definition_value(definition.mode)
+            widget = Widget(
+                prototype.blueprints,
+                prototype.extractors,
+                prototype.edit_renderers,
+                prototype.display_renderers,
+                prototype.preprocessors,
+                uniquename=prototype.name,
+                value_or_getter=value,
+                properties=props,
+                custom=prototype.custom,
+                defaults=prototype.defaults,
+                mode=mode
+            )
+            # attributes and children might have been added by builders
+            if node.attrs is not None:
+                storage = widget.attrs.storage
+                storage.update(node.attrs)
+                storage.update(overrides)
+            for name in node.extra:
+                widget[name] = clone_widget(prototype[name])
+            return widget
+
+        root = create_widget(self.root)
+        # widgets are created depth first in definition order. an explicit
+        # stack is used instead of recursion to support arbitrary depth
+        stack = [(root, iter(self.root.children))]
+        while stack:
+            widget, children = stack[-1]
+            name, child = next(children, (None, None))
+            if child is None:
+                stack.pop()
+                continue
+            widget[name] = child_widget = create_widget(child)
+            stack.append((child_widget, iter(child.children)))
+        return root
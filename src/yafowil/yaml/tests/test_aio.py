@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+from yafowil.base import Widget
+from yafowil.yaml.aio import _pending
+from yafowil.yaml.aio import parse_from_YAML_async
+from yafowil.yaml.cache import DefinitionCache
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import asyncio
+import os
+import threading
+
+
+main_yaml = """
+factory: form
+name: main
+props:
+    action: expr:context.action
+widgets:
+- a:
+    nest: a.yaml
+- b:
+    nest: b.yaml
+"""
+
+a_yaml = """
+factory: compound
+widgets:
+- field:
+    factory: text
+- c:
+    nest: c.yaml
+"""
+
+b_yaml = """
+factory: compound
+widgets:
+- c:
+    nest: c.yaml
+"""
+
+c_yaml = """
+factory: text
+"""
+
+
+class Context(object):
+    action = 'http://example.com'
+
+
+class CountingCache(DefinitionCache):
+    """Definition cache counting loads. Blocks loads of ``barrier_names``
+    until all of them are loading concurrently.
+    """
+
+    def __init__(self, barrier_names=()):
+        super(CountingCache, self).__init__()
+        self.loads = dict()
+        self.lock = threading.Lock()
+        self.barrier_names = barrier_names
+        self.barrier = threading.Barrier(len(barrier_names) or 1, timeout=5)
+
+    def load(self, path, loader, immutable=False, variant=None):
+        name = os.path.basename(path)
+        with self.lock:
+            self.loads[name] = self.loads.get(name, 0) + 1
+        if name in self.barrier_names:
+            self.barrier.wait()
+        return super(CountingCache, self).load(
+            path,
+            loader,
+            immutable,
+            variant
+        )
+
+
+class TestAio(TempdirTestCase):
+
+    def setUp(self):
+        super(TestAio, self).setUp()
+        self.write('main.yaml', main_yaml)
+        self.write('a.yaml', a_yaml)
+        self.write('b.yaml', b_yaml)
+        self.write('c.yaml', c_yaml)
+
+    def test_parse_from_YAML_async(self):
+        path = os.path.join(self.tempdir, 'main.yaml')
+        # independent nested definitions get loaded concurrently, otherwise
+        # the barrier times out
+        cache = CountingCache(barrier_names=('a.yaml', 'b.yaml'))
+        form = asyncio.run(parse_from_YAML_async(
+            path,
+            context=Context(),
+            cache=cache
+        ))
+        self.assertTrue(isinstance(form, Widget))
+        self.assertEqual(
+            form.attrs['action'](form, None),
+            'http://example.com'
+        )
+        self.assertEqual(list(form['a'].keys()), ['field', 'c'])
+        self.assertEqual(list(form['b'].keys()), ['c'])
+        self.assertEqual(
+            cache.loads,
+            {'main.yaml': 1, 'a.yaml': 1, 'b.yaml': 1, 'c.yaml': 1}
+        )
+        self.assertEqual(_pending, {})
+
+    def test_single_flight(self):
+        path = os.path.join(self.tempdir, 'main.yaml')
+        cache = CountingCache()
+
+        async def parse_many():
+            return await asyncio.gather(*[
+                parse_from_YAML_async(path, cache=cache) for _ in range(10)
+            ])
+
+        forms = asyncio.run(parse_many())
+        self.assertEqual(len(forms), 10)
+        self.assertEqual(len(set([id(form) for form in forms])), 10)
+        self.assertEqual(
+            cache.loads,
+            {'main.yaml': 1, 'a.yaml': 1, 'b.yaml': 1, 'c.yaml': 1}
+        )
+        self.assertEqual(_pending, {})
+
+        # cancelled waiters do not cancel the shared load
+        async def cancel_one():
+            first = asyncio.ensure_future(
+                parse_from_YAML_async(path, cache=None)
+            )
+            second = asyncio.ensure_future(
+                parse_from_YAML_async(path, cache=None)
+            )
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        form = asyncio.run(cancel_one())
+        self.assertEqual(list(form.keys()), ['a', 'b'])
+
+    def test_errors(self):
+        self.write('c.yaml', main_yaml)
+        path = os.path.join(self.tempdir, 'main.yaml')
+        with self.assertRaises(YAMLTransformationError) as arc:
+            asyncio.run(parse_from_YAML_async(path, cache=None))
+        self.assertTrue(
+            str(arc.exception).startswith('Circular nesting detected')
+        )
+
+        os.remove(os.path.join(self.tempdir, 'c.yaml'))
+        with self.assertRaises(YAMLTransformationError) as arc:
+            asyncio.run(parse_from_YAML_async(path, cache=None))
+        self.assertTrue(str(arc.exception).startswith('File not found'))
+        self.assertEqual(_pending, {})
+
+        # package resources
+        form = asyncio.run(parse_from_YAML_async(
+            'yafowil.yaml:demo_form.yaml',
+            message_factory=lambda msgid, default=None: default or msgid
+        ))
+        self.assertEqual(form.name, 'demo_form')
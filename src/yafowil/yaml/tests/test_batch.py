@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.batch import BatchTransformationError
+from yafowil.yaml.batch import load_definitions
+from yafowil.yaml.cache import DefinitionCache
+from yafowil.yaml.definition import WidgetDefinition
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.tests import test_yaml
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import os
+
+
+class TestBatch(TempdirTestCase):
+
+    def test_load_definitions(self):
+        main_path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            widgets:
+            - sub:
+                nest: sub.yaml
+        """)
+        sub_path = self.write('sub.yaml', """
+            factory: compound
+            widgets:
+            - field:
+                factory: text
+                value: expr:context.some_attr
+        """)
+        json_path = self.write('tmpl.json', test_yaml.TestYAML.json_tmpl)
+        cache = DefinitionCache()
+        # process pool
+        definitions = load_definitions(
+            [main_path, json_path, main_path],
+            cache=cache,
+            max_workers=2
+        )
+        self.assertEqual(
+            sorted(definitions),
+            sorted([main_path, json_path, sub_path])
+        )
+        self.assertTrue(isinstance(definitions[main_path], WidgetDefinition))
+        self.assertEqual(definitions[sub_path].widgets[0].name, 'field')
+        self.assertEqual(len(cache), 3)
+        # definitions are taken from cache by parser
+        parse_from_YAML(main_path, cache=cache)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 3)
+
+    def test_errors(self):
+        valid_path = self.write('valid.yaml', 'factory: text\nname: valid')
+        broken_path = self.write('broken.yaml', 'a: {]')
+        expression_path = self.write('expression.yaml', """
+            factory: form
+            name: mainform
+            widgets:
+            - field:
+                factory: text
+                value: expr:context.(
+            - sub:
+                nest: inexistent.yaml
+        """)
+        inexistent_path = os.path.join(self.tempdir, 'inexistent.yaml')
+        with ThreadPoolExecutor() as executor:
+            with self.assertRaises(BatchTransformationError) as arc:
+                load_definitions(
+                    [valid_path, broken_path, expression_path],
+                    cache=None,
+                    executor=executor
+                )
+        err = arc.exception
+        self.assertEqual(list(err.definitions), [valid_path])
+        self.assertEqual(
+            sorted(err.errors),
+            sorted([broken_path, expression_path])
+        )
+        for error in err.errors.values():
+            self.assertTrue(isinstance(error, YAMLTransformationError))
+        self.assertTrue(str(err.errors[expression_path]).startswith(
+            "Cannot compile expression of widget 'field'"
+        ))
+        self.assertTrue(str(err).startswith(
+            'Cannot load 2 form definition(s):\n'
+        ))
+
+        # nested definitions of valid definitions are loaded
+        self.write('expression.yaml', """
+            factory: form
+            name: mainform
+            widgets:
+            - sub:
+                nest: inexistent.yaml
+        """)
+        with ThreadPoolExecutor() as executor:
+            with self.assertRaises(BatchTransformationError) as arc:
+                load_definitions(
+                    [expression_path],
+                    cache=None,
+                    executor=executor
+                )
+        self.assertEqual(
+            str(arc.exception.errors[inexistent_path]),
+            "File not found: '{0}'".format(inexistent_path)
+        )
+
+    def test_nests_relative_to_root(self):
+        # nests of nested definitions are resolved relative to the path of
+        # the root definition like done when parsing
+        os.mkdir(os.path.join(self.tempdir, 'other'))
+        sub_path = self.write(os.path.join('other', 'sub.yaml'), """
+            factory: compound
+            widgets:
+            - field:
+                nest: field.yaml
+        """)
+        main_path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            widgets:
+            - sub:
+                nest: {0}
+        """.format(sub_path))
+        field_path = self.write('field.yaml', 'factory: text\n')
+        form = parse_from_YAML(main_path, cache=None)
+        self.assertEqual(form['sub']['field'].blueprints, ['text'])
+        with ThreadPoolExecutor() as executor:
+            definitions = load_definitions(
+                [main_path],
+                cache=None,
+                executor=executor
+            )
+        self.assertEqual(
+            sorted(definitions),
+            sorted([main_path, sub_path, field_path])
+        )
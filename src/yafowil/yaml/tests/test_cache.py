@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+from yafowil.yaml.cache import DefinitionCache
+from yafowil.yaml.cache import DiskCache
+from yafowil.yaml.cache import LRUCache
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import datetime
+import json
+import os
+import pickle
+import unittest
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_get_set(self):
+        cache = LRUCache(maxsize=2)
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(cache.get('a', 'default'), 'default')
+        self.assertEqual(cache.misses, 2)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertTrue('a' in cache)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.pop('a'), 1)
+        self.assertFalse('a' in cache)
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        # access 'a', 'b' becomes least recently used
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue('c' in cache)
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('b')
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
+
+
+class TestDefinitionCache(TempdirTestCase):
+
+    def setUp(self):
+        super(TestDefinitionCache, self).setUp()
+        self.loaded = list()
+
+    def loader(self, path):
+        self.loaded.append(path)
+        with open(path) as f:
+            return f.read()
+
+    def test_load(self):
+        path = os.path.join(self.tempdir, 'def.yaml')
+        with open(path, 'w') as f:
+            f.write('a')
+        cache = DefinitionCache()
+        self.assertEqual(cache.load(path, self.loader), 'a')
+        self.assertEqual(cache.load(path, self.loader), 'a')
+        self.assertEqual(self.loaded, [path])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # size changed
+        with open(path, 'w') as f:
+            f.write('bb')
+        self.assertEqual(cache.load(path, self.loader), 'bb')
+        self.assertEqual(self.loaded, [path, path])
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        # modification time changed
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        self.assertEqual(cache.load(path, self.loader), 'bb')
+        self.assertEqual(len(self.loaded), 3)
+        self.assertEqual(len(cache), 1)
+
+        cache.clear()
+        self.assertEqual(cache.load(path, self.loader), 'bb')
+        self.assertEqual(len(self.loaded), 4)
+
+    def test_load_inexistent(self):
+        cache = DefinitionCache()
+        path = os.path.join(self.tempdir, 'inexistent.yaml')
+        with self.assertRaises(IOError):
+            cache.load(path, self.loader)
+        self.assertEqual(len(cache), 0)
+
+
+class TestDiskCache(TempdirTestCase):
+
+    def setUp(self):
+        super(TestDiskCache, self).setUp()
+        self.loaded = list()
+
+    def loader(self, source):
+        self.loaded.append(source)
+        return {'source': source, 'values': [1, 1.5, None, True]}
+
+    def test_load(self):
+        directory = os.path.join(self.tempdir, 'cache')
+        cache = DiskCache(directory)
+        data = cache.load('a', 'yaml', self.loader)
+        self.assertEqual(data['source'], 'a')
+        self.assertEqual(self.loaded, ['a'])
+        self.assertEqual(os.listdir(directory), [cache.key('a', 'yaml')])
+
+        # new cache instance reads data from disk
+        cache = DiskCache(directory)
+        self.assertEqual(cache.load('a', 'yaml', self.loader), data)
+        self.assertEqual(self.loaded, ['a'])
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+        # different source or kind
+        cache.load('b', 'yaml', self.loader)
+        cache.load('a', 'json', self.loader)
+        self.assertEqual(self.loaded, ['a', 'b', 'a'])
+        self.assertEqual(len(os.listdir(directory)), 3)
+
+        # corrupt cache file
+        with open(os.path.join(directory, cache.key('a', 'yaml')), 'wb') as f:
+            f.write(b'\xff')
+        self.assertEqual(cache.load('a', 'yaml', self.loader), data)
+        self.assertEqual(self.loaded, ['a', 'b', 'a', 'a'])
+
+        with open(os.path.join(directory, 'other'), 'w') as f:
+            f.write('other')
+        cache.clear()
+        self.assertEqual(os.listdir(directory), ['other'])
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_unmarshalable(self):
+        cache = DiskCache(self.tempdir)
+        data = cache.load('a', 'yaml', lambda source: {
+            'date': datetime.date(2020, 1, 1)
+        })
+        self.assertEqual(data, {'date': datetime.date(2020, 1, 1)})
+        self.assertEqual(os.listdir(self.tempdir), [])
+
+    def test_key(self):
+        cache = DiskCache(self.tempdir)
+        self.assertEqual(len(cache.key('a', 'yaml')), 64)
+        self.assertNotEqual(cache.key('a', 'yaml'), cache.key('a', 'json'))
+        self.assertNotEqual(
+            cache.key('a', 'json', json.loads),
+            cache.key('a', 'json', pickle.loads)
+        )
+        self.assertNotEqual(
+            cache.key('a', 'json'),
+            cache.key('a', 'json', json.loads)
+        )
+        other = DiskCache(self.tempdir)
+        other.salt = b'other'
+        self.assertNotEqual(cache.key('a', 'yaml'), other.key('a', 'yaml'))
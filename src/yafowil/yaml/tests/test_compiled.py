@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+from yafowil.base import Widget
+from yafowil.yaml import CompiledDefinition
+from yafowil.yaml import python_expression_globals
+from yafowil.yaml.lazy import LazyWidget
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import os
+import sys
+import threading
+
+
+main_yaml = """
+factory: form
+name: main
+props:
+    action: expr:context.action
+widgets:
+- title:
+    factory: field:label:text
+    value: expr:context.title
+    props:
+        label: i18n:title:Title
+- datatype:
+    factory: text
+    props:
+        datatype: python:Datatype
+- sub:
+    nest: sub.yaml
+- other:
+    nest: sub.yaml
+"""
+
+sub_yaml = """
+factory: compound
+widgets:
+- field:
+    factory: text
+    value: expr:context.title + '-sub'
+"""
+
+
+def _(msgid, default=None):
+    return default or msgid
+
+
+class Context(object):
+
+    def __init__(self, title):
+        self.title = title
+        self.action = 'http://example.com/' + title
+
+
+class TestCompiled(TempdirTestCase):
+
+    def setUp(self):
+        super(TestCompiled, self).setUp()
+        self.write('main.yaml', main_yaml)
+        self.write('sub.yaml', sub_yaml)
+        self.addCleanup(python_expression_globals.pop, 'Datatype', None)
+        python_expression_globals['Datatype'] = int
+
+    def test_compiled_definition(self):
+        path = os.path.join(self.tempdir, 'main.yaml')
+        compiled = CompiledDefinition(path, cache=None)
+        self.assertEqual(
+            repr(compiled),
+            '<CompiledDefinition path={0!r}>'.format(path)
+        )
+        self.assertEqual(list(compiled.nested), ['sub.yaml'])
+        with self.assertRaises(AttributeError):
+            compiled.path = 'other'
+        with self.assertRaises(AttributeError):
+            del compiled.definition
+
+        # nested definitions are not loaded again
+        os.remove(os.path.join(self.tempdir, 'sub.yaml'))
+        form = compiled(context=Context('a'), message_factory=_)
+        self.assertEqual(
+            form.attrs['action'](form, None),
+            'http://example.com/a'
+        )
+        self.assertEqual(form['title'].getter(form['title'], None), 'a')
+        self.assertEqual(form['title'].attrs['label'], 'Title')
+        self.assertTrue(form['datatype'].attrs['datatype'] is int)
+        self.assertEqual(
+            form['other']['field'].getter(form['other']['field'], None),
+            'a-sub'
+        )
+
+        # python expression globals are taken over on creation
+        python_expression_globals['Datatype'] = float
+        form = compiled(context=Context('b'), message_factory=_)
+        self.assertTrue(form['datatype'].attrs['datatype'] is int)
+        form = compiled(
+            context=Context('b'),
+            message_factory=_,
+            expression_globals={'Datatype': str}
+        )
+        self.assertTrue(form['datatype'].attrs['datatype'] is str)
+        self.assertTrue(compiled.python_globals['Datatype'] is int)
+
+        # lazy nested definitions
+        self.write('sub.yaml', sub_yaml)
+        compiled = CompiledDefinition(path, lazy=True)
+        form = compiled(context=Context('c'), message_factory=_)
+        self.assertTrue(isinstance(form['sub'], LazyWidget))
+        self.assertFalse(form['sub'].materialized)
+        self.assertEqual(list(form['sub'].keys()), ['field'])
+
+    def test_circular_nesting(self):
+        self.write('sub.yaml', main_yaml)
+        with self.assertRaises(YAMLTransformationError) as arc:
+            CompiledDefinition(os.path.join(self.tempdir, 'main.yaml'))
+        self.assertTrue(
+            str(arc.exception).startswith('Circular nesting detected')
+        )
+
+    def test_threads(self):
+        # build widget trees of one compiled definition from many threads
+        compiled = CompiledDefinition(os.path.join(self.tempdir, 'main.yaml'))
+        threads = 16
+        iterations = 50
+        barrier = threading.Barrier(threads)
+        errors = list()
+        results = dict()
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+
+        def run(index):
+            try:
+                barrier.wait()
+                titles = list()
+                for iteration in range(iterations):
+                    title = '{0}-{1}'.format(index, iteration)
+                    form = compiled(
+                        context=Context(title),
+                        message_factory=lambda msgid, default=None: (
+                            '{0}:{1}'.format(index, msgid)
+                        ),
+                        expression_globals={'Datatype': index}
+                    )
+                    field = form['sub']['field']
+                    titles.append((
+                        form.attrs['action'](form, None),
+                        form['title'].getter(form['title'], None),
+                        form['title'].attrs['label'],
+                        form['datatype'].attrs['datatype'],
+                        field.getter(field, None)
+                    ))
+                results[index] = titles
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+
+        workers = [
+            threading.Thread(target=run, args=(index,))
+            for index in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), threads)
+        for index, titles in results.items():
+            self.assertEqual(titles, [(
+                'http://example.com/{0}-{1}'.format(index, iteration),
+                '{0}-{1}'.format(index, iteration),
+                '{0}:title'.format(index),
+                index,
+                '{0}-{1}-sub'.format(index, iteration)
+            ) for iteration in range(iterations)])
+        self.assertTrue(isinstance(compiled(message_factory=_), Widget))
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+from yafowil.tests import fxml
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.compiler import ModuleCompiler
+from yafowil.yaml.compiler import compile_module
+from yafowil.yaml.compiler import main
+from yafowil.yaml import python_expression_globals
+from yafowil.yaml.definition import WidgetDefinition
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.tests import test_yaml
+from yafowil.yaml.tests.test_yaml import DummyContext
+from yafowil.yaml.tests.test_yaml import _
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import importlib.util
+import os
+import sys
+
+
+class TestCompiler(TempdirTestCase):
+
+    def import_module(self, path):
+        spec = importlib.util.spec_from_file_location('compiled_form', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_compile_module(self):
+        path = self.write('tmpl.yaml', test_yaml.TestYAML.yaml_tmpl)
+        module_path = self.write('compiled_form.py', compile_module(path))
+        module = self.import_module(module_path)
+        context = DummyContext()
+        form = module.build(context, _)
+        self.assertEqual(form.treerepr(), parse_from_YAML(
+            path,
+            context,
+            _
+        ).treerepr())
+        self.assertEqual(
+            fxml(form()),
+            fxml(parse_from_YAML(path, context, _)())
+        )
+
+    def test_compile_expressions_and_nesting(self):
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            props:
+                action: python:action
+            widgets:
+            - sub_1:
+                nest: sub.yaml
+            - sub_2:
+                nest: sub.yaml
+            - other:
+                factory: text
+                value: expr:context.__class__.__name__
+                props:
+                    class: Some.Class
+        """)
+        self.write('sub.yaml', """
+            factory: compound
+            widgets:
+            - field:
+                factory: text
+                value: context.firstfield_value
+                props:
+                    label: i18n:field:Field
+        """)
+        source = compile_module(path)
+        self.assertEqual(source.count('def _build_0('), 1)
+        self.assertEqual(source.count('= _build_0(context'), 2)
+        module = self.import_module(self.write('compiled_form.py', source))
+        context = DummyContext()
+        form = module.build(
+            context,
+            _,
+            expression_globals={'action': 'mainaction'}
+        )
+        self.assertEqual(form.attrs['action'], 'mainaction')
+        self.assertEqual(form['other'].attrs['class'], 'Some.Class')
+        self.assertEqual(form['other'].getter(), 'DummyContext')
+        field = form['sub_2']['field']
+        self.assertEqual(field.getter(None, None), 'First value')
+        self.assertEqual(field.attrs['label'], 'Field')
+
+    def test_compile_symbolic_props(self):
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            props:
+                action: yafowil.yaml.tests.test_yaml._test_vocab
+                title: yafowil.yaml.tests.test_yaml._test_vocab
+        """)
+        source = compile_module(path, symbolic_props=['action'])
+        module = self.import_module(self.write('compiled_form.py', source))
+        form = module.build()
+        self.assertTrue(form.attrs['action'] is test_yaml._test_vocab)
+        self.assertEqual(
+            form.attrs['title'],
+            'yafowil.yaml.tests.test_yaml._test_vocab'
+        )
+
+    def test_compile_python_expression_globals(self):
+        self.addCleanup(python_expression_globals.clear)
+        python_expression_globals.update({
+            'prefix': 'pre',
+            'suffix': 'suf',
+            'items': [1, {'a': None}],
+            'vocab': test_yaml._test_vocab,
+            'path': os.path,
+            'unused': object()
+        })
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            props:
+                action: python:prefix + path.sep
+                title: python:[suffix for item in items]
+                vocabulary: python:vocab
+                label: i18n:label:Label
+        """)
+        source = compile_module(path)
+        # values are written to the module at compile time
+        python_expression_globals.clear()
+        module = self.import_module(self.write('compiled_form.py', source))
+        form = module.build(message_factory=_)
+        self.assertEqual(form.attrs['action'], 'pre' + os.sep)
+        self.assertEqual(form.attrs['title'], ['suf', 'suf'])
+        self.assertTrue(form.attrs['vocabulary'] is test_yaml._test_vocab)
+        self.assertEqual(form.attrs['label'], 'Label')
+        # expression globals passed to build take precedence
+        form = module.build(
+            message_factory=_,
+            expression_globals={'prefix': 'other'}
+        )
+        self.assertEqual(form.attrs['action'], 'other' + os.sep)
+
+        # values which are neither literals nor importable
+        python_expression_globals['prefix'] = object()
+        with self.assertRaises(YAMLTransformationError) as arc:
+            compile_module(path)
+        self.assertEqual(str(arc.exception), (
+            "Cannot compile expression global 'prefix' of type 'object'. "
+            "Value must be a literal or importable by dotted name."
+        ))
+
+    def test_compile_deep(self):
+        # nesting depth exceeds recursion limit
+        depth = sys.getrecursionlimit() + 100
+        data = {'factory': 'text'}
+        for i in range(depth):
+            data = {'factory': 'compound', 'widgets': [
+                {'child_{0}'.format(i): data}
+            ]}
+        data['name'] = 'deep'
+        definition = WidgetDefinition.from_data(data)
+        path = os.path.join(self.tempdir, 'deep.yaml')
+        source = ModuleCompiler(path).compile_module(definition)
+        module = self.import_module(self.write('compiled_form.py', source))
+        node = module.build()
+        for i in reversed(range(depth)):
+            node = node['child_{0}'.format(i)]
+        self.assertEqual(node.blueprints, ['text'])
+        self.assertEqual(len(node.path), depth + 1)
+
+    def test_compile_errors(self):
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            widgets:
+            - field:
+                factory: text
+                value: expr:context.(
+        """)
+        with self.assertRaises(YAMLTransformationError) as arc:
+            compile_module(path)
+        self.assertTrue(str(arc.exception).startswith(
+            "Cannot compile expression of widget 'field'"
+        ))
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            widgets:
+            - sub:
+                nest: main.yaml
+        """)
+        with self.assertRaises(YAMLTransformationError) as arc:
+            compile_module(path)
+        self.assertEqual(
+            str(arc.exception),
+            'Circular nesting detected: {0} -> {0}'.format(path)
+        )
+
+    def test_main(self):
+        path = self.write('tmpl.yaml', test_yaml.TestYAML.yaml_tmpl)
+        module_path = os.path.join(self.tempdir, 'compiled_form.py')
+        self.assertEqual(main([
+            path,
+            '-o', module_path,
+            '-i', 'yafowil.yaml.tests.test_yaml'
+        ]), 0)
+        module = self.import_module(module_path)
+        self.assertEqual(
+            module.build(DummyContext(), _).treerepr().split('\n')[0],
+            "<class 'yafowil.base.Widget'>: demoform"
+        )
+        path = self.write('trash.yaml', '{]')
+        self.assertEqual(main([path, '-o', module_path]), 1)
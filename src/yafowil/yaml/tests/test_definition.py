@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+from node.utils import UNSET
+from types import MappingProxyType
+from yafowil.yaml import YAMLParser
+from yafowil.yaml.definition import WidgetDefinition
+from yafowil.yaml.definition import freeze
+from yafowil.yaml.definition import thaw
+import threading
+import unittest
+
+
+class TestDefinition(unittest.TestCase):
+
+    def test_freeze_thaw(self):
+        data = {'a': [1, {'b': [2, 3]}], 'c': 'd'}
+        frozen = freeze(data)
+        self.assertTrue(isinstance(frozen, MappingProxyType))
+        self.assertEqual(frozen['a'][0], 1)
+        self.assertTrue(isinstance(frozen['a'], tuple))
+        self.assertTrue(isinstance(frozen['a'][1], MappingProxyType))
+        self.assertEqual(frozen['a'][1]['b'], (2, 3))
+        thawed = thaw(frozen)
+        self.assertEqual(thawed, data)
+        self.assertFalse(thawed is data)
+        self.assertFalse(thaw(frozen)['a'] is thawed['a'])
+        ob = object()
+        self.assertTrue(freeze(ob) is ob)
+        self.assertTrue(thaw(ob) is ob)
+
+    def test_from_data(self):
+        definition = WidgetDefinition.from_data({
+            'name': 'form',
+            'props': {'action': 'action'},
+            'widgets': [{
+                'field': {
+                    'factory': 'field:*custom:text',
+                    'value': ['a', 'b'],
+                    'mode': 'display',
+                    'custom': {
+                        'custom': {
+                            'extractors': 'context.extractor',
+                            'edit_renderers': ['context.renderer']
+                        }
+                    }
+                }
+            }, {
+                'sub': {
+                    'nest': 'sub.yaml'
+                }
+            }]
+        })
+        self.assertEqual(
+            repr(definition),
+            "<WidgetDefinition name='form' factory='form' nest=None>"
+        )
+        self.assertEqual(definition.value, UNSET)
+        self.assertEqual(definition.mode, 'edit')
+        self.assertEqual(dict(definition.props), {'action': 'action'})
+        self.assertEqual(len(definition.widgets), 2)
+        field = definition.widgets[0]
+        self.assertEqual(field.name, 'field')
+        self.assertEqual(field.factory, 'field:*custom:text')
+        self.assertEqual(field.value, ('a', 'b'))
+        self.assertEqual(field.mode, 'display')
+        self.assertEqual(field.custom, (
+            ('custom', (
+                ('context.extractor',),
+                ('context.renderer',),
+                (),
+                (),
+                ()
+            )),
+        ))
+        sub = definition.widgets[1]
+        self.assertEqual(sub.name, 'sub')
+        self.assertEqual(sub.nest, 'sub.yaml')
+        with self.assertRaises(AttributeError):
+            sub.nest = 'other.yaml'
+        with self.assertRaises(AttributeError):
+            del sub.nest
+
+    def test_shared_definition(self):
+        definition = WidgetDefinition.from_data({
+            'name': 'form',
+            'widgets': [{
+                'field': {
+                    'factory': 'select',
+                    'value': ['a'],
+                    'props': {'vocabulary': ['a', 'b']}
+                }
+            }]
+        })
+        forms = list()
+
+        def build():
+            forms.append(YAMLParser(None).create_tree(definition))
+
+        threads = [threading.Thread(target=build) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(forms), 8)
+        self.assertEqual(forms[0]['field'].getter, ['a'])
+        # each tree gets own copies of definition values
+        self.assertFalse(forms[0]['field'].getter is forms[1]['field'].getter)
+        self.assertFalse(
+            forms[0]['field'].attrs['vocabulary']
+            is forms[1]['field'].attrs['vocabulary']
+        )
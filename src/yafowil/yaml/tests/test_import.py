@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from yafowil.tests import YafowilTestCase
+import os
+import subprocess
+import sys
+import yafowil.yaml.parser
+
+
+# directory containing the ``yafowil.yaml`` package
+source_directory = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(yafowil.yaml.parser.__file__)
+)))
+
+
+def run_python(code):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [source_directory] + [it for it in [env.get('PYTHONPATH')] if it]
+    )
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def imported_modules(stderr):
+    # lines look like ``import time: self [us] | cumulative | name``
+    modules = set()
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            modules.add(line.rsplit('|', 1)[1].strip())
+    return modules
+
+
+class TestImport(YafowilTestCase):
+
+    def test_import_time(self):
+        # importing the package does not load PyYAML or the widget registry
+        result = run_python('import yafowil.yaml')
+        modules = imported_modules(result.stderr)
+        self.assertTrue('yafowil.yaml' in modules)
+        for name in (
+            'yaml',
+            'yafowil.base',
+            'yafowil.loader',
+            'importlib.metadata'
+        ):
+            self.assertFalse(name in modules, name)
+
+        # widget registry is loaded when creating a tree, PyYAML is not
+        # imported for JSON definitions
+        result = run_python(
+            'import yafowil.yaml\n'
+            'form = yafowil.yaml.parse_from_source(\n'
+            '    \'{"factory": "form", "name": "form", "props": \'\n'
+            '    \'{"action": "action"}}\',\n'
+            '    format="json"\n'
+            ')\n'
+            'print(form.name)\n'
+        )
+        self.assertEqual(result.stdout.strip(), 'form')
+        modules = imported_modules(result.stderr)
+        self.assertTrue('yafowil.loader' in modules)
+        self.assertFalse('yaml' in modules)
+
+        # PyYAML is imported when parsing YAML
+        result = run_python(
+            'import yafowil.yaml.parser\n'
+            'print(yafowil.yaml.parser.yaml_loader.__name__)\n'
+        )
+        self.assertTrue('yaml' in imported_modules(result.stderr))
+        self.assertTrue(result.stdout.strip() in ('CSafeLoader', 'SafeLoader'))
+
+    def test_resources_in_fresh_process(self):
+        # package resources are resolved without relying on other modules
+        # importing ``importlib.resources``
+        result = run_python(
+            'from yafowil.yaml.parser import translate_path\n'
+            'print(translate_path("yafowil.yaml:demo_form.yaml"))\n'
+            'import yafowil.yaml\n'
+            'form = yafowil.yaml.parse_from_YAML(\n'
+            '    "yafowil.yaml:demo_form.yaml",\n'
+            '    message_factory=lambda msgid, default=None: msgid\n'
+            ')\n'
+            'print(form.name)\n'
+        )
+        self.assertEqual(result.stdout.split(), [
+            os.path.join(os.path.dirname(yafowil.yaml.parser.__file__),
+                         'demo_form.yaml'),
+            'demo_form'
+        ])
+
+    def test_schema_in_fresh_process(self):
+        # blueprints of the widget registry are known to the schema
+        result = run_python(
+            'from yafowil.yaml.schema import default_schema\n'
+            'errors = default_schema.validate_data({\n'
+            '    "factory": "form",\n'
+            '    "widgets": [{"field": {"factory": "field:label:texxt"}}]\n'
+            '})\n'
+            'print("\\n".join([error.message for error in errors]))\n'
+        )
+        self.assertEqual(
+            result.stdout.strip().split('\n'),
+            ["Unknown blueprint 'texxt'"]
+        )
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.cache import DefinitionCache
+from yafowil.yaml.instrumentation import Instrumentation
+from yafowil.yaml.tests.test_yaml import DummyContext
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import unittest
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_metrics(self):
+        instrumentation = Instrumentation()
+        instrumentation.timing('io', 0.5)
+        instrumentation.timing('io', 0.25)
+        instrumentation.count('nodes')
+        instrumentation.count('nodes', 2)
+        self.assertEqual(instrumentation.metrics(), {
+            'io.seconds': 0.75,
+            'nodes': 3
+        })
+        self.assertEqual(instrumentation.metrics(prefix='yafowil.yaml.'), {
+            'yafowil.yaml.io.seconds': 0.75,
+            'yafowil.yaml.nodes': 3
+        })
+        instrumentation.reset()
+        self.assertEqual(instrumentation.metrics(), {})
+
+    def test_hooks(self):
+        instrumentation = Instrumentation()
+        recorded = list()
+
+        def hook(kind, name, value):
+            recorded.append((kind, name, value))
+
+        instrumentation.subscribe(hook)
+        instrumentation.timing('scan', 1.0)
+        instrumentation.count('expressions')
+        instrumentation.unsubscribe(hook)
+        instrumentation.count('expressions')
+        self.assertEqual(recorded, [
+            ('timing', 'scan', 1.0),
+            ('counter', 'expressions', 1)
+        ])
+
+
+class TestParserInstrumentation(TempdirTestCase):
+
+    def test_parser(self):
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            props:
+                action: expr:context.some_attr
+            widgets:
+            - first:
+                nest: sub.yaml
+            - second:
+                nest: sub.yaml
+        """)
+        self.write('sub.yaml', """
+            factory: compound
+            widgets:
+            - field:
+                factory: text
+                value: python:'value'
+        """)
+        instrumentation = Instrumentation()
+        parse_from_YAML(
+            path,
+            DummyContext(),
+            cache=DefinitionCache(),
+            instrumentation=instrumentation
+        )
+        metrics = instrumentation.metrics()
+        self.assertEqual(metrics['nodes'], 5)
+        self.assertEqual(metrics['expressions'], 3)
+        self.assertEqual(metrics['nest_loads'], 1)
+        self.assertEqual(sorted([
+            key for key in metrics if key.endswith('.seconds')
+        ]), [
+            'factory.seconds',
+            'io.seconds',
+            'load_definition.seconds',
+            'nest.seconds',
+            'resolve.seconds',
+            'scan.seconds',
+            'total.seconds'
+        ])
+        self.assertTrue(
+            metrics['total.seconds'] >= metrics['factory.seconds']
+        )
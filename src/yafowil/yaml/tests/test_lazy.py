@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+from yafowil.base import factory
+from yafowil.tests import fxml
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.instrumentation import Instrumentation
+from yafowil.yaml.lazy import LazyWidget
+from yafowil.yaml.lazy import lazy_widget
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.stream import stream_from_YAML
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+
+
+class TestLazy(TempdirTestCase):
+
+    def test_lazy_widget(self):
+        materialized = list()
+
+        def materialize(widget):
+            materialized.append(widget.name)
+            widget['child'] = factory('text', value='value')
+
+        def builder(widget, factory):
+            widget['built'] = factory('text')
+
+        factory.register('lazy_test_built', builders=[builder])
+        self.addCleanup(factory._blueprints.pop, 'lazy_test_built')
+        widget = factory('compound:lazy_test_built', name='lazy', props={
+            'a': 'b'
+        })
+        lazy = lazy_widget(widget, materialize)
+        self.assertTrue(isinstance(lazy, LazyWidget))
+        self.assertFalse(lazy.materialized)
+        self.assertEqual(lazy.name, 'lazy')
+        self.assertEqual(lazy.attrs['a'], 'b')
+        self.assertEqual(materialized, [])
+        self.assertEqual(list(lazy.keys()), ['built', 'child'])
+        self.assertTrue(lazy['built'].parent is lazy)
+        self.assertTrue(lazy.materialized)
+        self.assertEqual(materialized, ['lazy'])
+        self.assertEqual(len(lazy), 2)
+        self.assertEqual(materialized, ['lazy'])
+
+    def test_lazy_parser(self):
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            widgets:
+            - field:
+                factory: text
+            - advanced:
+                nest: advanced.yaml
+        """)
+        self.write('advanced.yaml', """
+            factory: fieldset
+            props:
+                legend: Advanced
+            widgets:
+            - first:
+                factory: text
+            - second:
+                factory: text
+        """)
+        instrumentation = Instrumentation()
+        form = parse_from_YAML(
+            path,
+            lazy=True,
+            instrumentation=instrumentation
+        )
+        advanced = form['advanced']
+        self.assertTrue(isinstance(advanced, LazyWidget))
+        self.assertEqual(advanced.attrs['legend'], 'Advanced')
+        self.assertEqual(instrumentation.counters['nodes'], 3)
+        self.assertEqual(
+            fxml(form()),
+            fxml(parse_from_YAML(path)())
+        )
+        self.assertEqual(instrumentation.counters['nodes'], 5)
+        self.assertEqual(advanced['first'].path, [
+            'mainform', 'advanced', 'first'
+        ])
+
+        # lazy widgets are yielded but not materialized when streaming
+        items = list(stream_from_YAML(path, lazy=True))
+        self.assertEqual([item[0] for item in items], [
+            ('field',),
+            ('advanced',),
+            ()
+        ])
+        self.assertFalse(items[1][1].materialized)
+        self.assertEqual(list(items[1][1].keys()), ['first', 'second'])
+
+    def test_lazy_circular(self):
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            widgets:
+            - sub:
+                nest: sub.yaml
+        """)
+        sub_path = self.write('sub.yaml', """
+            factory: compound
+            widgets:
+            - main:
+                nest: main.yaml
+        """)
+        form = parse_from_YAML(path, lazy=True)
+        with self.assertRaises(YAMLTransformationError) as arc:
+            form['sub'].keys()
+        self.assertEqual(
+            str(arc.exception),
+            'Circular nesting detected: {0} -> {1} -> {0}'.format(
+                path,
+                sub_path
+            )
+        )
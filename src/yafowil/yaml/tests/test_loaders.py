@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from yafowil.yaml import YAMLParser
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.cache import DiskCache
+from yafowil.yaml.parser import CommonTransformationError
+from yafowil.yaml.parser import DefinitionLoader
+from yafowil.yaml.parser import JSONTransformationError
+from yafowil.yaml.parser import definition_loaders
+from yafowil.yaml.parser import json_definition_loader
+from yafowil.yaml.parser import yaml_definition_loader
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import marshal
+import os
+import yafowil.yaml.parser
+
+
+class MarshalLoader(DefinitionLoader):
+    name = 'marshal'
+    binary = True
+    errors = (EOFError, ValueError, TypeError)
+
+    def sniff(self, head):
+        return head.startswith(b'YDEF')
+
+    def loads(self, parser, source):
+        if not source.startswith(b'YDEF'):
+            raise ValueError('invalid header')
+        return marshal.loads(source[4:])
+
+
+class TestLoaders(TempdirTestCase):
+
+    def test_lookup(self):
+        lookup = definition_loaders.lookup
+        self.assertTrue(lookup('form.json') is json_definition_loader)
+        self.assertTrue(lookup('form.yaml') is yaml_definition_loader)
+        self.assertTrue(lookup('form.yml') is yaml_definition_loader)
+        self.assertTrue(lookup('form.txt') is yaml_definition_loader)
+
+    def test_json_backend(self):
+        path = self.write('form.json', '{"name": "form", "value": NaN}')
+        parser = YAMLParser(path)
+        data = parser.load_file(path)
+        self.assertEqual(data['name'], 'form')
+        self.assertTrue(data['value'] != data['value'])
+        # falls back to stdlib json without fast backend
+        backend = yafowil.yaml.parser.json_backend
+        yafowil.yaml.parser.json_backend = None
+        self.addCleanup(
+            setattr,
+            yafowil.yaml.parser,
+            'json_backend',
+            backend
+        )
+        self.assertEqual(parser.load_file(path)['name'], 'form')
+        path = self.write('broken.json', '{"name": ')
+        with self.assertRaises(JSONTransformationError) as arc:
+            parser.load_file(path)
+        self.assertEqual(str(arc.exception), (
+            "Cannot parse JSON from given path '{0}'. Original exception "
+            "was:\nJSONDecodeError: Expecting value: line 1 column 10 "
+            "(char 9)"
+        ).format(path))
+
+    def test_custom_loader(self):
+        loader = MarshalLoader()
+        definition_loaders.register(loader)
+        self.addCleanup(definition_loaders.unregister, loader)
+        data = {
+            'factory': 'form',
+            'name': 'marshalform',
+            'widgets': [{'field': {'factory': 'text'}}]
+        }
+        path = self.write('form.def', b'YDEF' + marshal.dumps(data))
+        self.assertTrue(definition_loaders.lookup(path) is loader)
+        form = parse_from_YAML(path, cache=None)
+        self.assertEqual(form.name, 'marshalform')
+        self.assertEqual(list(form.keys()), ['field'])
+
+        # binary sources are supported by disk cache
+        disk_cache = DiskCache(os.path.join(self.tempdir, 'cache'))
+        parse_from_YAML(path, cache=None, disk_cache=disk_cache)
+        parse_from_YAML(path, cache=None, disk_cache=disk_cache)
+        self.assertEqual((disk_cache.hits, disk_cache.misses), (1, 1))
+
+        # files without known ending and not sniffed are loaded as YAML
+        path = self.write('form.txt', 'factory: form\nname: yamlform')
+        self.assertEqual(parse_from_YAML(path, cache=None).name, 'yamlform')
+
+        # loader errors
+        loader.extensions = ('ydef',)
+        path = self.write('broken.ydef', b'YDEF')
+        with self.assertRaises(CommonTransformationError) as arc:
+            parse_from_YAML(path, cache=None)
+        self.assertEqual(str(arc.exception), (
+            "Cannot parse MARSHAL from given path '{0}'. Original exception "
+            "was:\nEOFError: EOF read where object expected"
+        ).format(path))
+        path = os.path.join(self.tempdir, 'inexistent.ydef')
+        with self.assertRaises(CommonTransformationError) as arc:
+            parse_from_YAML(path, cache=None)
+        self.assertEqual(
+            str(arc.exception),
+            "File not found: '{0}'".format(path)
+        )
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.batch import load_definitions
+from yafowil.yaml.cache import DefinitionCache
+from yafowil.yaml.cache import resource_cache
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.parser import is_resource
+from yafowil.yaml.parser import translate_path
+from yafowil.yaml.stream import stream_from_YAML
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import importlib
+import os
+import sys
+import zipfile
+
+
+class TestResources(TempdirTestCase):
+
+    def setUp(self):
+        super(TestResources, self).setUp()
+        resource_cache.clear()
+
+    def tearDown(self):
+        super(TestResources, self).tearDown()
+        resource_cache.clear()
+
+    def test_is_resource(self):
+        self.assertTrue(is_resource('yafowil.yaml:demo_form.yaml'))
+        self.assertTrue(is_resource('package:forms/form.yaml'))
+        self.assertFalse(is_resource('/path/to/form.yaml'))
+        self.assertFalse(is_resource('form.yaml'))
+        self.assertFalse(is_resource('C:\\forms\\form.yaml'))
+        self.assertFalse(is_resource('C:/forms/form.yaml'))
+        self.assertFalse(is_resource(None))
+
+    def test_translate_path(self):
+        spec = 'yafowil.yaml:demo_form.yaml'
+        path = translate_path(spec)
+        self.assertEqual(path, os.path.join(
+            os.path.dirname(importlib.import_module('yafowil.yaml').__file__),
+            'demo_form.yaml'
+        ))
+        self.assertTrue(translate_path(spec) is path)
+        self.assertEqual((resource_cache.hits, resource_cache.misses), (1, 1))
+        self.assertEqual(
+            translate_path('yafowil.yaml:tests/__init__.py'),
+            os.path.join(os.path.dirname(path), 'tests', '__init__.py')
+        )
+        self.assertEqual(translate_path('/some/path'), '/some/path')
+        # explicit invalidation
+        resource_cache.pop(spec)
+        self.assertFalse(spec in resource_cache)
+
+    def test_zipped_package(self):
+        archive = os.path.join(self.tempdir, 'forms.zip')
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('yafowil_yaml_zipped/__init__.py', '')
+            zf.writestr('yafowil_yaml_zipped/forms/main.yaml', (
+                'factory: form\n'
+                'name: zipform\n'
+                'widgets:\n'
+                '- sub:\n'
+                '    nest: sub.yaml\n'
+                '- other:\n'
+                '    nest: yafowil_yaml_zipped:other.yaml\n'
+            ))
+            zf.writestr('yafowil_yaml_zipped/forms/sub.yaml', (
+                'factory: compound\n'
+                'widgets:\n'
+                '- field:\n'
+                '    factory: text\n'
+            ))
+            zf.writestr('yafowil_yaml_zipped/other.yaml', 'factory: text\n')
+        sys.path.insert(0, archive)
+        self.addCleanup(sys.path.remove, archive)
+        self.addCleanup(sys.modules.pop, 'yafowil_yaml_zipped', None)
+        spec = 'yafowil_yaml_zipped:forms/main.yaml'
+        # resources are read from archive without extracting them
+        self.assertEqual(translate_path(spec), spec)
+        cache = DefinitionCache()
+        form = parse_from_YAML(spec, cache=cache)
+        self.assertEqual(form.name, 'zipform')
+        self.assertEqual(form['sub']['field'].blueprints, ['text'])
+        self.assertEqual(form['other'].blueprints, ['text'])
+        self.assertEqual(len(cache), 3)
+        parse_from_YAML(spec, cache=cache)
+        self.assertEqual(cache.hits, 3)
+        # batch loaded resources are cached
+        cache = DefinitionCache()
+        with ThreadPoolExecutor() as executor:
+            definitions = load_definitions(
+                [spec],
+                cache=cache,
+                executor=executor
+            )
+        self.assertEqual(len(definitions), 3)
+        self.assertEqual(len(cache), 3)
+        parse_from_YAML(spec, cache=cache)
+        self.assertEqual(cache.hits, 3)
+        items = list(stream_from_YAML(spec, cache=None))
+        self.assertEqual(items[-1][1].name, 'zipform')
+        with self.assertRaises(YAMLTransformationError) as arc:
+            parse_from_YAML('yafowil_yaml_zipped:inexistent.yaml')
+        self.assertEqual(
+            str(arc.exception),
+            "File not found: 'yafowil_yaml_zipped:inexistent.yaml'"
+        )
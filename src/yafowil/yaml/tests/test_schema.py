@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+from yafowil.base import factory
+from yafowil.yaml.schema import DefinitionValidationError
+from yafowil.yaml.schema import Schema
+from yafowil.yaml.schema import default_schema
+from yafowil.yaml.schema import validate_file
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import json
+import os
+import yaml
+
+
+invalid_yaml = """
+factory: form
+name: demoform
+mode: bogus
+widgets:
+- firstfield:
+    factory: field:label:*validate:texxt
+    custom:
+      validate:
+        extractor: context.validate
+        edit_renderers:
+        - context.render
+        - [nested]
+- secondfield:
+    factory: text
+  thirdfield:
+    factory: text
+- fourthfield:
+    factory: "#inexistent_macro"
+- fifthfield:
+    factory: field:*undefined:text
+    props: value
+    widgets: child
+- sixthfield:
+    factory: text
+    lable: Sixth
+"""
+
+
+class TestSchema(TempdirTestCase):
+
+    def setUp(self):
+        super(TestSchema, self).setUp()
+        default_schema.cache.clear()
+
+    def tearDown(self):
+        super(TestSchema, self).tearDown()
+        default_schema.cache.clear()
+
+    def test_validate(self):
+        schema = Schema()
+        node = yaml.compose(invalid_yaml, yaml.SafeLoader)
+        self.assertEqual([str(e) for e in schema.validate(node, 'f.yaml')], [
+            "f.yaml:4:7: Invalid mode 'bogus', expected one of edit, display, "
+            "skip",
+            "f.yaml:7:14: Unknown blueprint 'texxt'",
+            "f.yaml:10:9: Unknown custom chain key 'extractor', expected one "
+            "of extractors, edit_renderers, preprocessors, builders, "
+            "display_renderers",
+            "f.yaml:13:11: Expected string or list of strings",
+            "f.yaml:14:3: Expected mapping containing widget name as only key",
+            "f.yaml:19:14: Macro named 'inexistent_macro' is not registered "
+            "in factory",
+            "f.yaml:21:14: Custom blueprint '*undefined' not defined in "
+            "'custom'",
+            "f.yaml:22:12: Expected mapping",
+            "f.yaml:23:14: Expected list of widgets",
+            "f.yaml:26:5: Unknown widget definition key 'lable'"
+        ])
+        errors = schema.validate(node, 'f.yaml')
+        self.assertEqual(errors[0].path, 'f.yaml')
+        self.assertEqual((errors[0].line, errors[0].column), (4, 7))
+        self.assertEqual(errors[0].message, (
+            "Invalid mode 'bogus', expected one of edit, display, skip"
+        ))
+
+        # loaded data contains no line and column
+        errors = schema.validate_data(yaml.safe_load(invalid_yaml))
+        self.assertEqual(len(errors), 10)
+        self.assertEqual(
+            str(errors[-1]),
+            "<source>: Unknown widget definition key 'lable'"
+        )
+        self.assertEqual(errors[-1].line, None)
+
+        # blueprints are not checked without factory
+        schema = Schema(factory=None)
+        self.assertEqual(len(schema.validate(node, 'f.yaml')), 7)
+
+        # valid definitions
+        valid = """
+            base: &base
+              factory: field:label:text
+              mode: expr:context.mode
+            factory: form
+            name: demoform
+            widgets:
+            - field:
+                <<: *base
+                props:
+                  label: Field
+            - nested:
+                nest: sub.yaml
+        """
+        factory.register_macro('labeled', 'field:label', {})
+        self.addCleanup(factory._macros.pop, 'labeled')
+        self.assertEqual(Schema().validate_data({
+            'factory': 'form',
+            'widgets': [{'field': {'factory': '#labeled:text'}}]
+        }), [])
+        errors = Schema().validate(yaml.compose(valid, yaml.SafeLoader))
+        self.assertEqual([str(e) for e in errors], [
+            "<source>:2:13: Unknown widget definition key 'base'"
+        ])
+        self.assertEqual(Schema().check(
+            yaml.compose(valid, yaml.SafeLoader), 'f.yaml'
+        )[1], ['sub.yaml'])
+
+    def test_validate_file(self):
+        main_path = self.write('main.yaml', (
+            'factory: form\n'
+            'name: main\n'
+            'widgets:\n'
+            '- sub:\n'
+            '    nest: sub.yaml\n'
+            '- json:\n'
+            '    nest: sub.json\n'
+        ))
+        self.write('sub.yaml', (
+            'factory: compound\n'
+            'widgets:\n'
+            '- field:\n'
+            '    factory: text\n'
+        ))
+        self.write('sub.json', json.dumps({'factory': 'text'}))
+        self.assertEqual(validate_file(main_path), None)
+        cache = default_schema.cache
+        self.assertEqual(len(cache), 3)
+        validate_file(main_path)
+        self.assertEqual(cache.hits, 3)
+
+        # errors of nested definitions, validation results get invalidated
+        self.write('sub.yaml', (
+            'factory: compound\n'
+            'widgets:\n'
+            '- field:\n'
+            '    factory: texxt\n'
+            '    props: 1\n'
+        ))
+        self.write('sub.json', json.dumps({'factory': 'text', 'foo': 1}))
+        with self.assertRaises(DefinitionValidationError) as arc:
+            validate_file(main_path)
+        sub_path = os.path.join(self.tempdir, 'sub.yaml')
+        json_path = os.path.join(self.tempdir, 'sub.json')
+        self.assertEqual(str(arc.exception).split('\n'), [
+            'Invalid form definition:',
+            "{0}:4:14: Unknown blueprint 'texxt'".format(sub_path),
+            "{0}:5:12: Expected mapping".format(sub_path),
+            "{0}: Unknown widget definition key 'foo'".format(json_path)
+        ])
+        self.assertEqual(len(arc.exception.errors), 3)
+
+        # syntax errors and missing files
+        self.write('sub.yaml', 'factory: [\n')
+        os.remove(json_path)
+        with self.assertRaises(DefinitionValidationError) as arc:
+            validate_file(main_path)
+        self.assertEqual(str(arc.exception).split('\n'), [
+            'Invalid form definition:',
+            "{0}:2:1: expected the node content, but found '<stream end>'"
+            .format(sub_path),
+            "{0}: File not found: '{0}'".format(json_path)
+        ])
+
+        self.write('main.yaml', '')
+        with self.assertRaises(DefinitionValidationError) as arc:
+            validate_file(main_path)
+        self.assertEqual(
+            str(arc.exception),
+            'Invalid form definition:\n{0}: Empty form definition'.format(
+                main_path
+            )
+        )
+
+        # package resources
+        validate_file('yafowil.yaml:demo_form.yaml')
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+from yafowil.tests import fxml
+from yafowil.yaml import YAMLParser
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml import parse_from_source
+from yafowil.yaml.cache import LRUCache
+from yafowil.yaml.parser import FileNestResolver
+from yafowil.yaml.parser import JSONTransformationError
+from yafowil.yaml.parser import SourceNestResolver
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.parser import definition_loaders
+from yafowil.yaml.parser import json_definition_loader
+from yafowil.yaml.parser import yaml_definition_loader
+from yafowil.yaml.tests import test_yaml
+from yafowil.yaml.tests.test_yaml import DummyContext
+from yafowil.yaml.tests.test_yaml import _
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import io
+import mmap
+import os
+
+
+class TestSource(TempdirTestCase):
+
+    def test_parse_from_source(self):
+        raw = test_yaml.TestYAML.yaml_tmpl
+        path = os.path.join(self.tempdir, 'tmpl.yaml')
+        with open(path, 'w') as file:
+            file.write(raw)
+        context = DummyContext()
+        expected = fxml(parse_from_YAML(path, context, _)())
+        cache = LRUCache()
+        sources = [
+            raw,
+            raw.encode('utf-8'),
+            memoryview(raw.encode('utf-8')),
+            io.StringIO(raw),
+            io.BytesIO(raw.encode('utf-8'))
+        ]
+        for source in sources:
+            form = parse_from_source(source, 'yaml', context, _, cache=cache)
+            self.assertEqual(fxml(form()), expected)
+        # cached by content hash
+        self.assertEqual(len(cache), 1)
+        self.assertEqual((cache.hits, cache.misses), (4, 1))
+
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            form = parse_from_source(mapped, None, context, _, cache=None)
+            # buffer has been released
+            mapped.close()
+        self.assertEqual(form.name, 'demoform')
+
+        json_source = test_yaml.TestYAML.json_tmpl
+        json_path = os.path.join(self.tempdir, 'tmpl.json')
+        with open(json_path, 'w') as file:
+            file.write(json_source)
+        form = parse_from_source(json_source, 'json', context, _, cache=None)
+        self.assertEqual(
+            fxml(form()),
+            fxml(parse_from_YAML(json_path, context, _)())
+        )
+
+        data = {'factory': 'form', 'name': 'dictform'}
+        self.assertEqual(parse_from_source(data).name, 'dictform')
+
+    def test_sniff(self):
+        sniff = definition_loaders.sniff
+        json_loader = json_definition_loader
+        yaml_loader = yaml_definition_loader
+        self.assertTrue(sniff(b'{"factory": "form"}') is json_loader)
+        self.assertTrue(sniff(b' \n {\n  "a": 1}') is json_loader)
+        self.assertTrue(sniff(b'{}') is json_loader)
+        self.assertTrue(sniff(b'[{"a": 1}]') is json_loader)
+        self.assertTrue(sniff(b'factory: form') is yaml_loader)
+        self.assertTrue(sniff(b'{factory: form}') is yaml_loader)
+        self.assertTrue(sniff(b'') is yaml_loader)
+
+        # sniffed JSON sources are loaded with the JSON loader
+        form = parse_from_source(
+            '{"factory": "form", "name": "jsonform", '
+            '"props": {"action": "a"}}',
+            cache=None
+        )
+        self.assertEqual(form.name, 'jsonform')
+        with self.assertRaises(JSONTransformationError):
+            parse_from_source('{"factory": "form",}', cache=None)
+
+        # files without known ending are sniffed
+        path = os.path.join(self.tempdir, 'form.def')
+        with open(path, 'w') as file:
+            file.write('{"factory": "form", "name": "fileform"}')
+        self.assertTrue(definition_loaders.lookup(path) is json_loader)
+        self.assertEqual(parse_from_YAML(path, cache=None).name, 'fileform')
+
+    def test_source_errors(self):
+        with self.assertRaises(YAMLTransformationError) as arc:
+            parse_from_source('a: {]', cache=None)
+        self.assertTrue(str(arc.exception).startswith(
+            "Cannot parse YAML from given path '<source>'. "
+            "Original exception was:\n"
+        ))
+        with self.assertRaises(JSONTransformationError):
+            parse_from_source('{"a": ', 'json', cache=None)
+        with self.assertRaises(KeyError):
+            parse_from_source('a: b', 'inexistent', cache=None)
+
+    def test_nest_resolvers(self):
+        sources = {
+            'main': (
+                'factory: form\n'
+                'name: mainform\n'
+                'widgets:\n'
+                '- sub:\n'
+                '    nest: sub\n'
+            ),
+            'sub': (
+                'factory: compound\n'
+                'widgets:\n'
+                '- field:\n'
+                '    factory: text\n'
+            )
+        }
+        lookups = list()
+
+        def lookup(key):
+            lookups.append(key)
+            return sources[key]
+
+        resolver = SourceNestResolver(lookup, 'yaml', cache=None)
+        form = parse_from_source(
+            sources['main'],
+            cache=None,
+            nest_resolver=resolver
+        )
+        self.assertEqual(lookups, ['sub'])
+        self.assertEqual(form['sub']['field'].path, [
+            'mainform', 'sub', 'field'
+        ])
+
+        # circular nesting, main source is not identified by a key
+        sources['sub'] = 'widgets:\n- main:\n    nest: main\n'
+        with self.assertRaises(YAMLTransformationError) as arc:
+            parse_from_source(sources['main'], nest_resolver=resolver)
+        self.assertEqual(
+            str(arc.exception),
+            'Circular nesting detected: sub -> main -> sub'
+        )
+
+        # nested files relative to directory
+        with open(os.path.join(self.tempdir, 'sub.yaml'), 'w') as file:
+            file.write('factory: compound\nname: subform\n')
+        resolver = FileNestResolver(self.tempdir)
+        form = parse_from_source(
+            sources['main'].replace('nest: sub', 'nest: sub.yaml'),
+            nest_resolver=resolver
+        )
+        self.assertEqual(form['sub'].blueprints, ['compound'])
+        parser = YAMLParser(None, nest_resolver=resolver)
+        self.assertEqual(
+            resolver.resolve(parser, 'sub.yaml'),
+            os.path.join(self.tempdir, 'sub.yaml')
+        )
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+from yafowil.tests import fxml
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.stream import StreamingParser
+from yafowil.yaml.stream import stream_from_YAML
+from yafowil.yaml.tests import test_yaml
+from yafowil.yaml.tests.test_yaml import DummyContext
+from yafowil.yaml.tests.test_yaml import _
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import os
+import yafowil.yaml.parser
+import yaml
+
+
+class TestStream(TempdirTestCase):
+
+    def test_stream(self):
+        path = self.write('tmpl.yaml', test_yaml.TestYAML.yaml_tmpl)
+        json_path = self.write('tmpl.json', test_yaml.TestYAML.json_tmpl)
+        context = DummyContext()
+        expected = parse_from_YAML(path, context, _)
+        loaders = [yaml.SafeLoader, getattr(yaml, 'CSafeLoader', None)]
+        for loader in [loader for loader in loaders if loader]:
+            items = list(stream_from_YAML(
+                path,
+                context,
+                _,
+                yaml_loader=loader
+            ))
+            self.assertEqual([item[0] for item in items], [
+                ('firstfield',),
+                ('secondfield',),
+                ()
+            ])
+            form = items[-1][1]
+            self.assertEqual(form.treerepr(), expected.treerepr())
+            self.assertEqual(fxml(form()), fxml(expected()))
+        form = StreamingParser(json_path, context, _)()
+        self.assertEqual(form.treerepr(), expected.treerepr())
+
+    def test_stream_nested_and_aliases(self):
+        path = self.write('main.yaml', """
+            widgets:
+            - sub:
+                nest: sub.yaml
+            - defaults: &defaults
+                factory: compound
+                props:
+                    class: &class some
+                widgets:
+                - inner:
+                    factory: text
+            - merged:
+                <<: *defaults
+                props:
+                    class: *class
+                    title: merged
+            - aliased: *defaults
+            factory: form
+            name: mainform
+        """)
+        self.write('sub.yaml', """
+            factory: compound
+            widgets:
+            - field:
+                factory: text
+        """)
+        items = list(stream_from_YAML(path))
+        self.assertEqual([item[0] for item in items], [
+            ('sub', 'field'),
+            ('sub',),
+            ('defaults', 'inner'),
+            ('defaults',),
+            ('merged', 'inner'),
+            ('merged',),
+            ('aliased', 'inner'),
+            ('aliased',),
+            ()
+        ])
+        form = items[-1][1]
+        self.assertEqual(form.name, 'mainform')
+        self.assertEqual(form.treerepr(), parse_from_YAML(path).treerepr())
+        self.assertEqual(form['merged'].attrs['class'], 'some')
+        self.assertEqual(form['merged'].attrs['title'], 'merged')
+        self.assertEqual(form['aliased'].attrs['class'], 'some')
+
+    def test_stream_nest_after_widgets(self):
+        self.write('sub.yaml', 'factory: compound\n')
+        # ``widgets`` is not streamed if ``nest`` is already known
+        path = self.write('main.yaml', """
+            factory: form
+            name: form
+            widgets:
+            - sub:
+                nest: sub.yaml
+                widgets:
+                - ghost:
+                    factory: text
+            - merged:
+                <<: {nest: sub.yaml}
+                widgets:
+                - ghost:
+                    factory: text
+        """)
+        items = list(stream_from_YAML(path))
+        self.assertEqual(
+            [item[0] for item in items],
+            [('sub',), ('merged',), ()]
+        )
+        self.assertEqual(
+            items[-1][1].treerepr(),
+            parse_from_YAML(path).treerepr()
+        )
+
+        # ``nest`` after streamed ``widgets`` is refused
+        path = self.write('main.yaml', """
+            factory: form
+            name: form
+            widgets:
+            - sub:
+                widgets:
+                - ghost:
+                    factory: text
+                nest: sub.yaml
+        """)
+        with self.assertRaises(YAMLTransformationError) as arc:
+            list(stream_from_YAML(path))
+        self.assertEqual(str(arc.exception), (
+            "Cannot stream widget 'sub' in '{0}'. 'nest' must be defined "
+            "before 'widgets'"
+        ).format(path))
+
+    def test_stream_default_loader(self):
+        # module default loader is looked up at run time
+        loaded = list()
+
+        class Loader(yaml.SafeLoader):
+
+            def __init__(self, stream):
+                loaded.append(stream)
+                super(Loader, self).__init__(stream)
+
+        self.addCleanup(
+            setattr,
+            yafowil.yaml.parser,
+            'yaml_loader',
+            yafowil.yaml.parser.yaml_loader
+        )
+        yafowil.yaml.parser.yaml_loader = Loader
+        path = self.write('main.yaml', 'factory: form\nname: form\n')
+        form = StreamingParser(path)()
+        self.assertEqual(form.name, 'form')
+        self.assertEqual(len(loaded), 1)
+
+    def test_stream_errors(self):
+        path = self.write('main.yaml', 'factory: form\nwidgets: {]')
+        with self.assertRaises(YAMLTransformationError) as arc:
+            list(stream_from_YAML(path))
+        self.assertTrue(str(arc.exception).startswith(
+            "Cannot parse YAML from given path '{0}'".format(path)
+        ))
+        # same message as reported when loading the whole definition
+        message = str(arc.exception)
+        with self.assertRaises(YAMLTransformationError) as arc:
+            parse_from_YAML(path, cache=None)
+        self.assertEqual(message, str(arc.exception))
+        path = os.path.join(self.tempdir, 'inexistent.yaml')
+        with self.assertRaises(YAMLTransformationError) as arc:
+            list(stream_from_YAML(path))
+        self.assertEqual(
+            str(arc.exception),
+            "File not found: '{0}'".format(path)
+        )
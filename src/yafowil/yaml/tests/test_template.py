@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+from types import MappingProxyType
+from yafowil.base import factory
+from yafowil.tests import fxml
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.cache import DefinitionCache
+from yafowil.yaml.definition import WidgetDefinition
+from yafowil.yaml.template import FormTemplate
+from yafowil.yaml.template import clone_widget
+from yafowil.yaml.template import context_dependent
+from yafowil.yaml.tests import test_yaml
+from yafowil.yaml.tests.test_yaml import DummyContext
+from yafowil.yaml.tests.test_yaml import _
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+import sys
+
+
+class OtherContext(DummyContext):
+    some_attr = 'other'
+
+    def firstfield_value(self, widget, data):
+        return 'Other value'
+
+
+class TestTemplate(TempdirTestCase):
+
+    def test_context_dependent(self):
+        self.assertFalse(context_dependent(1))
+        self.assertFalse(context_dependent('foo'))
+        self.assertFalse(context_dependent('i18n:foo'))
+        self.assertFalse(context_dependent('python:foo'))
+        self.assertFalse(context_dependent('yafowil.base.factory'))
+        self.assertTrue(context_dependent('expr:context.foo'))
+        self.assertTrue(context_dependent('context.foo'))
+        self.assertFalse(context_dependent(MappingProxyType({'a': 'b'})))
+        self.assertTrue(context_dependent(MappingProxyType({
+            'a': MappingProxyType({'b': 'context.foo'})
+        })))
+
+    def test_clone_widget(self):
+        widget = factory('compound', name='root', props={'a': 'b'})
+        widget['child'] = factory('text', value='value')
+        clone = clone_widget(widget)
+        self.assertFalse(clone is widget)
+        self.assertEqual(clone.attrs['a'], 'b')
+        self.assertFalse(clone['child'] is widget['child'])
+        self.assertEqual(clone['child'].getter, 'value')
+        self.assertEqual(fxml(clone()), fxml(widget()))
+
+    def test_template(self):
+        path = self.write('tmpl.yaml', test_yaml.TestYAML.yaml_tmpl)
+        template = FormTemplate(path, message_factory=_)
+        self.assertEqual(template.prototype.name, 'demoform')
+        for context in [DummyContext(), OtherContext()]:
+            form = template(context)
+            self.assertFalse(form is template.prototype)
+            self.assertEqual(
+                form.treerepr(),
+                parse_from_YAML(path, context, _).treerepr()
+            )
+            self.assertEqual(
+                fxml(form()),
+                fxml(parse_from_YAML(path, context, _)())
+            )
+        form_1 = template(DummyContext())
+        form_2 = template(OtherContext())
+        self.assertIn('First value', form_1())
+        self.assertIn('Other value', form_2())
+        # context independent values are shared
+        self.assertTrue(
+            form_1['firstfield'].attrs['data']
+            is form_2['firstfield'].attrs['data']
+        )
+        # widgets with context dependent custom chains are created again
+        self.assertFalse(
+            form_1['secondfield'].extractors
+            is form_2['secondfield'].extractors
+        )
+
+    def test_template_nested(self):
+        path = self.write('main.yaml', """
+            factory: form
+            name: mainform
+            props:
+                action: context.some_attr
+            widgets:
+            - sub:
+                nest: sub.yaml
+        """)
+        self.write('sub.yaml', """
+            factory: compound
+            widgets:
+            - field:
+                factory: text
+                value: expr:context.some_attr
+                props:
+                    class: nested
+        """)
+        template = FormTemplate(path)
+        form = template(OtherContext())
+        self.assertEqual(form.treerepr().split('\n'), [
+            "<class 'yafowil.base.Widget'>: mainform",
+            "  <class 'yafowil.base.Widget'>: sub",
+            "    <class 'yafowil.base.Widget'>: field",
+            ""
+        ])
+        self.assertEqual(form['sub']['field'].getter(), 'other')
+        self.assertEqual(form['sub']['field'].attrs['class'], 'nested')
+        self.assertEqual(template(DummyContext())['sub']['field'].getter(), '')
+
+    def test_template_deep(self):
+        # nesting depth exceeds recursion limit
+        depth = sys.getrecursionlimit() + 100
+        data = {'factory': 'text'}
+        for i in range(depth):
+            data = {'factory': 'compound', 'widgets': [
+                {'child_{0}'.format(i): data}
+            ]}
+        data['name'] = 'deep'
+        path = self.write('deep.yaml', '')
+        cache = DefinitionCache()
+        cache.load(path, lambda path: WidgetDefinition.from_data(data))
+        template = FormTemplate(path, cache=cache)
+        prototype = template.prototype
+        for form in [prototype, template(), clone_widget(prototype)]:
+            node = form
+            for i in reversed(range(depth)):
+                node = node['child_{0}'.format(i)]
+            self.assertEqual(node.blueprints, ['text'])
+            self.assertEqual(len(node.path), depth + 1)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+from yafowil.yaml import parse_from_YAML
+from yafowil.yaml.cache import WatchedDefinitionCache
+from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.tests.test_yaml import TempdirTestCase
+from yafowil.yaml.watch import DefinitionWatcher
+from yafowil.yaml.watch import InotifyBackend
+from yafowil.yaml.watch import PollingBackend
+from yafowil.yaml.watch import inotify_simple
+import os
+import threading
+import unittest
+
+
+main_yaml = """
+factory: form
+name: main
+widgets:
+- sub:
+    nest: sub.yaml
+"""
+
+sub_yaml = """
+factory: compound
+widgets:
+- field:
+    factory: text
+"""
+
+
+class TestWatch(TempdirTestCase):
+
+    def test_watched_definition_cache(self):
+        path = self.write('main.yaml', main_yaml)
+        self.write('sub.yaml', sub_yaml)
+        cache = WatchedDefinitionCache()
+        form = parse_from_YAML(path, cache=cache)
+        self.assertEqual(form.name, 'main')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.misses, 2)
+        # files are not checked for modifications
+        self.write('sub.yaml', 'factory: text\n')
+        form = parse_from_YAML(path, cache=cache)
+        self.assertEqual(form['sub'].blueprints, ['compound'])
+        self.assertEqual(cache.hits, 2)
+
+    def test_polling_backend(self):
+        path = self.write('main.yaml', main_yaml)
+        missing = os.path.join(self.tempdir, 'missing.yaml')
+        backend = PollingBackend(interval=0.01)
+        backend.watch([path, missing])
+        self.assertEqual(backend.read(0), set())
+        self.assertEqual(backend.read(0.02), set())
+        self.write('main.yaml', main_yaml + '\n')
+        self.write('missing.yaml', sub_yaml)
+        self.assertEqual(backend.read(), set([path, missing]))
+        self.assertEqual(backend.read(0), set())
+        os.remove(missing)
+        self.assertEqual(backend.read(0), set([missing]))
+        backend.watch([path])
+        self.write('missing.yaml', sub_yaml)
+        self.assertEqual(backend.read(0), set())
+        backend.close()
+
+    @unittest.skipIf(inotify_simple is None, 'inotify_simple not installed')
+    def test_inotify_backend(self):
+        path = self.write('main.yaml', main_yaml)
+        missing = os.path.join(self.tempdir, 'missing.yaml')
+        backend = InotifyBackend()
+        backend.watch([path, missing])
+        self.assertEqual(backend.read(0), set())
+        self.write('main.yaml', main_yaml + '\n')
+        self.write('missing.yaml', sub_yaml)
+        self.assertEqual(backend.read(1), set([path, missing]))
+        backend.close()
+
+    def test_watcher(self):
+        main_path = self.write('main.yaml', main_yaml)
+        sub_path = self.write('sub.yaml', sub_yaml)
+        other_path = self.write('other.yaml', 'factory: text\nname: other\n')
+        watcher = DefinitionWatcher(
+            [main_path, other_path],
+            backend=PollingBackend()
+        )
+        self.assertTrue(isinstance(watcher.cache, WatchedDefinitionCache))
+        self.assertEqual(watcher.dependencies, {
+            main_path: frozenset([sub_path]),
+            other_path: frozenset()
+        })
+        self.assertEqual(
+            watcher.paths,
+            set([main_path, sub_path, other_path])
+        )
+        self.assertEqual(watcher.dependents(sub_path), set([main_path]))
+        self.assertEqual(watcher.dependents(main_path), set([main_path]))
+        self.assertEqual(watcher.check(), set())
+
+        cache = watcher.cache
+        self.assertEqual(len(cache), 3)
+        form = parse_from_YAML(main_path, cache=cache)
+        self.assertEqual(form['sub']['field'].blueprints, ['text'])
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.hits, 2)
+        main_definition = cache.get(main_path)[1]
+        other_definition = cache.get(other_path)[1]
+
+        changes = list()
+        watcher.listeners.append(changes.append)
+
+        # only changed definition gets reloaded
+        self.write('sub.yaml', sub_yaml.replace('text', 'textarea'))
+        self.assertEqual(watcher.check(), set([main_path]))
+        self.assertEqual(changes, [set([main_path])])
+        self.assertTrue(cache.get(main_path)[1] is main_definition)
+        self.assertTrue(cache.get(other_path)[1] is other_definition)
+        form = parse_from_YAML(main_path, cache=cache)
+        self.assertEqual(form['sub']['field'].blueprints, ['textarea'])
+
+        # definitions which cannot be loaded are kept
+        self.write('sub.yaml', '{]')
+        self.assertEqual(watcher.check(), set([main_path]))
+        self.assertTrue(isinstance(
+            watcher.errors[sub_path],
+            YAMLTransformationError
+        ))
+        form = parse_from_YAML(main_path, cache=cache)
+        self.assertEqual(form['sub']['field'].blueprints, ['textarea'])
+        self.write('sub.yaml', sub_yaml)
+        watcher.check()
+        self.assertEqual(watcher.errors, {})
+        form = parse_from_YAML(main_path, cache=cache)
+        self.assertEqual(form['sub']['field'].blueprints, ['text'])
+
+        # added nested definitions get watched
+        self.write('main.yaml', main_yaml + (
+            '- added:\n'
+            '    nest: added.yaml\n'
+        ))
+        added_path = os.path.join(self.tempdir, 'added.yaml')
+        self.assertEqual(watcher.check(), set([main_path]))
+        self.assertEqual(
+            watcher.dependencies[main_path],
+            frozenset([sub_path, added_path])
+        )
+        self.assertTrue(added_path in watcher.errors)
+        with self.assertRaises(YAMLTransformationError):
+            parse_from_YAML(main_path, cache=cache)
+        self.write('added.yaml', 'factory: text\n')
+        self.assertEqual(watcher.check(), set([main_path]))
+        form = parse_from_YAML(main_path, cache=cache)
+        self.assertEqual(form['added'].blueprints, ['text'])
+        self.assertEqual(watcher.errors, {})
+
+        watcher.remove(other_path)
+        self.assertFalse(other_path in watcher.paths)
+        watcher.close()
+
+    def test_watcher_thread(self):
+        main_path = self.write('main.yaml', main_yaml)
+        self.write('sub.yaml', sub_yaml)
+        watcher = DefinitionWatcher(
+            [main_path],
+            backend=PollingBackend(interval=0.01),
+            interval=0.01
+        )
+        reloaded = threading.Event()
+        watcher.listeners.append(lambda paths: reloaded.set())
+        watcher.start()
+        self.write('sub.yaml', sub_yaml.replace('text', 'textarea'))
+        self.assertTrue(reloaded.wait(5))
+        watcher.close()
+        form = parse_from_YAML(main_path, cache=watcher.cache)
+        self.assertEqual(form['sub']['field'].blueprints, ['textarea'])
+
+    def test_watcher_errors(self):
+        main_path = self.write('main.yaml', main_yaml)
+        sub_path = self.write('sub.yaml', sub_yaml)
+
+        class FailingBackend(PollingBackend):
+            # fails on first read
+
+            failed = False
+
+            def read(self, timeout=None):
+                if not self.failed:
+                    self.failed = True
+                    raise OSError('read failed')
+                return super(FailingBackend, self).read(timeout)
+
+        watcher = DefinitionWatcher(
+            [main_path],
+            backend=FailingBackend(interval=0.01),
+            interval=0.01
+        )
+
+        # failing listeners do not prevent others from being notified
+        fail = [True]
+
+        def failing_listener(paths):
+            if fail[0]:
+                raise ValueError('listener failed')
+
+        reloaded = threading.Event()
+        watcher.listeners.append(failing_listener)
+        watcher.listeners.append(lambda paths: reloaded.set())
+        self.assertEqual(watcher.reload([sub_path]), set([main_path]))
+        self.assertTrue(reloaded.is_set())
+        self.assertEqual(
+            str(watcher.errors[failing_listener]),
+            'listener failed'
+        )
+        fail[0] = False
+        watcher.reload([sub_path])
+        self.assertEqual(watcher.errors, {})
+
+        # watcher thread keeps running if checking fails
+        reloaded.clear()
+        watcher.start()
+        self.write('sub.yaml', sub_yaml.replace('text', 'textarea'))
+        self.assertTrue(reloaded.wait(5))
+        watcher.close()
+        self.assertTrue(watcher.backend.failed)
+        form = parse_from_YAML(main_path, cache=watcher.cache)
+        self.assertEqual(form['sub']['field'].blueprints, ['textarea'])
@@ -1,17 +1,31 @@
 # -*- coding: utf-8 -*-
 from uuid import UUID
+from yafowil.base import factory
 from yafowil.tests import YafowilTestCase
 from yafowil.tests import fxml
 from yafowil.yaml import YAMLParser
+from yafowil.yaml import definition_cache
 from yafowil.yaml import parse_from_YAML
 from yafowil.yaml import python_expression_globals
+from yafowil.yaml.cache import DiskCache
+from yafowil.yaml.cache import LRUCache
+from yafowil.yaml.cache import MessageCache
+from yafowil.yaml.cache import expression_cache
+from yafowil.yaml.cache import message_cache
+from yafowil.yaml.definition import WidgetDefinition
 from yafowil.yaml.parser import JSONTransformationError
 from yafowil.yaml.parser import YAMLTransformationError
+from yafowil.yaml.parser import compile_expression
+from yafowil.yaml.parser import parse_message
+from yafowil.yaml.parser import resolve_name
 import doctest
+import importlib
 import os
 import shutil
+import sys
 import tempfile
 import unittest
+import yafowil.yaml.parser
 import yaml
 
 
@@ -61,16 +75,30 @@ def _test_vocab(widget, data):
     return ['a', 'b', 'c']
 
 
-class TestYAML(YafowilTestCase):
+class TempdirTestCase(YafowilTestCase):
+    # test case providing a temporary directory
 
     def setUp(self):
-        super(TestYAML, self).setUp()
+        super(TempdirTestCase, self).setUp()
         self.tempdir = tempfile.mkdtemp()
 
     def tearDown(self):
-        super(TestYAML, self).tearDown()
+        super(TempdirTestCase, self).tearDown()
         shutil.rmtree(self.tempdir)
 
+    def write(self, name, raw):
+        path = os.path.join(self.tempdir, name)
+        with open(path, 'wb' if isinstance(raw, bytes) else 'w') as file:
+            file.write(raw)
+        return path
+
+
+class TestYAML(TempdirTestCase):
+
+    def setUp(self):
+        super(TestYAML, self).setUp()
+        definition_cache.clear()
+
     # Sample form definition
     yaml_tmpl = """
         factory: form
@@ -228,18 +256,52 @@ class TestYAML(YafowilTestCase):
         with self.assertRaises(NameError) as arc:
             parser.parse_definition_value('python:UUID')
         self.assertEqual(str(arc.exception), "name 'UUID' is not defined")
+        # expression globals are merged once per parser
+        self.addCleanup(python_expression_globals.pop, 'UUID')
         python_expression_globals['UUID'] = UUID
+        with self.assertRaises(NameError):
+            parser.parse_definition_value('python:UUID')
+        parser = YAMLParser(template_path, context=context, message_factory=_)
         UUID_ = parser.parse_definition_value('python:UUID')
         self.assertTrue(UUID_ is UUID)
         class CustomUUID(UUID):
             pass
-        parser.expression_globals['UUID'] = CustomUUID
+        expression_globals = {'UUID': CustomUUID}
+        parser = YAMLParser(
+            template_path,
+            context=context,
+            message_factory=_,
+            expression_globals=expression_globals
+        )
+        self.assertTrue(parser.expression_globals is expression_globals)
         UUID_ = parser.parse_definition_value('python:UUID')
         self.assertTrue(UUID_ is CustomUUID)
+        self.assertTrue(parser.python_globals is parser.python_globals)
+        self.assertFalse('__builtins__' in expression_globals)
+        self.assertFalse('__builtins__' in python_expression_globals)
+
+        # parsers do not share expression globals by default
+        parser = YAMLParser(template_path, context=context, message_factory=_)
+        self.assertEqual(parser.expression_globals, {})
+        self.assertFalse(
+            parser.expression_globals is
+            YAMLParser(template_path).expression_globals
+        )
 
         fn = parser.parse_definition_value('expr:context.firstfield_value()')
         self.assertEqual(fn.__name__, 'fetch_value')
         self.assertEqual(fn.__module__, 'yafowil.yaml.parser')
+        fn = parser.parse_definition_value(
+            'expr:context.firstfield_value(widget, data)'
+        )
+        self.assertEqual(fn(), 'First value')
+        fn = parser.parse_definition_value(
+            'expr:[widget + n for n in data]  # comment'
+        )
+        self.assertEqual(fn(widget=1, data=[1, 2]), [2, 3])
+        self.assertEqual(fn(1, [2]), [3])
+        self.assertTrue(parser.context_globals is parser.context_globals)
+        self.assertTrue(parser.context_globals['context'] is context)
 
         self.assertEqual(parser.parse_definition_value('i18n:foo'), 'foo')
         self.assertEqual(parser.parse_definition_value('i18n:foo:Foo'), 'Foo')
@@ -247,6 +309,37 @@ class TestYAML(YafowilTestCase):
             parser.parse_definition_value('i18n:foo:Foo:Fooo')
         self.assertEqual(str(arc.exception), 'to many : in i18n:foo:Foo:Fooo')
 
+    def test_yaml_loader(self):
+        if yaml.__with_libyaml__:
+            self.assertTrue(yafowil.yaml.parser.yaml_loader is yaml.CSafeLoader)
+        else:
+            self.assertTrue(yafowil.yaml.parser.yaml_loader is yaml.SafeLoader)
+
+        template_path = os.path.join(self.tempdir, 'tmpl.yaml')
+        with open(template_path, 'w') as file:
+            file.write(self.yaml_tmpl)
+        parser = YAMLParser(template_path, yaml_loader=yaml.SafeLoader)
+        self.assertEqual(
+            parser.load_yaml(template_path),
+            yaml.load(self.yaml_tmpl, yaml.SafeLoader)
+        )
+
+        # error messages are the same for pure python and libyaml loader
+        trash_path = os.path.join(self.tempdir, 'trash.yaml')
+        with open(trash_path, 'w') as file:
+            file.write("a: {]")
+        messages = list()
+        loaders = [yaml.SafeLoader]
+        if yaml.__with_libyaml__:
+            loaders.append(yaml.CSafeLoader)
+        for loader in loaders:
+            parser = YAMLParser(trash_path, yaml_loader=loader)
+            with self.assertRaises(YAMLTransformationError) as arc:
+                parser.load_yaml(trash_path)
+            messages.append(str(arc.exception))
+        self.assertEqual(len(set(messages)), 1)
+        self.assertTrue(messages[0].find('^') > -1)
+
     def test_parse_from_yaml(self):
         template_path = os.path.join(self.tempdir, 'tmpl.yaml')
         with open(template_path, 'w') as file:
@@ -294,6 +387,463 @@ class TestYAML(YafowilTestCase):
         </form>
         """, fxml(form()))
 
+    def test_definition_cache(self):
+        template_path = os.path.join(self.tempdir, 'tmpl.yaml')
+        with open(template_path, 'w') as file:
+            file.write(self.yaml_tmpl)
+        context = DummyContext()
+        form_1 = parse_from_YAML(template_path, context, _)
+        self.assertEqual(definition_cache.misses, 1)
+        self.assertEqual(definition_cache.hits, 0)
+        form_2 = parse_from_YAML(template_path, context, _)
+        self.assertEqual(definition_cache.misses, 1)
+        self.assertEqual(definition_cache.hits, 1)
+        self.assertFalse(form_1 is form_2)
+        self.assertEqual(fxml(form_1()), fxml(form_2()))
+
+        # cached widget definition is immutable
+        definition = definition_cache.load(template_path, None)
+        self.assertTrue(isinstance(definition, WidgetDefinition))
+        firstfield = definition.widgets[0]
+        self.assertEqual(firstfield.name, 'firstfield')
+        self.assertEqual(firstfield.props['label'], 'i18n:First Field')
+        with self.assertRaises(AttributeError):
+            firstfield.name = 'otherfield'
+        with self.assertRaises(TypeError):
+            firstfield.props['label'] = 'Other Label'
+
+        # changed definition gets reloaded
+        with open(template_path, 'w') as file:
+            file.write(self.yaml_tmpl.replace('demoaction', 'otheraction'))
+        form = parse_from_YAML(template_path, context, _)
+        self.assertEqual(form.attrs['action'], 'otheraction')
+        self.assertEqual(definition_cache.misses, 2)
+
+        # disable cache
+        parse_from_YAML(template_path, context, _, cache=None)
+        self.assertEqual(definition_cache.misses, 2)
+        self.assertEqual(definition_cache.hits, 2)
+
+        # definitions loaded with custom YAML loaders are cached separately
+        class UpperLoader(yaml.SafeLoader):
+            pass
+
+        UpperLoader.add_constructor(
+            '!upper',
+            lambda loader, node: loader.construct_scalar(node).upper()
+        )
+        raw = 'factory: form\nname: !upper demoform\n'
+        upper_path = self.write('upper.yaml', raw)
+        parser = YAMLParser(upper_path, yaml_loader=UpperLoader)
+        self.assertEqual(parser.load(upper_path).name, 'DEMOFORM')
+        parser = YAMLParser(upper_path)
+        with self.assertRaises(YAMLTransformationError):
+            parser.load(upper_path)
+        parser = YAMLParser(upper_path, yaml_loader=UpperLoader)
+        self.assertEqual(parser.load(upper_path).name, 'DEMOFORM')
+        self.assertEqual(definition_cache.misses, 4)
+        self.assertEqual(definition_cache.hits, 3)
+
+        # same applies to definitions loaded from source
+        source_cache = LRUCache()
+        parser = YAMLParser(upper_path, yaml_loader=UpperLoader)
+        definition = parser.load_source(raw, cache=source_cache)
+        self.assertEqual(definition.name, 'DEMOFORM')
+        parser = YAMLParser(upper_path)
+        with self.assertRaises(YAMLTransformationError):
+            parser.load_source(raw, cache=source_cache)
+
+    def test_compiled_expressions(self):
+        expression_cache.clear()
+        code = compile_expression('context.some_attr')
+        self.assertEqual(code.co_names, ('context', 'some_attr'))
+        self.assertTrue(compile_expression('context.some_attr') is code)
+        self.assertEqual(expression_cache.hits, 1)
+        self.assertEqual(expression_cache.misses, 1)
+
+        raw = """
+            factory: form
+            name: demoform
+            widgets:
+            - firstfield:
+                factory: text
+                value: expr:context.some_attr
+            - secondfield:
+                factory: text
+                value: expr:context.some_attr
+        """
+        template_path = os.path.join(self.tempdir, 'tmpl.yaml')
+        with open(template_path, 'w') as file:
+            file.write(raw)
+        context = DummyContext()
+        form = YAMLParser(template_path, context=context)()
+        self.assertEqual(expression_cache.hits, 3)
+        self.assertEqual(expression_cache.misses, 1)
+        self.assertEqual(form['firstfield'].getter(), '')
+
+        # syntax errors are reported at build time
+        raw = """
+            factory: form
+            name: demoform
+            widgets:
+            - firstfield:
+                factory: text
+                value: expr:context.(
+        """
+        with open(template_path, 'w') as file:
+            file.write(raw)
+        parser = YAMLParser(template_path, context=context)
+        with self.assertRaises(YAMLTransformationError) as arc:
+            parser()
+        msg = str(arc.exception).split('\n')
+        self.assertEqual(msg[0], (
+            "Cannot compile expression of widget 'firstfield' in '{0}'. "
+            "Original exception was:"
+        ).format(template_path))
+        self.assertTrue(msg[1].startswith('SyntaxError: '))
+
+    def test_disk_cache(self):
+        template_path = os.path.join(self.tempdir, 'tmpl.yaml')
+        with open(template_path, 'w') as file:
+            file.write(self.yaml_tmpl)
+        json_path = os.path.join(self.tempdir, 'tmpl.json')
+        with open(json_path, 'w') as file:
+            file.write(self.json_tmpl)
+        cache_dir = os.path.join(self.tempdir, 'cache')
+        context = DummyContext()
+        for path in [template_path, json_path]:
+            disk_cache = DiskCache(cache_dir)
+            form_1 = parse_from_YAML(
+                path,
+                context,
+                _,
+                cache=None,
+                disk_cache=disk_cache
+            )
+            self.assertEqual(disk_cache.misses, 1)
+            disk_cache = DiskCache(cache_dir)
+            form_2 = parse_from_YAML(
+                path,
+                context,
+                _,
+                cache=None,
+                disk_cache=disk_cache
+            )
+            self.assertEqual(disk_cache.hits, 1)
+            self.assertEqual(form_1.treerepr(), form_2.treerepr())
+
+        # data loaded with different YAML loaders is cached separately
+        class UpperLoader(yaml.SafeLoader):
+            pass
+
+        class LowerLoader(yaml.SafeLoader):
+            pass
+
+        UpperLoader.add_constructor(
+            '!case',
+            lambda loader, node: loader.construct_scalar(node).upper()
+        )
+        LowerLoader.add_constructor(
+            '!case',
+            lambda loader, node: loader.construct_scalar(node).lower()
+        )
+        path = self.write('case.yaml', 'factory: form\nname: !case Form\n')
+        disk_cache = DiskCache(cache_dir)
+        for loader, name in [(UpperLoader, 'FORM'), (LowerLoader, 'form')]:
+            parser = YAMLParser(
+                path,
+                cache=None,
+                yaml_loader=loader,
+                disk_cache=disk_cache
+            )
+            self.assertEqual(parser.load(path).name, name)
+        self.assertEqual(disk_cache.misses, 2)
+
+    def test_resolve_name(self):
+        self.assertTrue(resolve_name('yafowil.base.factory') is factory)
+        self.assertEqual(resolve_name('yafowil.inexistent'), None)
+        self.assertEqual(resolve_name('yafowil.base.UNSET'), None)
+        self.assertEqual(resolve_name('yafowil_yaml_inexistent.foo'), None)
+
+        # modules reloaded or imported after resolution
+        module_dir = os.path.join(self.tempdir, 'modules')
+        os.mkdir(module_dir)
+        module_path = os.path.join(module_dir, 'yafowil_yaml_resolve.py')
+        with open(module_path, 'w') as file:
+            file.write('def callback(widget, data):\n    return 1\n')
+        sys.path.insert(0, module_dir)
+        self.addCleanup(sys.path.remove, module_dir)
+        self.addCleanup(sys.modules.pop, 'yafowil_yaml_resolve', None)
+        self.assertEqual(resolve_name('yafowil_yaml_resolve.callback'), None)
+        module = importlib.import_module('yafowil_yaml_resolve')
+        callback = resolve_name('yafowil_yaml_resolve.callback')
+        self.assertEqual(callback(None, None), 1)
+        with open(module_path, 'w') as file:
+            file.write('def callback(widget, data):\n    return 2\n')
+        importlib.invalidate_caches()
+        stat = os.stat(module_path)
+        os.utime(module_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        importlib.reload(module)
+        callback = resolve_name('yafowil_yaml_resolve.callback')
+        self.assertEqual(callback(None, None), 2)
+
+        # replaced attributes
+        module.callback = lambda widget, data: 3
+        callback = resolve_name('yafowil_yaml_resolve.callback')
+        self.assertEqual(callback(None, None), 3)
+
+        # reloaded submodules, methods of classes and names defined on reload
+        package_dir = os.path.join(module_dir, 'yafowil_yaml_pkg')
+        os.mkdir(package_dir)
+        with open(os.path.join(package_dir, '__init__.py'), 'w') as file:
+            file.write('')
+        submodule_path = os.path.join(package_dir, 'mod.py')
+        with open(submodule_path, 'w') as file:
+            file.write(
+                'class K(object):\n'
+                '    @staticmethod\n'
+                '    def m():\n'
+                '        return 1\n'
+            )
+        self.addCleanup(sys.modules.pop, 'yafowil_yaml_pkg', None)
+        self.addCleanup(sys.modules.pop, 'yafowil_yaml_pkg.mod', None)
+        submodule = importlib.import_module('yafowil_yaml_pkg.mod')
+        self.assertEqual(resolve_name('yafowil_yaml_pkg.mod.K.m')(), 1)
+        self.assertEqual(resolve_name('yafowil_yaml_pkg.mod.newfunc'), None)
+        with open(submodule_path, 'w') as file:
+            file.write(
+                'class K(object):\n'
+                '    @staticmethod\n'
+                '    def m():\n'
+                '        return 2\n'
+                'def newfunc():\n'
+                '    return 3\n'
+            )
+        importlib.invalidate_caches()
+        stat = os.stat(submodule_path)
+        os.utime(
+            submodule_path,
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)
+        )
+        importlib.reload(submodule)
+        self.assertEqual(resolve_name('yafowil_yaml_pkg.mod.K.m')(), 2)
+        self.assertEqual(resolve_name('yafowil_yaml_pkg.mod.newfunc')(), 3)
+
+        # replaced classes
+        class K(object):
+            @staticmethod
+            def m():
+                return 4
+
+        submodule.K = K
+        self.assertEqual(resolve_name('yafowil_yaml_pkg.mod.K.m')(), 4)
+
+    def test_symbolic_props(self):
+        raw = """
+            factory: form
+            name: demoform
+            widgets:
+            - field:
+                factory: select
+                props:
+                    vocabulary: yafowil.yaml.tests.test_yaml._test_vocab
+                    label: yafowil.yaml.tests.test_yaml._test_vocab
+                    title: Text. With periods.
+        """
+        template_path = os.path.join(self.tempdir, 'tmpl.yaml')
+        with open(template_path, 'w') as file:
+            file.write(raw)
+        form = parse_from_YAML(template_path)
+        field = form['field']
+        self.assertTrue(field.attrs['vocabulary'] is _test_vocab)
+        self.assertTrue(field.attrs['label'] is _test_vocab)
+        self.assertEqual(field.attrs['title'], 'Text. With periods.')
+        form = parse_from_YAML(template_path, symbolic_props=['vocabulary'])
+        field = form['field']
+        self.assertTrue(field.attrs['vocabulary'] is _test_vocab)
+        self.assertEqual(
+            field.attrs['label'],
+            'yafowil.yaml.tests.test_yaml._test_vocab'
+        )
+
+    def test_create_tree_deep_and_wide(self):
+        # nesting depth exceeds recursion limit
+        depth = sys.getrecursionlimit() + 100
+        data = {'factory': 'text'}
+        for i in range(depth):
+            data = {'factory': 'compound', 'widgets': [
+                {'child_{0}'.format(i): data}
+            ]}
+        data['name'] = 'deep'
+        definition = WidgetDefinition.from_data(data)
+        form = YAMLParser(None).create_tree(definition)
+        node = form
+        for i in reversed(range(depth)):
+            node = node['child_{0}'.format(i)]
+        self.assertEqual(len(node), 0)
+        self.assertEqual(len(node.path), depth + 1)
+
+        data = {'factory': 'compound', 'name': 'wide', 'widgets': [
+            {'field_{0}'.format(i): {
+                'factory': 'compound',
+                'widgets': [{'sub': {'factory': 'text'}}]
+            }}
+            for i in range(1000)
+        ]}
+        form = YAMLParser(None).create_tree(data)
+        self.assertEqual(len(form), 1000)
+        self.assertEqual(
+            list(form.keys())[:3],
+            ['field_0', 'field_1', 'field_2']
+        )
+        self.assertEqual(form['field_999']['sub'].path, [
+            'wide', 'field_999', 'sub'
+        ])
+
+    def test_message_cache(self):
+        self.assertEqual(parse_message('i18n:foo'), ('foo', None))
+        self.assertEqual(parse_message('i18n:foo:Foo'), ('foo', 'Foo'))
+        with self.assertRaises(YAMLTransformationError):
+            parse_message('i18n:foo:Foo:Fooo')
+
+        class Message(str):
+            pass
+
+        calls = []
+
+        def message_factory(msgid, default=None):
+            calls.append((msgid, default))
+            return Message(default or msgid)
+
+        raw = """
+            factory: form
+            name: demoform
+            widgets:
+            - firstfield:
+                factory: field:label:text
+                props:
+                    label: i18n:first:First
+                    help: i18n:help
+            - secondfield:
+                factory: field:label:text
+                props:
+                    label: i18n:first:First
+        """
+        template_path = os.path.join(self.tempdir, 'tmpl.yaml')
+        with open(template_path, 'w') as file:
+            file.write(raw)
+        form = parse_from_YAML(template_path, message_factory=message_factory)
+        self.assertEqual(calls, [('first', 'First'), ('help', None)])
+        form_2 = parse_from_YAML(template_path, message_factory=message_factory)
+        self.assertEqual(len(calls), 2)
+        label = form['firstfield'].properties['label']
+        self.assertEqual(label, 'First')
+        self.assertTrue(form['secondfield'].properties['label'] is label)
+        self.assertTrue(form_2['firstfield'].properties['label'] is label)
+        self.assertEqual(form['firstfield'].properties['help'], 'help')
+
+        # messages are kept per message factory
+        self.assertTrue(message_cache.get(_) is not message_cache.get(
+            message_factory
+        ))
+        self.assertEqual(len(message_cache.get(message_factory)), 2)
+
+        # entries are dropped with message factory
+        cache = MessageCache()
+        cache.get(message_factory).set('i18n:foo', 'foo')
+        self.assertEqual(len(cache), 1)
+        del message_factory
+        self.assertEqual(len(cache), 0)
+
+        # message factories not weakly referenceable are not cached
+        class MessageFactory(object):
+            __slots__ = ()
+
+            def __call__(self, msgid, default=None):
+                return Message(default or msgid)
+
+        message_factory = MessageFactory()
+        self.assertTrue(cache.get(message_factory) is None)
+        parser = YAMLParser(template_path, message_factory=message_factory)
+        self.assertEqual(parser.parse_definition_value('i18n:foo'), 'foo')
+        self.assertFalse(
+            parser.parse_definition_value('i18n:foo')
+            is parser.parse_definition_value('i18n:foo')
+        )
+
+        # message cache can be disabled for message factories translating
+        # eagerly
+        language = ['en']
+
+        def translate(msgid, default=None):
+            return '{0}:{1}'.format(language[0], msgid)
+
+        form = parse_from_YAML(
+            template_path,
+            message_factory=translate,
+            message_cache=None
+        )
+        self.assertEqual(form['firstfield'].properties['label'], 'en:first')
+        language[0] = 'de'
+        form = parse_from_YAML(
+            template_path,
+            message_factory=translate,
+            message_cache=None
+        )
+        self.assertEqual(form['firstfield'].properties['label'], 'de:first')
+        self.assertEqual(len(message_cache.get(translate)), 0)
+
+    def test_extract_messages(self):
+        raw = """
+            factory: form
+            name: demoform
+            props:
+                action: i18n:action
+            widgets:
+            - firstfield:
+                factory: field:label:text
+                value: i18n:value:Value
+                props:
+                    label: i18n:first:First
+                    data:
+                        title: i18n:title:Title
+            - secondfield:
+                factory: field:label:text
+                props:
+                    label: i18n:first:First
+                    help: i18n:help
+            - nested:
+                nest: sub.yaml
+        """
+        sub = """
+            factory: compound
+            widgets:
+            - subfield:
+                factory: field:label:text
+                props:
+                    label: i18n:sub:Sub
+                    help: i18n:help
+        """
+        template_path = os.path.join(self.tempdir, 'tmpl.yaml')
+        with open(template_path, 'w') as file:
+            file.write(raw)
+        with open(os.path.join(self.tempdir, 'sub.yaml'), 'w') as file:
+            file.write(sub)
+        parser = YAMLParser(template_path)
+        self.assertEqual(parser.extract_messages(), [
+            ('action', None),
+            ('first', 'First'),
+            ('title', 'Title'),
+            ('value', 'Value'),
+            ('help', None),
+            ('sub', 'Sub')
+        ])
+        definition = parser.load(os.path.join(self.tempdir, 'sub.yaml'))
+        self.assertEqual(parser.extract_messages(definition), [
+            ('sub', 'Sub'),
+            ('help', None)
+        ])
+
     def test_yaml_form_flat(self):
         raw = """
             factory: form
@@ -446,6 +996,99 @@ class TestYAML(YafowilTestCase):
         </form>
         """, fxml(form()))
 
+    def test_nested_form_loaded_once(self):
+        main_raw = """
+            factory: form
+            name: mainform
+            widgets:
+            - address_1:
+                nest: address.yaml
+            - address_2:
+                nest: address.yaml
+            - address_3:
+                nest: address.yaml
+        """
+        main_path = os.path.join(self.tempdir, 'main.yaml')
+        with open(main_path, 'w') as file:
+            file.write(main_raw)
+        nested_raw = """
+            factory: compound
+            widgets:
+            - street:
+                factory: text
+        """
+        nested_path = os.path.join(self.tempdir, 'address.yaml')
+        with open(nested_path, 'w') as file:
+            file.write(nested_raw)
+
+        loaded = list()
+
+        class TestParser(YAMLParser):
+            def load_file(self, path):
+                loaded.append(path)
+                return super(TestParser, self).load_file(path)
+
+        form = TestParser(main_path, cache=None)()
+        self.assertEqual(loaded, [main_path, nested_path])
+        self.assertEqual(form.treerepr().split('\n'), [
+            "<class 'yafowil.base.Widget'>: mainform",
+            "  <class 'yafowil.base.Widget'>: address_1",
+            "    <class 'yafowil.base.Widget'>: street",
+            "  <class 'yafowil.base.Widget'>: address_2",
+            "    <class 'yafowil.base.Widget'>: street",
+            "  <class 'yafowil.base.Widget'>: address_3",
+            "    <class 'yafowil.base.Widget'>: street",
+            ""
+        ])
+
+        # share nest path resolution between parser runs
+        nest_cache = LRUCache()
+        YAMLParser(main_path, nest_cache=nest_cache)()
+        YAMLParser(main_path, nest_cache=nest_cache)()
+        self.assertEqual(nest_cache.misses, 1)
+        self.assertEqual(nest_cache.hits, 1)
+        self.assertEqual(
+            nest_cache.get((main_path, 'address.yaml')),
+            nested_path
+        )
+
+    def test_nested_form_circular(self):
+        main_path = os.path.join(self.tempdir, 'main.yaml')
+        with open(main_path, 'w') as file:
+            file.write(self.yaml_main_tmpl)
+        nested_raw = """
+            factory: compound
+            widgets:
+            - subsub:
+                nest: subsub.yaml
+        """
+        nested_path = os.path.join(self.tempdir, 'sub.yaml')
+        with open(nested_path, 'w') as file:
+            file.write(nested_raw)
+        nested_raw = """
+            factory: compound
+            widgets:
+            - sub:
+                nest: sub.yaml
+        """
+        subnested_path = os.path.join(self.tempdir, 'subsub.yaml')
+        with open(subnested_path, 'w') as file:
+            file.write(nested_raw)
+        with self.assertRaises(YAMLTransformationError) as arc:
+            YAMLParser(main_path)()
+        self.assertEqual(str(arc.exception), (
+            'Circular nesting detected: {0} -> {1} -> {2} -> {1}'
+        ).format(main_path, nested_path, subnested_path))
+
+        # self reference
+        with open(main_path, 'w') as file:
+            file.write(self.yaml_main_tmpl.replace('sub.yaml', 'main.yaml'))
+        with self.assertRaises(YAMLTransformationError) as arc:
+            YAMLParser(main_path)()
+        self.assertEqual(str(arc.exception), (
+            'Circular nesting detected: {0} -> {0}'
+        ).format(main_path))
+
     def test_traceback_supplement(self):
         # Traceback supplement
         raw = """
@@ -538,11 +1181,30 @@ class TestYAML(YafowilTestCase):
         self.assertTrue(str(arc.exception).startswith(msg))
 
 
+class TestYAMLPurePython(TestYAML):
+    # run all tests with pure python YAML loader
+
+    def setUp(self):
+        super(TestYAMLPurePython, self).setUp()
+        self._yaml_loader = yafowil.yaml.parser.yaml_loader
+        yafowil.yaml.parser.yaml_loader = yaml.SafeLoader
+
+    def tearDown(self):
+        yafowil.yaml.parser.yaml_loader = self._yaml_loader
+        super(TestYAMLPurePython, self).tearDown()
+
+    def test_yaml_loader(self):
+        self.assertTrue(yafowil.yaml.parser.yaml_loader is yaml.SafeLoader)
+
+
 def test_suite():
     suite = unittest.TestSuite()
     suite.addTest(
         unittest.TestLoader().loadTestsFromTestCase(TestYAML)
     )
+    suite.addTest(
+        unittest.TestLoader().loadTestsFromTestCase(TestYAMLPurePython)
+    )
     suite.addTest(
         doctest.DocFileSuite(
             '../sphinx.rst',
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+from yafowil.yaml.cache import WatchedDefinitionCache
+from yafowil.yaml.parser import YAMLParser
+from yafowil.yaml.parser import is_resource
+from yafowil.yaml.parser import translate_path
+import os
+import threading
+import time
+
+
+try:
+    import inotify_simple
+except ImportError:  # pragma: no cover
+    inotify_simple = None
+
+
+_marker = object()
+
+
+class PollingBackend(object):
+    """Detect changed files by comparing modification time and size.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._signatures = dict()
+
+    def signature(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def watch(self, paths):
+        """Set absolute paths of files to watch.
+        """
+        signatures = dict()
+        for path in paths:
+            signature = self._signatures.get(path, _marker)
+            if signature is _marker:
+                signature = self.signature(path)
+            signatures[path] = signature
+        self._signatures = signatures
+
+    def read(self, timeout=None):
+        """Return set of changed paths.
+
+        Wait up to ``timeout`` seconds for changes. If ``timeout`` is
+        ``None``, wait until changes are detected.
+        """
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, signature in list(self._signatures.items()):
+                current = self.signature(path)
+                if current != signature:
+                    self._signatures[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+            if timeout is None:
+                time.sleep(self.interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        self._signatures = dict()
+
+
+class InotifyBackend(object):
+    """Detect changed files using inotify. Requires ``inotify_simple``.
+
+    Directories containing the watched files are watched, thus files
+    replaced by editors or created later are detected as well.
+    """
+
+    def __init__(self):
+        flags = inotify_simple.flags
+        self.mask = (
+            flags.CLOSE_WRITE
+            | flags.CREATE
+            | flags.DELETE
+            | flags.MOVED_FROM
+            | flags.MOVED_TO
+        )
+        self._inotify = inotify_simple.INotify()
+        self._paths = frozenset()
+        self._watches = dict()
+        self._directories = dict()
+
+    def watch(self, paths):
+        """Set absolute paths of files to watch.
+        """
+        self._paths = frozenset(paths)
+        directories = set([os.path.dirname(path) for path in paths])
+        for directory in list(self._watches):
+            if directory not in directories:
+                descriptor = self._watches.pop(directory)
+                del self._directories[descriptor]
+                try:
+                    self._inotify.rm_watch(descriptor)
+                except OSError:  # pragma: no cover
+                    # directory has been removed
+                    pass
+        for directory in directories:
+            if directory in self._watches:
+                continue
+            try:
+                descriptor = self._inotify.add_watch(directory, self.mask)
+            except OSError:
+                # inexistent directory
+                continue
+            self._watches[directory] = descriptor
+            self._directories[descriptor] = directory
+
+    def read(self, timeout=None):
+        """Return set of changed paths.
+
+        Wait up to ``timeout`` seconds for changes. If ``timeout`` is
+        ``None``, wait until changes are detected.
+        """
+        if timeout is not None:
+            timeout = int(timeout * 1000)
+        changed = set()
+        for event in self._inotify.read(timeout=timeout):
+            directory = self._directories.get(event.wd)
+            if directory is None or not event.name:
+                continue
+            path = os.path.join(directory, event.name)
+            if path in self._paths:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        self._inotify.close()
+
+
+class DefinitionWatcher(object):
+    """Watch form definition files and reload changed definitions.
+
+    Watched form definitions and their nested definitions are kept in
+    ``cache``, which must be passed as ``cache`` to ``parse_from_YAML``
+    respective ``YAMLParser``. Files are not checked for modification while
+    parsing. Instead, changed files are reloaded by the watcher and replaced
+    in the cache at once, unchanged files are never loaded again.
+
+    ``backend`` defaults to ``InotifyBackend`` if ``inotify_simple`` is
+    installed, otherwise ``PollingBackend`` polling every ``interval``
+    seconds is used.
+    """
+
+    def __init__(
+        self,
+        paths=(),
+        cache=None,
+        yaml_loader=None,
+        backend=None,
+        interval=1.0
+    ):
+        if cache is None:
+            cache = WatchedDefinitionCache()
+        if backend is None:
+            if inotify_simple is not None:
+                backend = InotifyBackend()
+            else:
+                backend = PollingBackend(interval=interval)
+        self.cache = cache
+        self.yaml_loader = yaml_loader
+        self.backend = backend
+        self.interval = interval
+        # absolute path of watched definitions mapping to absolute paths of
+        # their nested definitions
+        self.dependencies = dict()
+        # absolute paths mapping to errors raised while reloading. errors
+        # raised by listeners are contained by listener, errors raised while
+        # checking for changes in the watcher thread by ``None``
+        self.errors = dict()
+        # callables getting passed the set of paths of changed definitions
+        self.listeners = list()
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = None
+        for path in paths:
+            self.add(path)
+
+    @property
+    def paths(self):
+        """Absolute paths of all watched files.
+        """
+        paths = set(self.dependencies)
+        for dependencies in self.dependencies.values():
+            paths.update(dependencies)
+        return paths
+
+    def add(self, path):
+        """Load and watch form definition at ``path`` including its nested
+        definitions. Return absolute path of the definition.
+        """
+        path = translate_path(path)
+        if is_resource(path):
+            raise ValueError(
+                u"Cannot watch package resource not located on file "
+                u"system: '{0}'".format(path)
+            )
+        path = os.path.abspath(path)
+        with self._lock:
+            self.dependencies[path] = self.collect(path)
+            self.backend.watch(self.paths)
+        return path
+
+    def remove(self, path):
+        """Stop watching form definition at ``path``.
+        """
+        path = os.path.abspath(translate_path(path))
+        with self._lock:
+            del self.dependencies[path]
+            self.backend.watch(self.paths)
+
+    def collect(self, path):
+        """Load definition at ``path`` and its nested definitions. Return
+        absolute paths of all nested definitions.
+        """
+        parser = YAMLParser(
+            path,
+            cache=self.cache,
+            yaml_loader=self.yaml_loader
+        )
+        dependencies = set()
+        seen = set([path])
+        stack = [parser.load(path)]
+        while stack:
+            definition = stack.pop()
+            if definition.nest:
+                nest_path = parser.resolve_nest_path(definition.nest)
+                # package resources not on file system cannot change
+                if not is_resource(nest_path):
+                    nest_path = os.path.abspath(nest_path)
+                    dependencies.add(nest_path)
+                if nest_path in seen:
+                    continue
+                seen.add(nest_path)
+                try:
+                    definition = parser.load(nest_path)
+                # missing nested definitions get loaded once created
+                except Exception as e:
+                    self.errors[nest_path] = e
+                    continue
+            stack.extend(definition.widgets)
+        return frozenset(dependencies)
+
+    def dependents(self, path):
+        """Return absolute paths of watched definitions which are or include
+        the definition at ``path``.
+        """
+        with self._lock:
+            return set([
+                root for root, dependencies in self.dependencies.items()
+                if root == path or path in dependencies
+            ])
+
+    def reload(self, paths):
+        """Reload definitions of ``paths`` and replace them in the cache at
+        once. Definitions which cannot be loaded are kept and the errors are
+        contained in ``errors``.
+
+        Return absolute paths of watched definitions which are or include
+        one of the reloaded definitions. Listeners get called with these
+        paths, errors raised by listeners are contained in ``errors``.
+        """
+        paths = set([os.path.abspath(path) for path in paths])
+        with self._lock:
+            entries = list()
+            for path in sorted(paths):
+                parser = YAMLParser(
+                    path,
+                    cache=None,
+                    yaml_loader=self.yaml_loader
+                )
+                try:
+                    definition = parser.load_definition(path)
+                # collect errors of all files, including malformed data
+                except Exception as e:
+                    self.errors[path] = e
+                    continue
+                self.errors.pop(path, None)
+                entries.append((
+                    self.cache.key(path, variant=parser.cache_variant),
+                    (None, definition)
+                ))
+            self.cache.update(entries)
+            changed = set()
+            for path in paths:
+                changed.update(self.dependents(path))
+            # nested definitions might have been added or removed
+            for path in changed:
+                try:
+                    self.dependencies[path] = self.collect(path)
+                except Exception as e:
+                    self.errors[path] = e
+            self.backend.watch(self.paths)
+        for listener in list(self.listeners):
+            # failing listeners do not prevent others from being notified
+            try:
+                listener(changed)
+            except Exception as e:
+                self.errors[listener] = e
+            else:
+                self.errors.pop(listener, None)
+        return changed
+
+    def check(self, timeout=0):
+        """Reload changed definitions. Wait up to ``timeout`` seconds for
+        changes. Return paths like ``reload`` does.
+        """
+        changed = self.backend.read(timeout)
+        if not changed:
+            return set()
+        return self.reload(changed)
+
+    def start(self):
+        """Start checking for changes in a daemon thread. Errors raised while
+        checking are contained in ``errors`` and checking continues.
+        """
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+
+        def run():
+            while not self._stopped.is_set():
+                # keep watching if checking fails, e.g. if a watched
+                # directory is not accessible temporarily
+                try:
+                    self.check(self.interval)
+                except Exception as e:
+                    self.errors[None] = e
+                    self._stopped.wait(self.interval)
+                else:
+                    self.errors.pop(None, None)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop checking for changes. Waits up to ``interval`` seconds for
+        the thread to finish.
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def close(self):
+        """Stop checking for changes and release backend resources.
+        """
+        self.stop()
+        self.backend.close()